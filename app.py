@@ -1,104 +1,127 @@
-from flask import Flask, render_template, jsonify, request
-import pandas as pd
+from flask import Flask, Response, render_template, jsonify, request
 import os
-import sys
 import traceback
 from datetime import datetime
 import threading
-import time
-from scraper import AntiAgingScraper
-from summarizer import Summarizer
-from free_summarizer import FreeSummarizer
-from config import OUTPUT_SETTINGS
+from feed_cache import FeedCache
+from article_store import get_store, ARTICLE_COLUMNS
+from dataset_cache import dataset_cache, database_files
+from summary_cache import get_summary_cache
+from metrics import registry as metrics_registry
+from exporter import EXPORT_FORMATS, export_chunks
+from config import OUTPUT_SETTINGS, API_SETTINGS, SCHEDULER_SETTINGS, TARGET_WEBSITES
+from scheduler import SourceScheduler
+from run_registry import get_run_registry
 import logging
 import json
 
+# The scraper and summarizers pull in pandas, feedparser, newspaper, sklearn,
+# nltk and openai. They are imported where first used so workers boot and
+# serve status and article requests without loading them.
+
 app = Flask(__name__)
 
-# Global variable to track scraping status
-scraping_status = {
-    'is_running': False,
-    'last_run': None,
-    'articles_count': 0,
-    'error': None
-}
+# Scraping status and the run lock live in a SQLite registry shared by every
+# worker process, so only one scrape runs and all workers report the same progress
+
+# Adaptive per-source scheduler, started with the app in __main__
+source_scheduler = None
 
-def run_scraper_background():
-    """Run scraper in background thread"""
-    global scraping_status
+def summarize_articles_free(articles):
+    """Summarize all article summaries in batches across the free summarizer worker pool"""
+    from free_summarizer import summarize_parallel
+    
+    to_summarize = [article for article in articles if article.get('summary')]
+    summaries = summarize_parallel([article['summary'] for article in to_summarize])
+    for article, summary in zip(to_summarize, summaries):
+        article['summary'] = summary
+
+def run_scraper_background(websites=None, owner=None):
+    """Run scraper in background thread, for every source or only the given ones
+
+    owner is a run lock token already taken by the caller; without one the lock
+    is acquired here. Returns False when another process is already scraping.
+    """
+    registry = get_run_registry()
+    owner = owner or registry.acquire()
+    if owner is None:
+        logging.info("Another process is already scraping")
+        return False
+    heartbeat = registry.keep_alive(owner)
+    scraper = None
+    websites = TARGET_WEBSITES if websites is None else websites
     
     try:
+        from scraper import AntiAgingScraper
+        from summarizer import Summarizer
+        
         logging.info("Background scraper started")
-        scraping_status['is_running'] = True
-        scraping_status['error'] = None
         
         logging.info("Initializing AntiAgingScraper")
         scraper = AntiAgingScraper()
+        scraper.metrics.listeners.append(registry.track_progress)
         
-        logging.info("Starting scrape_all_sources")
-        articles = scraper.scrape_all_sources()
+        logging.info(f"Starting scrape_all_sources for {len(websites)} sources")
+        articles = scraper.scrape_all_sources(websites)
         logging.info(f"Scraping completed, found {len(articles)} articles")
         
         # Add summarization - use free summarizer by default
         if articles:
-            logging.info("Starting summarization process")
-            # Try OpenAI first if available, otherwise use free summarizer
-            openai_key = os.getenv('OPENAI_API_KEY')
-            if openai_key:
-                try:
-                    logging.info("Using OpenAI summarizer")
-                    summarizer = Summarizer(openai_key)
-                    for article in articles:
-                        if 'summary' in article and article['summary']:
-                            article['summary'] = summarizer.summarize(article['summary'])
-                except Exception as e:
-                    logging.warning(f"OpenAI summarization failed, using free summarizer: {str(e)}")
-                    free_summarizer = FreeSummarizer()
-                    for article in articles:
-                        if 'summary' in article and article['summary']:
-                            article['summary'] = free_summarizer.summarize(article['summary'])
-            else:
-                logging.info("Using free summarizer")
-                # Use free summarizer
-                free_summarizer = FreeSummarizer()
-                for article in articles:
-                    if 'summary' in article and article['summary']:
-                        article['summary'] = free_summarizer.summarize(article['summary'])
+            with scraper.metrics.stage('summarize', len(articles)) as stage:
+                logging.info("Starting summarization process")
+                # Try OpenAI first if available, otherwise use free summarizer
+                openai_key = os.getenv('OPENAI_API_KEY')
+                if openai_key:
+                    try:
+                        logging.info("Using OpenAI summarizer")
+                        summarizer = Summarizer(openai_key)
+                        to_summarize = [article for article in articles if article.get('summary')]
+                        summaries = summarizer.summarize_many([article['summary'] for article in to_summarize])
+                        for article, summary in zip(to_summarize, summaries):
+                            article['summary'] = summary
+                    except Exception as e:
+                        logging.warning(f"OpenAI summarization failed, using free summarizer: {str(e)}")
+                        summarize_articles_free(articles)
+                else:
+                    logging.info("Using free summarizer")
+                    # Use free summarizer
+                    summarize_articles_free(articles)
+                stage['articles_out'] = len(articles)
         
         logging.info("Saving results")
         scraper.save_results(articles)
         
-        scraping_status['last_run'] = datetime.now().isoformat()
-        scraping_status['articles_count'] = len(articles)
-        scraping_status['is_running'] = False
+        registry.finish_run(owner, last_run=datetime.now().isoformat(), articles_count=len(articles))
+        if source_scheduler is not None:
+            source_scheduler.record(scraper.new_item_counts(websites))
         
         logging.info(f"Background scraper completed successfully. Articles: {len(articles)}")
         
     except Exception as e:
         logging.error(f"Error in background scraper: {str(e)}")
         logging.error(f"Background scraper traceback: {traceback.format_exc()}")
-        scraping_status['error'] = str(e)
-        scraping_status['is_running'] = False
+        registry.finish_run(owner, error=str(e))
+        if scraper is not None:
+            scraper.finish_run(error=str(e))
+        if source_scheduler is not None:
+            source_scheduler.record({website['name']: None for website in websites})
+    finally:
+        heartbeat.set()
+        registry.release(owner)
+    return True
+
+def get_article_store():
+    """Return the shared article store used by the routes"""
+    return get_store(os.path.abspath(OUTPUT_SETTINGS['database_file']), OUTPUT_SETTINGS['output_file'])
+
+def cached(key, compute):
+    """Serve a value from the shared dataset cache, recomputing it after the database changes"""
+    return dataset_cache.get_or_compute(key, database_files(os.path.abspath(OUTPUT_SETTINGS['database_file'])), compute)
 
 @app.route('/')
 def dashboard():
-    """Main dashboard page"""
-    try:
-        # Load latest data
-        if os.path.exists(OUTPUT_SETTINGS['output_file']):
-            df = pd.read_csv(OUTPUT_SETTINGS['output_file'])
-            articles = df.to_dict('records')
-        else:
-            articles = []
-        
-        return render_template('dashboard.html', 
-                             articles=articles, 
-                             status=scraping_status)
-    except Exception as e:
-        return render_template('dashboard.html', 
-                             articles=[], 
-                             status=scraping_status,
-                             error=str(e))
+    """Main dashboard page; it loads articles page by page from /api/articles"""
+    return render_template('dashboard.html', status=get_run_registry().status())
 
 @app.route('/sources')
 def sources():
@@ -107,17 +130,31 @@ def sources():
 
 @app.route('/api/scrape', methods=['POST'])
 def trigger_scrape():
-    """API endpoint to trigger scraping"""
+    """API endpoint to trigger scraping; a JSON body {"sources": [...]} limits it to those sources"""
     try:
         logging.info("Scrape endpoint called")
-        if scraping_status['is_running']:
+        names = (request.get_json(silent=True) or {}).get('sources')
+        websites = None
+        if names:
+            known = {website['name']: website for website in TARGET_WEBSITES}
+            unknown = [name for name in names if name not in known]
+            if unknown:
+                return jsonify({'success': False, 'error': f"Unknown sources: {', '.join(unknown)}"}), 400
+            websites = [known[name] for name in names]
+        # Taking the shared lock here keeps two workers from both starting a run
+        owner = get_run_registry().acquire()
+        if owner is None:
             logging.info("Scraping already in progress")
             return jsonify({'success': False, 'error': 'Scraping already in progress'})
         logging.info("Starting scraping in background thread")
         # Start scraping in background thread
-        thread = threading.Thread(target=run_scraper_background)
+        thread = threading.Thread(target=run_scraper_background, args=(websites, owner))
         thread.daemon = True
-        thread.start()
+        try:
+            thread.start()
+        except Exception:
+            get_run_registry().release(owner)
+            raise
         logging.info("Scraping thread started successfully")
         return jsonify({'success': True, 'message': 'Scraping started'})
     except Exception as e:
@@ -127,62 +164,187 @@ def trigger_scrape():
 
 @app.route('/api/status')
 def get_status():
-    """API endpoint to get scraping status"""
-    return jsonify(scraping_status)
+    """API endpoint to get scraping status, shared by all worker processes"""
+    return jsonify(get_run_registry().status())
+
+@app.route('/api/events')
+def stream_events():
+    """Server-sent events: the current status, then run, stage and per-source progress as it happens
+
+    Reconnecting clients send Last-Event-ID and get the events they missed.
+    """
+    from event_stream import get_broadcaster
+    last_id = request.headers.get('Last-Event-ID') or request.args.get('last_event_id')
+    try:
+        last_id = int(last_id) if last_id else None
+    except ValueError:
+        last_id = None
+    response = Response(get_broadcaster().subscribe(last_id), mimetype='text/event-stream')
+    response.headers['Cache-Control'] = 'no-cache'
+    # Stop reverse proxies such as nginx from buffering the stream
+    response.headers['X-Accel-Buffering'] = 'no'
+    return response
+
+@app.route('/api/schedule')
+def get_schedule():
+    """Per-source intervals, publishing rates and next due times of the adaptive scheduler"""
+    if source_scheduler is None:
+        return jsonify({'enabled': False, 'sources': []})
+    return jsonify({'enabled': True, 'sources': source_scheduler.snapshot()})
 
 @app.route('/api/articles')
 def get_articles():
-    """API endpoint to get articles data"""
+    """API endpoint to get one page of articles
+
+    Query parameters: limit, offset or cursor, sort, source, since, until,
+    min_score, q (full-text search), fields (comma-separated projection)
+    and include_total.
+    """
+    args = request.args
+    
+    def load_page():
+        fields = args.get('fields')
+        min_score = args.get('min_score')
+        page = get_article_store().query_articles(
+            source=args.get('source') or None,
+            since=args.get('since') or None,
+            until=args.get('until') or None,
+            min_score=int(min_score) if min_score else None,
+            q=args.get('q') or None,
+            sort=args.get('sort', 'date-desc'),
+            limit=int(args.get('limit', 50)),
+            offset=int(args.get('offset', 0)),
+            cursor=args.get('cursor') or None,
+            fields=[field.strip() for field in fields.split(',') if field.strip()] if fields else None,
+            include_total=args.get('include_total', '').lower() in ('1', 'true', 'yes')
+        )
+        return json.dumps(page).encode('utf-8')
+    
     try:
-        output_file = OUTPUT_SETTINGS['output_file']
-        logging.info(f"Checking for articles file: {output_file}")
-        logging.info(f"Current working directory: {os.getcwd()}")
-        logging.info(f"File exists: {os.path.exists(output_file)}")
-        
-        if os.path.exists(output_file):
-            file_size = os.path.getsize(output_file)
-            logging.info(f"File size: {file_size} bytes")
-            
-            df = pd.read_csv(output_file)
-            logging.info(f"DataFrame shape: {df.shape}")
-            logging.info(f"DataFrame columns: {list(df.columns)}")
-            
-            # Clean the data before converting to JSON
-            df = df.replace({pd.NA: None, pd.NaT: None})
-            df = df.fillna('')  # Replace NaN with empty strings
-            
-            # Convert to records and clean each article
-            articles = df.to_dict('records')
-            cleaned_articles = []
-            
-            for article in articles:
-                cleaned_article = {}
-                for key, value in article.items():
-                    # Handle different types of invalid values
-                    if pd.isna(value) or value == 'nan' or value == 'NaN' or value == 'None':
-                        cleaned_article[key] = ''
-                    elif isinstance(value, (int, float)) and (pd.isna(value) or str(value) == 'nan'):
-                        cleaned_article[key] = ''
-                    else:
-                        cleaned_article[key] = str(value) if value is not None else ''
-                cleaned_articles.append(cleaned_article)
-            
-            logging.info(f"Converted to {len(cleaned_articles)} articles")
-            
-            # Log first few articles for debugging
-            if cleaned_articles:
-                logging.info(f"First article keys: {list(cleaned_articles[0].keys())}")
-                logging.info(f"First article title: {cleaned_articles[0].get('title', 'NO_TITLE')}")
-            
-            return jsonify(cleaned_articles)
-        else:
-            logging.info(f"Output file {output_file} does not exist")
-            return jsonify([])
+        body = cached(('articles',) + tuple(sorted(args.items(multi=True))), load_page)
+        return app.response_class(body, mimetype='application/json')
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         logging.error(f"Error loading articles: {str(e)}")
         logging.error(f"Traceback: {traceback.format_exc()}")
         return jsonify({'error': str(e)})
 
+def streamed_rows(rows, fmt, fields, name):
+    """Stream rows as a downloadable file, gzip-compressed when the client accepts it"""
+    compress = request.args.get('gzip', '1').lower() not in ('0', 'false', 'no') and \
+        'gzip' in request.headers.get('Accept-Encoding', '')
+    mimetype, extension = EXPORT_FORMATS[fmt]
+    response = Response(
+        export_chunks(rows, fmt, fields, compress, API_SETTINGS.get('export_gzip_level', 6)),
+        mimetype=mimetype
+    )
+    response.headers['Content-Disposition'] = f'attachment; filename="{name}.{extension}"'
+    response.headers['Vary'] = 'Accept-Encoding'
+    if compress:
+        response.headers['Content-Encoding'] = 'gzip'
+    return response
+
+@app.route('/api/export')
+def export_articles():
+    """Stream all matching articles as NDJSON or CSV without loading them into memory
+
+    Query parameters: format (ndjson or csv), source, since, until,
+    min_score, q, fields and gzip=0 to disable compression.
+    """
+    args = request.args
+    fmt = args.get('format', 'ndjson').lower()
+    if fmt not in EXPORT_FORMATS:
+        return jsonify({'error': f"Unknown format '{fmt}', expected one of {', '.join(EXPORT_FORMATS)}"}), 400
+    
+    try:
+        fields = args.get('fields')
+        fields = [field.strip() for field in fields.split(',') if field.strip()] if fields else list(ARTICLE_COLUMNS)
+        min_score = args.get('min_score')
+        rows = get_article_store().iter_articles(
+            source=args.get('source') or None,
+            since=args.get('since') or None,
+            until=args.get('until') or None,
+            min_score=int(min_score) if min_score else None,
+            q=args.get('q') or None,
+            fields=fields,
+            batch_size=API_SETTINGS.get('export_batch_size', 1000)
+        )
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    return streamed_rows(rows, fmt, fields, 'articles')
+
+@app.route('/api/archive')
+def query_archive():
+    """Stream rows of the Parquet run archive as NDJSON or CSV
+
+    Query parameters: format, source (repeatable), since, until (publication
+    dates), scraped_since, min_score, q and fields. Only the partitions and
+    columns the query needs are read.
+    """
+    from archive import get_archive
+    archive = get_archive(OUTPUT_SETTINGS['archive_dir'])
+    if archive is None:
+        return jsonify({'error': 'The Parquet archive needs pyarrow'}), 503
+    
+    args = request.args
+    fmt = args.get('format', 'ndjson').lower()
+    if fmt not in EXPORT_FORMATS:
+        return jsonify({'error': f"Unknown format '{fmt}', expected one of {', '.join(EXPORT_FORMATS)}"}), 400
+    
+    try:
+        fields = args.get('fields')
+        fields = [field.strip() for field in fields.split(',') if field.strip()] if fields else list(ARTICLE_COLUMNS)
+        min_score = args.get('min_score')
+        rows = archive.iter_rows(
+            source=args.getlist('source') or None,
+            since=args.get('since') or None,
+            until=args.get('until') or None,
+            scraped_since=args.get('scraped_since') or None,
+            min_score=int(min_score) if min_score else None,
+            q=args.get('q') or None,
+            fields=fields
+        )
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    return streamed_rows(rows, fmt, fields, 'archive')
+
+@app.route('/api/archive/partitions')
+def archive_partitions():
+    """List the month/source partitions of the Parquet run archive"""
+    from archive import get_archive
+    archive = get_archive(OUTPUT_SETTINGS['archive_dir'])
+    if archive is None:
+        return jsonify({'error': 'The Parquet archive needs pyarrow'}), 503
+    return jsonify(archive.partitions())
+
+@app.route('/api/sources')
+def get_sources():
+    """API endpoint listing the sources present in the article store"""
+    try:
+        return jsonify(cached(('sources',), get_article_store().list_sources))
+    except Exception as e:
+        logging.error(f"Error loading sources: {str(e)}")
+        return jsonify({'error': str(e)})
+
+@app.route('/api/metrics')
+def get_metrics():
+    """Prometheus metrics for the latest scrape run and the in-process caches"""
+    gauges = {
+        'scraper_running': int(get_run_registry().status()['is_running']),
+        'dataset_cache_hits_total': dataset_cache.stats()['hits'],
+        'dataset_cache_misses_total': dataset_cache.stats()['misses']
+    }
+    summary_cache = get_summary_cache()
+    if summary_cache is not None:
+        summary_stats = summary_cache.stats()
+        gauges['summary_cache_hits_total'] = summary_stats['hits']
+        gauges['summary_cache_misses_total'] = summary_stats['misses']
+        gauges['summary_cache_entries'] = summary_stats['entries']
+    return Response(metrics_registry.render(gauges), mimetype='text/plain; version=0.0.4')
+
 @app.route('/api/debug')
 def debug_info():
     """Debug endpoint to check file system and data"""
@@ -190,76 +352,72 @@ def debug_info():
         import os
         import glob
         
+        database_file = os.path.abspath(OUTPUT_SETTINGS['database_file'])
         debug_info = {
             'current_directory': os.getcwd(),
             'files_in_directory': os.listdir('.'),
-            'csv_files': glob.glob('*.csv'),
-            'output_file': OUTPUT_SETTINGS['output_file'],
-            'output_file_exists': os.path.exists(OUTPUT_SETTINGS['output_file']),
+            'db_files': glob.glob('*.db'),
+            'database_file': database_file,
+            'database_file_exists': os.path.exists(database_file),
             'backup_file_exists': os.path.exists(OUTPUT_SETTINGS['backup_file']),
-            'scraping_status': scraping_status
+            'scraping_status': get_run_registry().status(),
+            'feed_cache': FeedCache(OUTPUT_SETTINGS['feed_cache_file']).stats()
         }
         
-        if os.path.exists(OUTPUT_SETTINGS['output_file']):
-            file_size = os.path.getsize(OUTPUT_SETTINGS['output_file'])
-            debug_info['output_file_size'] = file_size
+        summary_cache = get_summary_cache()
+        if summary_cache is not None:
+            debug_info['summary_cache'] = summary_cache.stats()
+        
+        if os.path.exists(database_file):
+            debug_info['database_file_size'] = os.path.getsize(database_file)
             
             try:
-                df = pd.read_csv(OUTPUT_SETTINGS['output_file'])
-                debug_info['dataframe_shape'] = df.shape
-                debug_info['dataframe_columns'] = list(df.columns)
-                
-                # Clean the data before showing first row
-                df_clean = df.replace({pd.NA: None, pd.NaT: None})
-                df_clean = df_clean.fillna('')
-                
-                if len(df_clean) > 0:
-                    first_row = df_clean.iloc[0].to_dict()
-                    # Convert all values to strings to avoid JSON issues
-                    cleaned_first_row = {}
-                    for key, value in first_row.items():
-                        if pd.isna(value) or value == 'nan' or value == 'NaN' or value == 'None':
-                            cleaned_first_row[key] = ''
-                        else:
-                            cleaned_first_row[key] = str(value) if value is not None else ''
-                    debug_info['first_row'] = cleaned_first_row
-                else:
-                    debug_info['first_row'] = None
+                store = get_article_store()
+                debug_info['article_count'] = cached(('count',), store.count)
+                debug_info['columns'] = ARTICLE_COLUMNS
+                first_rows = store.fetch_articles(limit=1)
+                debug_info['first_row'] = first_rows[0] if first_rows else None
+                debug_info['dataset_cache'] = dataset_cache.stats()
             except Exception as e:
-                debug_info['csv_read_error'] = str(e)
+                debug_info['database_read_error'] = str(e)
         
         return jsonify(debug_info)
     except Exception as e:
         return jsonify({'error': str(e)})
 
-def schedule_daily_scrape():
-    """Background function to schedule daily scraping"""
-    while True:
-        now = datetime.now()
-        # Run at 7 AM daily
-        if now.hour == 7 and now.minute == 0:
-            if not scraping_status['is_running']:
-                thread = threading.Thread(target=run_scraper_background)
-                thread.daemon = True
-                thread.start()
-        time.sleep(60)  # Check every minute
+def run_scheduled_batch(websites):
+    """Scrape one coalesced batch of due sources, or push it back while another run is in progress"""
+    if not run_scraper_background(websites):
+        source_scheduler.defer(websites, SCHEDULER_SETTINGS['retry_seconds'])
+
+def start_scheduler():
+    """Start the adaptive per-source scheduler in a daemon thread"""
+    global source_scheduler
+    source_scheduler = SourceScheduler(TARGET_WEBSITES, OUTPUT_SETTINGS['schedule_state_file'])
+    thread = threading.Thread(target=source_scheduler.run_forever, args=(run_scheduled_batch,))
+    thread.daemon = True
+    thread.start()
+    return source_scheduler
 
 @app.route('/api/test')
 def test_imports():
     """Test endpoint to verify all imports work"""
     try:
         # Test scraper import
+        from scraper import AntiAgingScraper
         scraper = AntiAgingScraper()
         scraper_status = "✓ AntiAgingScraper imported successfully"
         
         # Test summarizer imports
         try:
+            from summarizer import Summarizer
             summarizer = Summarizer("test")
             summarizer_status = "✓ Summarizer imported successfully"
         except Exception as e:
             summarizer_status = f"⚠ Summarizer import issue: {str(e)}"
         
         try:
+            from free_summarizer import FreeSummarizer
             free_summarizer = FreeSummarizer()
             free_summarizer_status = "✓ FreeSummarizer imported successfully"
         except Exception as e:
@@ -282,9 +440,8 @@ def test_imports():
 
 if __name__ == '__main__':
     # Start background scheduler
-    scheduler_thread = threading.Thread(target=schedule_daily_scrape)
-    scheduler_thread.daemon = True
-    scheduler_thread.start()
+    if SCHEDULER_SETTINGS.get('enabled', True):
+        start_scheduler()
     
     # Run Flask app
     port = int(os.environ.get('PORT', 5000))
@@ -0,0 +1,215 @@
+import logging
+import os
+import threading
+import uuid
+from datetime import datetime
+from typing import Dict, Iterator, List, Optional, Union
+
+from article_store import ARTICLE_COLUMNS, INTEGER_COLUMNS, normalize_date
+
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.dataset as ds
+    from pyarrow import fs
+except ImportError:  # Optional; without pyarrow the archive is simply not written
+    pa = None
+
+# Partition directories: month=YYYY-MM/source=<name>/
+PARTITION_COLUMNS = ['month', 'source']
+TIMESTAMP_COLUMNS = {'published_at', 'scraped_date'}
+ARCHIVE_COLUMNS = ARTICLE_COLUMNS + ['published_at', 'month']
+
+
+def archive_available() -> bool:
+    return pa is not None
+
+
+def _schema():
+    columns = []
+    for column in ARCHIVE_COLUMNS:
+        if column in INTEGER_COLUMNS:
+            columns.append((column, pa.int32()))
+        elif column in TIMESTAMP_COLUMNS:
+            columns.append((column, pa.timestamp('s')))
+        else:
+            columns.append((column, pa.string()))
+    return pa.schema(columns)
+
+
+def _timestamp(value) -> Optional[datetime]:
+    normalized = normalize_date(value)
+    return datetime.fromisoformat(normalized) if normalized else None
+
+
+class ArticleArchive:
+    """Append-only Parquet dataset of every run's articles, partitioned by month and source
+
+    Each save adds new files under month=YYYY-MM/source=<name>/ (month of
+    publication, or of scraping when the date is unknown), so history is kept
+    and readers only open the partitions, row groups and columns a query needs.
+    """
+
+    def __init__(self, base_dir: str):
+        if pa is None:
+            raise RuntimeError("pyarrow is required for the Parquet archive")
+        self.base_dir = os.path.abspath(base_dir)
+        self.logger = logging.getLogger(__name__)
+        self.schema = _schema()
+        self.partitioning = ds.partitioning(
+            pa.schema([(column, pa.string()) for column in PARTITION_COLUMNS]), flavor='hive'
+        )
+        # Memory-mapped reads let Arrow pull column chunks straight from the page cache
+        self.filesystem = fs.LocalFileSystem(use_mmap=True)
+        self._lock = threading.Lock()
+
+    def append(self, articles: List[Dict]) -> int:
+        """Write one run's articles as new files in their partitions"""
+        if not articles:
+            return 0
+        columns = {column: [] for column in ARCHIVE_COLUMNS}
+        for article in articles:
+            published_at = _timestamp(article.get('published_date'))
+            scraped_date = _timestamp(article.get('scraped_date')) or datetime.now().replace(microsecond=0)
+            for column in ARTICLE_COLUMNS:
+                value = article.get(column)
+                if column in INTEGER_COLUMNS:
+                    try:
+                        value = int(float(value)) if value not in (None, '') else 0
+                    except (TypeError, ValueError):
+                        value = 0
+                elif column == 'scraped_date':
+                    value = scraped_date
+                else:
+                    value = '' if value is None else str(value)
+                columns[column].append(value)
+            columns['published_at'].append(published_at)
+            columns['month'].append((published_at or scraped_date).strftime('%Y-%m'))
+        table = pa.table(columns, schema=self.schema)
+
+        run_id = f"{datetime.now().strftime('%Y%m%dT%H%M%S')}-{uuid.uuid4().hex[:8]}"
+        with self._lock:
+            ds.write_dataset(
+                table, self.base_dir, format='parquet', partitioning=self.partitioning,
+                basename_template=f"run-{run_id}-{{i}}.parquet", filesystem=self.filesystem,
+                existing_data_behavior='overwrite_or_ignore'
+            )
+        self.logger.info(f"Archived {table.num_rows} articles to {self.base_dir}")
+        return table.num_rows
+
+    def dataset(self):
+        if not os.path.isdir(self.base_dir):
+            return None
+        return ds.dataset(self.base_dir, schema=self.schema, format='parquet',
+                          partitioning=self.partitioning, filesystem=self.filesystem)
+
+    def _filter(self, source: Optional[Union[str, List[str]]], since: Optional[str], until: Optional[str],
+                scraped_since: Optional[str], min_score: Optional[int], q: Optional[str]):
+        """Build one dataset expression; the month and source terms prune whole partitions"""
+        terms = []
+        if source:
+            sources = [source] if isinstance(source, str) else list(source)
+            terms.append(ds.field('source').isin(sources))
+        if since:
+            start = _timestamp(since)
+            if start is None:
+                raise ValueError(f"Invalid date '{since}'")
+            terms.append(ds.field('month') >= start.strftime('%Y-%m'))
+            terms.append(ds.field('published_at') >= pa.scalar(start, pa.timestamp('s')))
+        if until:
+            end = _timestamp(until)
+            if end is None:
+                raise ValueError(f"Invalid date '{until}'")
+            if len(until.strip()) == 10:
+                # A bare date includes the whole day
+                end = end.replace(hour=23, minute=59, second=59)
+            terms.append(ds.field('month') <= end.strftime('%Y-%m'))
+            terms.append(ds.field('published_at') <= pa.scalar(end, pa.timestamp('s')))
+        if scraped_since:
+            start = _timestamp(scraped_since)
+            if start is None:
+                raise ValueError(f"Invalid date '{scraped_since}'")
+            terms.append(ds.field('scraped_date') >= pa.scalar(start, pa.timestamp('s')))
+        if min_score is not None:
+            terms.append(ds.field('relevance_score') >= int(min_score))
+        if q and q.strip():
+            text = q.strip()
+            terms.append(
+                pc.match_substring(ds.field('title'), text, ignore_case=True)
+                | pc.match_substring(ds.field('summary'), text, ignore_case=True)
+                | pc.match_substring(ds.field('keywords'), text, ignore_case=True)
+            )
+        expression = None
+        for term in terms:
+            expression = term if expression is None else expression & term
+        return expression
+
+    def scanner(self, source: Optional[Union[str, List[str]]] = None, since: Optional[str] = None,
+                until: Optional[str] = None, scraped_since: Optional[str] = None,
+                min_score: Optional[int] = None, q: Optional[str] = None,
+                fields: Optional[List[str]] = None, batch_size: int = 10000):
+        """Return a pyarrow Scanner over the matching rows and columns, or None before the first write"""
+        fields = fields or ARTICLE_COLUMNS
+        unknown = [field for field in fields if field not in ARCHIVE_COLUMNS]
+        if unknown:
+            raise ValueError(f"Unknown fields: {', '.join(unknown)}")
+        expression = self._filter(source, since, until, scraped_since, min_score, q)
+        dataset = self.dataset()
+        if dataset is None:
+            return None
+        return dataset.scanner(columns=list(fields), filter=expression, batch_size=batch_size)
+
+    def read(self, **filters):
+        """Read the matching rows into one pyarrow Table (see scanner() for the filters)"""
+        scanner = self.scanner(**filters)
+        if scanner is None:
+            return self.schema.empty_table().select(filters.get('fields') or ARTICLE_COLUMNS)
+        return scanner.to_table()
+
+    def read_frame(self, **filters):
+        """Read the matching rows into a pandas DataFrame"""
+        return self.read(**filters).to_pandas()
+
+    def iter_rows(self, **filters) -> Iterator[Dict]:
+        """Yield matching rows as dicts one record batch at a time, with timestamps as ISO strings"""
+        scanner = self.scanner(**filters)
+        if scanner is None:
+            return iter(())
+
+        def rows():
+            for batch in scanner.to_batches():
+                for row in batch.to_pylist():
+                    yield {key: value.isoformat() if isinstance(value, datetime) else value
+                           for key, value in row.items()}
+
+        return rows()
+
+    def partitions(self) -> List[Dict]:
+        """List the month/source partitions with their file counts"""
+        dataset = self.dataset()
+        if dataset is None:
+            return []
+        counts = {}
+        for fragment in dataset.get_fragments():
+            keys = ds.get_partition_keys(fragment.partition_expression)
+            key = (keys.get('month'), keys.get('source'))
+            counts[key] = counts.get(key, 0) + 1
+        return [{'month': month, 'source': source, 'files': files}
+                for (month, source), files in sorted(counts.items())]
+
+
+_archives = {}
+_archives_lock = threading.Lock()
+
+
+def get_archive(base_dir: str) -> Optional[ArticleArchive]:
+    """Return the shared archive for a directory, or None when pyarrow is not installed"""
+    if pa is None:
+        return None
+    base_dir = os.path.abspath(base_dir)
+    with _archives_lock:
+        archive = _archives.get(base_dir)
+        if archive is None:
+            archive = ArticleArchive(base_dir)
+            _archives[base_dir] = archive
+        return archive
@@ -0,0 +1,383 @@
+import base64
+import csv
+import json
+import logging
+import os
+import re
+import sqlite3
+import threading
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from seen_store import canonicalize_url, content_hash
+
+# Columns persisted for every article, in display order
+ARTICLE_COLUMNS = ['title', 'url', 'published_date', 'summary', 'source', 'authors', 'keywords', 'scraped_date',
+                   'relevance_score']
+INTEGER_COLUMNS = {'relevance_score'}
+
+# Fields a query may project; published_at is the normalized ISO form of published_date
+QUERY_FIELDS = ['id'] + ARTICLE_COLUMNS + ['published_at']
+
+# Sort options: (column, descending)
+SORT_ORDERS = {
+    'date-desc': ('published_at', True),
+    'date-asc': ('published_at', False),
+    'title-asc': ('title', False),
+    'title-desc': ('title', True),
+    'source-asc': ('source', False),
+}
+
+MAX_PAGE_SIZE = 500
+
+_SEARCH_TOKEN_RE = re.compile(r'\w+', re.UNICODE)
+
+_stores = {}
+_stores_lock = threading.Lock()
+
+
+def normalize_date(value) -> str:
+    """Convert RSS (RFC 822) or ISO dates to a sortable UTC 'YYYY-MM-DDTHH:MM:SS' string"""
+    if not isinstance(value, str) or not value.strip():
+        return ''
+    value = value.strip()
+    parsed = None
+    try:
+        parsed = datetime.fromisoformat(value.replace('Z', '+00:00'))
+    except ValueError:
+        try:
+            parsed = parsedate_to_datetime(value)
+        except (TypeError, ValueError, IndexError):
+            return ''
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return parsed.isoformat(timespec='seconds')
+
+
+def _encode_cursor(values: List) -> str:
+    return base64.urlsafe_b64encode(json.dumps(values).encode('utf-8')).decode('ascii')
+
+
+def _decode_cursor(cursor: str) -> List:
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')).decode('utf-8'))
+    except Exception:
+        raise ValueError('Invalid cursor')
+    if not isinstance(values, list) or len(values) != 2:
+        raise ValueError('Invalid cursor')
+    return values
+
+
+def _fts_query(text: str) -> str:
+    """Turn free text into an FTS5 query matching every word as a prefix"""
+    return ' '.join(f'"{token}"*' for token in _SEARCH_TOKEN_RE.findall(text))
+
+
+class ArticleStore:
+    """Indexed SQLite storage for scraped articles"""
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        self.logger = logging.getLogger(__name__)
+        self._local = threading.local()
+        self._write_lock = threading.Lock()
+        self._create_schema()
+
+    def _connect(self) -> sqlite3.Connection:
+        """Return this thread's connection, opening it on first use"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=30)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def _create_schema(self):
+        column_defs = [
+            f"{column} INTEGER NOT NULL DEFAULT 0" if column in INTEGER_COLUMNS else f"{column} TEXT NOT NULL DEFAULT ''"
+            for column in ARTICLE_COLUMNS + ['published_at']
+        ]
+        conn = self._connect()
+        with conn:
+            conn.execute(f'''
+                CREATE TABLE IF NOT EXISTS articles (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    url_key TEXT NOT NULL UNIQUE,
+                    {', '.join(column_defs)}
+                )
+            ''')
+            
+            # Databases created by older versions lack the newer columns
+            existing = {row['name'] for row in conn.execute("PRAGMA table_info(articles)")}
+            for column, definition in zip(ARTICLE_COLUMNS + ['published_at'], column_defs):
+                if column not in existing:
+                    conn.execute(f"ALTER TABLE articles ADD COLUMN {definition}")
+            if 'published_at' not in existing:
+                rows = conn.execute("SELECT id, published_date FROM articles").fetchall()
+                conn.executemany(
+                    "UPDATE articles SET published_at = ? WHERE id = ?",
+                    [(normalize_date(row['published_date']), row['id']) for row in rows]
+                )
+            
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_articles_published_date ON articles(published_date)")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_articles_published_at ON articles(published_at, id)")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_articles_source ON articles(source, published_at)")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_articles_url ON articles(url)")
+        
+        self.has_fts = self._create_fts(conn)
+
+    def _create_fts(self, conn: sqlite3.Connection) -> bool:
+        """Create the full-text index kept in sync by triggers; returns False without FTS5"""
+        try:
+            with conn:
+                created = conn.execute(
+                    "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'articles_fts'"
+                ).fetchone() is None
+                conn.execute('''
+                    CREATE VIRTUAL TABLE IF NOT EXISTS articles_fts
+                    USING fts5(title, summary, source, content='articles', content_rowid='id')
+                ''')
+                conn.execute('''
+                    CREATE TRIGGER IF NOT EXISTS articles_fts_insert AFTER INSERT ON articles BEGIN
+                        INSERT INTO articles_fts(rowid, title, summary, source)
+                        VALUES (new.id, new.title, new.summary, new.source);
+                    END
+                ''')
+                conn.execute('''
+                    CREATE TRIGGER IF NOT EXISTS articles_fts_delete AFTER DELETE ON articles BEGIN
+                        INSERT INTO articles_fts(articles_fts, rowid, title, summary, source)
+                        VALUES ('delete', old.id, old.title, old.summary, old.source);
+                    END
+                ''')
+                conn.execute('''
+                    CREATE TRIGGER IF NOT EXISTS articles_fts_update AFTER UPDATE ON articles BEGIN
+                        INSERT INTO articles_fts(articles_fts, rowid, title, summary, source)
+                        VALUES ('delete', old.id, old.title, old.summary, old.source);
+                        INSERT INTO articles_fts(rowid, title, summary, source)
+                        VALUES (new.id, new.title, new.summary, new.source);
+                    END
+                ''')
+                if created:
+                    conn.execute("INSERT INTO articles_fts(articles_fts) VALUES ('rebuild')")
+            return True
+        except sqlite3.OperationalError as e:
+            self.logger.warning(f"Full-text search unavailable, falling back to LIKE: {str(e)}")
+            return False
+
+    @staticmethod
+    def _row_values(article: Dict) -> List:
+        values = []
+        for column in ARTICLE_COLUMNS:
+            value = article.get(column)
+            if column in INTEGER_COLUMNS:
+                try:
+                    values.append(int(float(value)) if value not in (None, '') else 0)
+                except (TypeError, ValueError):
+                    values.append(0)
+            else:
+                values.append('' if value is None else str(value))
+        return values
+
+    def upsert_articles(self, articles: List[Dict]) -> int:
+        """Insert or update articles by canonical URL in one transaction"""
+        rows = []
+        for article in articles:
+            url_key = canonicalize_url(article.get('url', '')) or f"hash:{content_hash(article)}"
+            rows.append([url_key] + self._row_values(article) + [normalize_date(article.get('published_date'))])
+        if not rows:
+            return 0
+
+        columns = ', '.join(ARTICLE_COLUMNS + ['published_at'])
+        placeholders = ', '.join('?' * (len(ARTICLE_COLUMNS) + 2))
+        updates = ', '.join(f"{column} = excluded.{column}" for column in ARTICLE_COLUMNS + ['published_at'])
+        conn = self._connect()
+        with self._write_lock, conn:
+            conn.executemany(
+                f"INSERT INTO articles (url_key, {columns}) VALUES ({placeholders}) "
+                f"ON CONFLICT(url_key) DO UPDATE SET {updates}",
+                rows
+            )
+        return len(rows)
+
+    def count(self) -> int:
+        return self._connect().execute("SELECT COUNT(*) FROM articles").fetchone()[0]
+
+    def fetch_articles(self, limit: Optional[int] = None, offset: int = 0,
+                       fields: Optional[List[str]] = None) -> List[Dict]:
+        """Return articles in insertion order, optionally one page at a time"""
+        fields = fields or ARTICLE_COLUMNS
+        unknown = [field for field in fields if field not in QUERY_FIELDS]
+        if unknown:
+            raise ValueError(f"Unknown fields: {', '.join(unknown)}")
+        query = f"SELECT {', '.join(fields)} FROM articles ORDER BY id"
+        params = []
+        if limit is not None:
+            query += " LIMIT ? OFFSET ?"
+            params = [int(limit), int(offset)]
+        return [dict(row) for row in self._connect().execute(query, params)]
+
+    def update_scores(self, scores: List) -> int:
+        """Store recomputed (id, relevance_score) pairs in one transaction"""
+        conn = self._connect()
+        with self._write_lock, conn:
+            conn.executemany("UPDATE articles SET relevance_score = ? WHERE id = ?",
+                             [(int(score), int(article_id)) for article_id, score in scores])
+        return len(scores)
+
+    def _filter_clauses(self, source: Optional[str], since: Optional[str], until: Optional[str],
+                        min_score: Optional[int], q: Optional[str]) -> Tuple[List[str], List]:
+        """WHERE clauses and parameters shared by paged queries and exports"""
+        where, params = [], []
+        if source:
+            where.append("a.source = ?")
+            params.append(source)
+        if since:
+            where.append("a.published_at >= ?")
+            params.append(normalize_date(since) or since)
+        if until:
+            until_value = normalize_date(until) or until
+            if len(until.strip()) == 10:
+                # A bare date includes the whole day
+                until_value = until_value[:10] + 'T23:59:59'
+            where.append("a.published_at <= ?")
+            params.append(until_value)
+        if min_score is not None:
+            where.append("a.relevance_score >= ?")
+            params.append(int(min_score))
+        if q and q.strip():
+            if self.has_fts and _fts_query(q):
+                # A subquery keeps the planner from re-running the MATCH for every indexed row
+                where.append("a.id IN (SELECT rowid FROM articles_fts WHERE articles_fts MATCH ?)")
+                params.append(_fts_query(q))
+            else:
+                where.append("(a.title LIKE ? OR a.summary LIKE ? OR a.source LIKE ?)")
+                params.extend([f"%{q.strip()}%"] * 3)
+        return where, params
+
+    def query_articles(self, source: Optional[str] = None, since: Optional[str] = None,
+                       until: Optional[str] = None, min_score: Optional[int] = None,
+                       q: Optional[str] = None, sort: str = 'date-desc', limit: int = 50,
+                       offset: Optional[int] = None, cursor: Optional[str] = None,
+                       fields: Optional[List[str]] = None, include_total: bool = False) -> Dict:
+        """Return one filtered page of articles with a keyset cursor for the next page"""
+        if sort not in SORT_ORDERS:
+            raise ValueError(f"Unknown sort '{sort}', expected one of {', '.join(SORT_ORDERS)}")
+        fields = fields or ARTICLE_COLUMNS
+        unknown = [field for field in fields if field not in QUERY_FIELDS]
+        if unknown:
+            raise ValueError(f"Unknown fields: {', '.join(unknown)}")
+        limit = max(1, min(int(limit), MAX_PAGE_SIZE))
+        sort_column, descending = SORT_ORDERS[sort]
+        
+        where, params = self._filter_clauses(source, since, until, min_score, q)
+        
+        total = None
+        if include_total:
+            count_sql = "SELECT COUNT(*) FROM articles a"
+            if where:
+                count_sql += " WHERE " + " AND ".join(where)
+            total = self._connect().execute(count_sql, params).fetchone()[0]
+        
+        comparison = '<' if descending else '>'
+        if cursor:
+            last_value, last_id = _decode_cursor(cursor)
+            where.append(f"(a.{sort_column} {comparison} ? OR (a.{sort_column} = ? AND a.id {comparison} ?))")
+            params.extend([last_value, last_value, last_id])
+        
+        direction = 'DESC' if descending else 'ASC'
+        select_columns = list(dict.fromkeys(list(fields) + ['id', sort_column]))
+        sql = f"SELECT {', '.join('a.' + column for column in select_columns)} FROM articles a"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        sql += f" ORDER BY a.{sort_column} {direction}, a.id {direction} LIMIT ?"
+        params.append(limit + 1)
+        if offset and not cursor:
+            sql += " OFFSET ?"
+            params.append(int(offset))
+        
+        rows = self._connect().execute(sql, params).fetchall()
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+        
+        result = {
+            'articles': [{field: row[field] for field in fields} for row in rows],
+            'next_cursor': _encode_cursor([rows[-1][sort_column], rows[-1]['id']]) if has_more else None,
+            'limit': limit
+        }
+        if total is not None:
+            result['total'] = total
+        return result
+
+    def iter_articles(self, source: Optional[str] = None, since: Optional[str] = None,
+                      until: Optional[str] = None, min_score: Optional[int] = None,
+                      q: Optional[str] = None, fields: Optional[List[str]] = None,
+                      batch_size: int = 1000) -> Iterator[Dict]:
+        """Yield every matching article in id order, reading one keyset batch at a time
+
+        Arguments are validated before the first row is read, so callers can
+        report bad fields before they start streaming.
+        """
+        fields = fields or ARTICLE_COLUMNS
+        unknown = [field for field in fields if field not in QUERY_FIELDS]
+        if unknown:
+            raise ValueError(f"Unknown fields: {', '.join(unknown)}")
+        where, params = self._filter_clauses(source, since, until, min_score, q)
+        select_columns = list(dict.fromkeys(list(fields) + ['id']))
+        sql = f"SELECT {', '.join('a.' + column for column in select_columns)} FROM articles a " \
+              f"WHERE {' AND '.join(where + ['a.id > ?'])} ORDER BY a.id LIMIT ?"
+
+        def rows():
+            last_id = 0
+            while True:
+                # Short queries instead of one open cursor, so a slow client never pins a WAL snapshot
+                batch = self._connect().execute(sql, params + [last_id, batch_size]).fetchall()
+                for row in batch:
+                    yield {field: row[field] for field in fields}
+                if len(batch) < batch_size:
+                    return
+                last_id = batch[-1]['id']
+
+        return rows()
+
+    def list_sources(self) -> List[str]:
+        """Return the distinct article sources, served from the source index"""
+        rows = self._connect().execute("SELECT DISTINCT source FROM articles WHERE source != '' ORDER BY source")
+        return [row[0] for row in rows]
+
+    def backup(self, backup_path: str):
+        """Copy the database with SQLite's online backup API"""
+        destination = sqlite3.connect(backup_path)
+        try:
+            with self._write_lock:
+                self._connect().backup(destination)
+        finally:
+            destination.close()
+
+    def import_csv(self, csv_path: str) -> int:
+        """Load articles from a legacy CSV output file"""
+        with open(csv_path, newline='', encoding='utf-8') as f:
+            articles = [
+                {key: ('' if value in ('nan', 'NaN', 'None') else value) for key, value in row.items()}
+                for row in csv.DictReader(f)
+            ]
+        imported = self.upsert_articles(articles)
+        self.logger.info(f"Imported {imported} articles from {csv_path}")
+        return imported
+
+
+def get_store(db_path: str, legacy_csv: Optional[str] = None) -> ArticleStore:
+    """Return the shared store for a database file, importing the legacy CSV into a new database"""
+    with _stores_lock:
+        store = _stores.get(db_path)
+        if store is None:
+            store = ArticleStore(db_path)
+            if legacy_csv and os.path.exists(legacy_csv) and store.count() == 0:
+                try:
+                    store.import_csv(legacy_csv)
+                except Exception as e:
+                    store.logger.warning(f"Could not import {legacy_csv}: {str(e)}")
+            _stores[db_path] = store
+        return store
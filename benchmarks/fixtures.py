@@ -0,0 +1,204 @@
+"""
+Feed and page fixtures for every TARGET_WEBSITES entry, a local HTTP stub that
+replays them, and a synthetic article corpus for the benchmarks.
+
+Recorded responses live in benchmarks/fixtures/<slug>.<rss|html> (see
+record_fixtures.py). Sources without a recording get a deterministic synthetic
+fixture shaped like their real feed or page, so the suite runs fully offline.
+"""
+import os
+import random
+import re
+import threading
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List
+from xml.sax.saxutils import escape
+
+FIXTURE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+
+PRIMARY_TERMS = ['anti-aging', 'longevity', 'senescence', 'aging research', 'life extension']
+SECONDARY_TERMS = ['telomere', 'sirtuin', 'rapamycin', 'metformin', 'NAD+', 'mitochondria', 'autophagy',
+                   'epigenetic clock', 'senolytics', 'biological age', 'stem cell', 'inflammation']
+OFF_TOPIC_TERMS = ['covid', 'vaccine', 'election', 'sports', 'weather', 'celebrity']
+FILLER = ('study researchers found patients mice cells protein levels trial results team university '
+          'data analysis effect treatment risk disease brain heart blood muscle gene therapy dose').split()
+
+
+def slug(name: str) -> str:
+    return re.sub(r'[^a-z0-9]+', '-', name.lower()).strip('-')
+
+
+def fixture_kind(website: Dict) -> str:
+    return 'rss' if website['type'] == 'rss' else 'html'
+
+
+def fixture_path(website: Dict) -> str:
+    return os.path.join(FIXTURE_DIR, f"{slug(website['name'])}.{fixture_kind(website)}")
+
+
+def _sentence(rng: random.Random, terms: List[str]) -> str:
+    words = rng.choices(FILLER, k=rng.randint(8, 16))
+    for term in terms:
+        words.insert(rng.randrange(len(words) + 1), term)
+    return ' '.join(words).capitalize() + '.'
+
+
+def _title(rng: random.Random) -> str:
+    roll = rng.random()
+    if roll < 0.4:
+        terms = [rng.choice(PRIMARY_TERMS), rng.choice(SECONDARY_TERMS)]
+    elif roll < 0.7:
+        terms = [rng.choice(SECONDARY_TERMS)]
+    else:
+        terms = [rng.choice(OFF_TOPIC_TERMS)]
+    return _sentence(rng, terms).rstrip('.')
+
+
+def _summary(rng: random.Random, sentences: int) -> str:
+    return ' '.join(
+        _sentence(rng, [rng.choice(PRIMARY_TERMS + SECONDARY_TERMS)] if rng.random() < 0.5 else [])
+        for _ in range(sentences)
+    )
+
+
+def synthetic_feed(website: Dict, items: int = 50, seed: int = 0) -> bytes:
+    """An RSS 2.0 feed with recent, partly relevant items for one source"""
+    rng = random.Random(f"{website['name']}-{seed}")
+    base = website['url'].rstrip('/')
+    start = datetime(2025, 6, 30, 12, 0)
+    entries = []
+    for i in range(items):
+        published = start - timedelta(hours=7 * i)
+        entries.append(
+            f"<item><title>{escape(_title(rng))}</title>"
+            f"<link>{base}/article/{slug(website['name'])}-{seed}-{i}</link>"
+            f"<pubDate>{format_datetime(published.replace(tzinfo=timezone.utc), usegmt=True)}</pubDate>"
+            f"<description>{escape(_summary(rng, rng.randint(2, 6)))}</description></item>"
+        )
+    return (
+        '<?xml version="1.0" encoding="UTF-8"?><rss version="2.0"><channel>'
+        f"<title>{escape(website['name'])}</title><link>{base}</link>"
+        f"{''.join(entries)}</channel></rss>"
+    ).encode('utf-8')
+
+
+def synthetic_page(website: Dict, links: int = 60, seed: int = 0) -> bytes:
+    """An index or search-results page mixing navigation links with article links"""
+    rng = random.Random(f"{website['name']}-{seed}")
+    article_path = '/science/article/pii/S' if website['type'] == 'search' else '/news/'
+    parts = ['<!DOCTYPE html><html><head><title>', escape(website['name']), '</title></head><body><nav>']
+    parts.extend(f'<a href="/section/{i}">Section {i}</a>' for i in range(40))
+    parts.append('</nav><main>')
+    for i in range(links):
+        parts.append(f'<div class="teaser"><p>{escape(_summary(rng, 2))}</p>'
+                     f'<a href="{article_path}{slug(website["name"])}-{seed}-{i}">{escape(_title(rng))}</a></div>')
+    parts.append('</main><footer>')
+    parts.extend(f'<a href="/about/{i}">About {i}</a>' for i in range(20))
+    parts.append('</footer></body></html>')
+    return ''.join(parts).encode('utf-8')
+
+
+def has_recording(website: Dict) -> bool:
+    return os.path.exists(fixture_path(website))
+
+
+def load_fixture(website: Dict, synthetic: bool = False) -> bytes:
+    """The recorded response for a source, or its synthetic stand-in (always, with synthetic=True)"""
+    path = fixture_path(website)
+    if not synthetic and os.path.exists(path):
+        with open(path, 'rb') as f:
+            return f.read()
+    return synthetic_feed(website) if fixture_kind(website) == 'rss' else synthetic_page(website)
+
+
+class FixtureServer:
+    """Local HTTP stub serving each source's fixture under /<slug>/, with ETag revalidation"""
+
+    def __init__(self, websites: List[Dict], synthetic: bool = False):
+        self.websites = websites
+        self.recorded = [] if synthetic else [website['name'] for website in websites if has_recording(website)]
+        self.bodies = {slug(website['name']): (load_fixture(website, synthetic), fixture_kind(website))
+                       for website in websites}
+        self.requests = 0
+        bodies = self.bodies
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                server.requests += 1
+                key = self.path.strip('/').split('/')[0]
+                if key not in bodies:
+                    self.send_response(404)
+                    self.send_header('Content-Length', '0')
+                    self.end_headers()
+                    return
+                body, kind = bodies[key]
+                etag = f'"{key}-{len(body)}"'
+                if self.headers.get('If-None-Match') == etag:
+                    self.send_response(304)
+                    self.send_header('ETag', etag)
+                    self.send_header('Content-Length', '0')
+                    self.end_headers()
+                    return
+                self.send_response(200)
+                self.send_header('Content-Type', 'application/rss+xml; charset=utf-8' if kind == 'rss'
+                                 else 'text/html; charset=utf-8')
+                self.send_header('ETag', etag)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+        self._httpd = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+
+    @property
+    def base_url(self) -> str:
+        return f"http://127.0.0.1:{self._httpd.server_address[1]}"
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def local_websites(self) -> List[Dict]:
+        """Copies of the source definitions pointing at this stub instead of the real sites"""
+        local = []
+        for website in self.websites:
+            url = f"{self.base_url}/{slug(website['name'])}/"
+            website = dict(website, url=url)
+            if website['type'] == 'rss':
+                website['rss_feed'] = f"{url}feed"
+            elif website['type'] == 'search':
+                website['search_url'] = f"{url}search"
+            local.append(website)
+        return local
+
+
+def synthetic_corpus(size: int, source_names: List[str], seed: int = 0) -> List[Dict]:
+    """Feed-shaped articles mixing relevant, off-topic and previous-year entries and both date formats"""
+    rng = random.Random(seed)
+    start = datetime(2025, 12, 31, 12, 0)
+    articles = []
+    for i in range(size):
+        published = start - timedelta(minutes=37 * i)
+        if i % 10 == 0:
+            published = published.replace(year=2024)
+        articles.append({
+            'title': _title(rng),
+            'url': f"https://example.org/article/{seed}-{i}",
+            'published_date': format_datetime(published.replace(tzinfo=timezone.utc), usegmt=True) if i % 2
+            else published.isoformat() + 'Z',
+            'summary': _summary(rng, rng.randint(4, 10)),
+            'source': source_names[i % len(source_names)]
+        })
+    return articles
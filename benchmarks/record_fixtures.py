@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+"""
+Record the live feed or page of every TARGET_WEBSITES entry into
+benchmarks/fixtures/, so the benchmark stub replays real responses.
+
+    python benchmarks/record_fixtures.py            # record all sources
+    python benchmarks/record_fixtures.py --synthetic # write the synthetic stand-ins instead
+"""
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import TARGET_WEBSITES, SCRAPING_SETTINGS
+from fixtures import FIXTURE_DIR, fixture_path, fixture_kind, synthetic_feed, synthetic_page
+
+def source_url(website):
+    if website['type'] == 'rss':
+        return website['rss_feed']
+    if website['type'] == 'search':
+        return website['search_url']
+    return website['url']
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--synthetic', action='store_true', help='write synthetic fixtures without network access')
+    args = parser.parse_args()
+
+    os.makedirs(FIXTURE_DIR, exist_ok=True)
+    failures = 0
+    for website in TARGET_WEBSITES:
+        path = fixture_path(website)
+        try:
+            if args.synthetic:
+                body = synthetic_feed(website) if fixture_kind(website) == 'rss' else synthetic_page(website)
+            else:
+                import requests
+                response = requests.get(source_url(website), timeout=SCRAPING_SETTINGS['timeout'],
+                                        headers={'User-Agent': SCRAPING_SETTINGS['user_agent']})
+                response.raise_for_status()
+                body = response.content
+            with open(path, 'wb') as f:
+                f.write(body)
+            print(f"✓ {website['name']}: {len(body)} bytes -> {os.path.relpath(path)}")
+        except Exception as e:
+            failures += 1
+            print(f"✗ {website['name']}: {e}")
+    return 1 if failures else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
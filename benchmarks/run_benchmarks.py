@@ -0,0 +1,244 @@
+#!/usr/bin/env python3
+"""
+Offline benchmark suite: replays the source fixtures from a local HTTP stub and
+times the scraper, filtering, summarizers, saving and the /api/articles route
+over synthetic corpora. Writes one JSON document with every measurement.
+
+    python benchmarks/run_benchmarks.py                       # 1k, 10k and 100k articles
+    python benchmarks/run_benchmarks.py --sizes 1000 --repeat 1 --output quick.json
+    python benchmarks/run_benchmarks.py --synthetic            # ignore recordings (baseline runs)
+"""
+import argparse
+import json
+import logging
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_ROOT = os.path.dirname(BENCH_DIR)
+sys.path.insert(0, REPO_ROOT)
+
+import config
+from fixtures import FixtureServer, synthetic_corpus
+
+def timed(run, repeat, setup=None):
+    """Run `run(state)` repeat times after an untimed `setup()`; returns the last result and timings"""
+    timings = []
+    result = None
+    for _ in range(repeat):
+        state = setup() if setup else None
+        start = time.perf_counter()
+        result = run(state)
+        timings.append(time.perf_counter() - start)
+    return result, {
+        'median_s': round(statistics.median(timings), 5),
+        'min_s': round(min(timings), 5),
+        'runs': repeat
+    }
+
+class BenchmarkSuite:
+    def __init__(self, args, workdir):
+        self.args = args
+        self.workdir = workdir
+        self.results = []
+        self.fixtures = {}
+        self.logger = logging.getLogger('benchmarks')
+
+    def add(self, benchmark, size, items, timing, **extra):
+        entry = {'benchmark': benchmark, 'size': size, 'items': items, **timing, **extra}
+        if items and 'median_s' in timing:
+            entry['per_item_ms'] = round(timing['median_s'] * 1000 / items, 4)
+        self.results.append(entry)
+        self.logger.info(f"{benchmark:<40} size={size!s:<7} items={items!s:<7} median={timing.get('median_s', '-')}s")
+
+    def fresh_dir(self, name):
+        """Switch to an empty directory so every relative data file starts from scratch"""
+        path = tempfile.mkdtemp(prefix=f"{name}-", dir=self.workdir)
+        os.chdir(path)
+        return path
+
+    def bench_scrape(self, server):
+        from scraper import AntiAgingScraper
+
+        def cold_setup():
+            self.fresh_dir('scrape')
+            return AntiAgingScraper()
+
+        def scrape_and_commit(scraper):
+            articles = scraper.scrape_all_sources()
+            # What save_results does after storing: mark the run's articles seen and index them
+            scraper.commit_seen()
+            return articles
+
+        articles, timing = timed(scrape_and_commit, self.args.repeat, cold_setup)
+        self.add('scrape_all_sources.cold', len(server.websites), len(articles), timing,
+                 requests_per_run=server.requests // self.args.repeat)
+
+        # Same directory again: feeds answer 304 and every article is already seen
+        warm_articles, timing = timed(lambda scraper: scraper.scrape_all_sources(), self.args.repeat, AntiAgingScraper)
+        self.add('scrape_all_sources.warm', len(server.websites), len(warm_articles), timing)
+
+    def bench_filter(self, size, corpus):
+        from scraper import AntiAgingScraper
+        self.fresh_dir('filter')
+        scraper = AntiAgingScraper()
+        for batch in (True, False):
+            config.SCRAPING_SETTINGS['batch_filtering'] = batch
+            kept, timing = timed(
+                lambda articles: scraper.filter_articles_by_keywords(articles), self.args.repeat,
+                lambda: [dict(article) for article in corpus]
+            )
+            self.add(f"filter_articles_by_keywords.{'batch' if batch else 'per_article'}", size, size, timing,
+                     kept=len(kept))
+        config.SCRAPING_SETTINGS['batch_filtering'] = True
+
+    def bench_summarizers(self, size, corpus):
+        from free_summarizer import FreeSummarizer, ensure_nltk_data
+        missing = ensure_nltk_data(download=False)
+        if missing:
+            self.add('free_summarizer', size, 0, {}, skipped=f"NLTK data missing ({', '.join(missing)}); run preflight_nltk.py")
+            return
+
+        summarizer = FreeSummarizer()
+        texts = [article['summary'] for article in corpus[:min(size, self.args.summarize_limit)]]
+        methods = {
+            'extractive_summarize': summarizer.extractive_summarize,
+            'tfidf_summarize': summarizer.tfidf_summarize,
+            'keyword_based_summarize': summarizer.keyword_based_summarize,
+            'summarize': summarizer.summarize
+        }
+        for name, method in methods.items():
+            _, timing = timed(lambda _: [method(text) for text in texts], self.args.repeat)
+            self.add(f"FreeSummarizer.{name}", size, len(texts), timing)
+        _, timing = timed(lambda _: summarizer.summarize_many(texts), self.args.repeat)
+        self.add('FreeSummarizer.summarize_many', size, len(texts), timing)
+
+    def bench_save(self, size, corpus):
+        from scraper import AntiAgingScraper
+
+        def setup():
+            self.fresh_dir(f"save-{size}")
+            return AntiAgingScraper(), [dict(article) for article in corpus]
+
+        _, timing = timed(lambda state: state[0].save_results(state[1]), self.args.repeat, setup)
+        self.add('save_results', size, size, timing)
+
+    def bench_api(self, size):
+        """Query the store written by the last save_results run through the Flask test client"""
+        import app as webapp
+        from dataset_cache import dataset_cache
+        client = webapp.app.test_client()
+
+        def request(url):
+            response = client.get(url)
+            if response.status_code != 200:
+                raise RuntimeError(f"{url} returned {response.status_code}")
+            return response.get_json()
+
+        source = config.TARGET_WEBSITES[0]['name']
+        queries = {
+            'first_page': '/api/articles?limit=50',
+            'first_page_with_total': '/api/articles?limit=50&include_total=1',
+            'search': '/api/articles?limit=50&q=senescence',
+            'source_filter': f'/api/articles?limit=50&source={source}&include_total=1',
+            'projection': '/api/articles?limit=500&fields=title,url,published_date'
+        }
+        for name, url in queries.items():
+            _, timing = timed(lambda _: request(url), self.args.repeat, dataset_cache.invalidate)
+            self.add(f"api_articles.{name}.cold", size, 1, timing)
+            _, timing = timed(lambda _: request(url), self.args.repeat)
+            self.add(f"api_articles.{name}.cached", size, 1, timing)
+
+        def walk(_):
+            pages, cursor = 0, None
+            while True:
+                page = request('/api/articles?limit=500' + (f'&cursor={cursor}' if cursor else ''))
+                pages += 1
+                cursor = page.get('next_cursor')
+                if not cursor:
+                    return pages
+        pages, timing = timed(walk, self.args.repeat, dataset_cache.invalidate)
+        self.add('api_articles.paginate_all', size, pages, timing)
+
+    def run(self):
+        # The stub is local, so politeness delays would only measure sleep()
+        config.SCRAPING_SETTINGS['request_delay'] = 0
+        config.SCRAPING_SETTINGS['max_requests_per_host'] = len(config.TARGET_WEBSITES)
+        config.SUMMARIZATION_SETTINGS['cache_enabled'] = False
+
+        server = FixtureServer(list(config.TARGET_WEBSITES), synthetic=self.args.synthetic).start()
+        self.fixtures = {
+            'recorded': server.recorded,
+            'synthetic': [website['name'] for website in server.websites if website['name'] not in server.recorded]
+        }
+        original_websites = list(config.TARGET_WEBSITES)
+        config.TARGET_WEBSITES[:] = server.local_websites()
+        try:
+            self.bench_scrape(server)
+        finally:
+            config.TARGET_WEBSITES[:] = original_websites
+            server.stop()
+
+        source_names = [website['name'] for website in config.TARGET_WEBSITES]
+        for size in self.args.sizes:
+            corpus = synthetic_corpus(size, source_names)
+            self.bench_filter(size, corpus)
+            self.bench_summarizers(size, corpus)
+            self.bench_save(size, corpus)
+            self.bench_api(size)
+        return self.results
+
+def git_revision():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=REPO_ROOT,
+                              capture_output=True, text=True).stdout.strip() or None
+    except Exception:
+        return None
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000, 100000], help='synthetic corpus sizes')
+    parser.add_argument('--repeat', type=int, default=3, help='timed runs per measurement')
+    parser.add_argument('--summarize-limit', type=int, default=2000,
+                        help='texts per corpus size passed to the summarizer benchmarks')
+    parser.add_argument('--synthetic', action='store_true',
+                        help='serve synthetic fixtures even for sources with a recording')
+    parser.add_argument('--output', help='JSON file to write (default: benchmarks/results/benchmark-<time>.json)')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.ERROR, format='%(message)s')
+    logging.getLogger('benchmarks').setLevel(logging.INFO)
+
+    output = os.path.abspath(args.output or os.path.join(
+        BENCH_DIR, 'results', f"benchmark-{time.strftime('%Y%m%d-%H%M%S')}.json"))
+    started = time.time()
+    with tempfile.TemporaryDirectory(prefix='scraper-bench-') as workdir:
+        suite = BenchmarkSuite(args, workdir)
+        results = suite.run()
+        os.chdir(REPO_ROOT)
+
+    report = {
+        'suite': 'offline',
+        'revision': git_revision(),
+        'python': sys.version.split()[0],
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'duration_s': round(time.time() - started, 2),
+        'sizes': args.sizes,
+        'repeat': args.repeat,
+        'fixtures': suite.fixtures,
+        'results': results
+    }
+    os.makedirs(os.path.dirname(output), exist_ok=True)
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+    print(output)
+
+if __name__ == "__main__":
+    main()
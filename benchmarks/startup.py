@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+Cold-start benchmark: time a fresh interpreter importing app.py and serving its
+first status and article requests, compared with also importing the scraper and
+summarizer stack. Prints one JSON object.
+
+    python benchmarks/startup.py --runs 5
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Each scenario runs in a new interpreter and prints the seconds it took
+SCENARIOS = {
+    'import_app': "import app",
+    'first_status_request': "import app; app.app.test_client().get('/api/status')",
+    'first_articles_request': "import app; app.app.test_client().get('/api/articles?limit=50')",
+    'import_full_stack': "import app, scraper, summarizer, free_summarizer",
+}
+
+TIMED = "import time; _start = time.perf_counter(); {code}; print(time.perf_counter() - _start)"
+
+def run_scenario(code, runs, workdir):
+    # Run from an empty directory so the app's relative data files are not touched
+    env = dict(os.environ, PYTHONPATH=REPO_ROOT)
+    timings = []
+    for _ in range(runs):
+        result = subprocess.run(
+            [sys.executable, '-c', TIMED.format(code=code)],
+            cwd=workdir, env=env, capture_output=True, text=True
+        )
+        if result.returncode != 0:
+            return {'error': result.stderr.strip().splitlines()[-1] if result.stderr.strip() else 'failed'}
+        timings.append(float(result.stdout.strip().splitlines()[-1]))
+    return {
+        'median_s': round(statistics.median(timings), 4),
+        'min_s': round(min(timings), 4),
+        'max_s': round(max(timings), 4),
+        'runs': runs
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--runs', type=int, default=5, help='fresh interpreters per scenario')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as workdir:
+        results = {name: run_scenario(code, args.runs, workdir) for name, code in SCENARIOS.items()}
+    report = {
+        'benchmark': 'startup',
+        'python': sys.version.split()[0],
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'results': results
+    }
+    print(json.dumps(report, indent=2))
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,5 @@
 # Configuration for Anti-Aging Research Webscraper
+import os
 
 # Target websites to scrape
 TARGET_WEBSITES = [
@@ -104,6 +105,78 @@ CONTENT_KEYWORDS = [
     "senolytics"
 ]
 
+# Relevance scoring profiles. Each profile is compiled once into a keyword matcher
+# shared by the scraper's relevance filter and FreeSummarizer's keyword summaries.
+# Keywords match case-insensitively as substrings. Per group:
+#   title_weight / summary_weight / source_weight - added for each keyword found in that field
+#   required         - articles without any keyword of a required group get missing_required_penalty
+#   requires_primary - the group only counts once a required keyword matched
+SCORING_PROFILES = {
+    "default": {
+        "threshold": 5,  # Minimum score for an article to be kept
+        "missing_required_penalty": -10,
+        "groups": {
+            "primary": {
+                "keywords": ['anti-aging', 'longevity', 'senescence', 'aging research', 'life extension', 'antiaging'],
+                "title_weight": 5, "summary_weight": 3, "required": True
+            },
+            "secondary": {
+                "keywords": ['telomere', 'sirtuin', 'rapamycin', 'metformin', 'nad+', 'mitochondria',
+                             'autophagy', 'cellular aging', 'biological age', 'epigenetic clock',
+                             'senolytics', 'gerontology', 'oxidative stress', 'inflammation'],
+                "title_weight": 2, "summary_weight": 1, "requires_primary": True
+            },
+            "sources": {
+                "keywords": ['nature', 'cell', 'science', 'aging', 'longevity', 'gerontology'],
+                "source_weight": 1, "requires_primary": True
+            },
+            "irrelevant": {
+                "keywords": ['covid', 'vaccine', 'politics', 'election', 'sports', 'entertainment',
+                             'celebrity', 'weather', 'traffic', 'crime', 'accident', 'gender', 'pediatric',
+                             'pain', 'chronic pain', 'digital health', 'master degree', 'education'],
+                "title_weight": -5, "summary_weight": -3
+            }
+        },
+        # Sentence weights for FreeSummarizer.keyword_based_summarize
+        "summary_keywords": {
+            'anti-aging': 3, 'longevity': 3, 'senescence': 3, 'aging': 2,
+            'telomere': 3, 'sirtuin': 3, 'rapamycin': 3, 'metformin': 3,
+            'NAD+': 3, 'mitochondria': 2, 'autophagy': 3, 'inflammation': 2,
+            'oxidative stress': 3, 'cellular aging': 3, 'biological age': 3,
+            'epigenetic clock': 3, 'senolytics': 3, 'gerontology': 2,
+            'research': 1, 'study': 1, 'clinical': 1, 'trial': 1
+        }
+    },
+    "senolytics": {
+        "threshold": 5,
+        "missing_required_penalty": -10,
+        "groups": {
+            "primary": {
+                "keywords": ['senolytic', 'senescent cell', 'senescence', 'senotherap', 'senomorphic'],
+                "title_weight": 5, "summary_weight": 3, "required": True
+            },
+            "secondary": {
+                "keywords": ['dasatinib', 'quercetin', 'fisetin', 'navitoclax', 'sasp', 'p16', 'bcl-2',
+                             'clinical trial', 'aging'],
+                "title_weight": 2, "summary_weight": 1, "requires_primary": True
+            },
+            "sources": {
+                "keywords": ['nature', 'cell', 'aging'],
+                "source_weight": 1, "requires_primary": True
+            },
+            "irrelevant": {
+                "keywords": ['covid', 'vaccine', 'politics', 'sports', 'celebrity', 'skincare', 'cosmetic'],
+                "title_weight": -5, "summary_weight": -3
+            }
+        },
+        "summary_keywords": {
+            'senolytic': 3, 'senescent': 3, 'senescence': 3, 'dasatinib': 3, 'quercetin': 3,
+            'fisetin': 3, 'navitoclax': 3, 'sasp': 2, 'p16': 2, 'aging': 1,
+            'study': 1, 'clinical': 1, 'trial': 1
+        }
+    }
+}
+
 # Scraping settings
 SCRAPING_SETTINGS = {
     "max_articles_per_site": 50,
@@ -114,19 +187,99 @@ SCRAPING_SETTINGS = {
     "title_filter_required": False,    # Don't require title keyword match
     "content_filtering": True,         # Enable content-based filtering
     "date_filter_year": 2025,        # Only include articles from 2025
-    "require_recent_articles": True   # Enable date filtering
+    "require_recent_articles": True,  # Enable date filtering
+    "concurrent_fetching": True,      # Fetch sources in parallel instead of one after another
+    "max_concurrent_sources": 6,      # Global cap on sources fetched at the same time
+    "max_requests_per_host": 1,       # Politeness cap on simultaneous requests to one host
+    "conditional_feed_requests": True,  # Send If-None-Match/If-Modified-Since and skip unchanged feeds
+    "incremental": True,              # Only process articles not seen by an earlier run and append them
+    "batch_filtering": True,          # Score and date-check fetched articles as one vectorized DataFrame
+    "scoring_profile": os.getenv('SCORING_PROFILE', 'default'),  # Key into SCORING_PROFILES
+    "extract_full_text": False,       # Download each filtered article and extract its full text with newspaper
+    "extraction_workers": 8,          # Articles extracted at the same time (still one request per host)
+    "extraction_timeout": 15,         # Seconds allowed for downloading one article
+    "deduplicate": True,              # Collapse same-URL and near-duplicate articles before extraction/summaries
+    "dedup_threshold": 0.6,           # Estimated Jaccard similarity of title+summary shingles counted as a duplicate
+    "dedup_num_perm": 64,             # MinHash permutations per signature
+    "dedup_bands": 16,                # LSH bands (num_perm / bands rows each); more bands find lower similarities
+    "run_lock_stale_seconds": 120,    # A run lock without a heartbeat for this long is taken over
+    "run_heartbeat_seconds": 15       # How often the running process refreshes the run lock
+}
+
+# Shared HTTP connection pool used by every fetcher
+HTTP_SETTINGS = {
+    "pool_connections": 20,           # Hosts whose connections are kept alive
+    "pool_maxsize": 4,                # Keep-alive connections per host
+    "host_pool_sizes": {},            # Per-host overrides, e.g. {"www.nature.com": 8}
+    "max_retries": 2                  # Retries on connection errors and 502/503/504
+}
+
+# Adaptive per-source scheduling
+SCHEDULER_SETTINGS = {
+    "enabled": True,                  # Run the scheduler thread when app.py is started directly
+    "default_interval_hours": 24,     # Starting interval of a source without history
+    "min_interval_hours": 1,          # Never poll a source more often than this
+    "max_interval_hours": 72,         # Poll even quiet sources at least this often
+    "target_new_items": 10,           # Aim for about this many new items per poll of a source
+    "rate_smoothing": 0.5,            # Weight of the latest poll in the new-items-per-hour average
+    "backoff_factor": 1.5,            # Interval growth after a poll with no new items
+    "coalesce_seconds": 600,          # Sources due within this window are scraped in the same run
+    "retry_seconds": 300              # Delay for due sources while another run is in progress
 }
 
 # Output settings
 OUTPUT_SETTINGS = {
-    "output_file": "anti_aging_research.csv",
-    "backup_file": "anti_aging_research_backup.csv",
-    "log_file": "scraper.log"
+    "database_file": "anti_aging_research.db",
+    "backup_file": "anti_aging_research_backup.db",
+    "output_file": "anti_aging_research.csv",  # Legacy CSV output, imported into a new database once
+    "log_file": "scraper.log",
+    "feed_cache_file": "feed_cache.json",
+    "seen_store_file": "seen_articles.db",
+    "summary_cache_file": "summary_cache.db",
+    "extraction_cache_file": "extracted_text.db",
+    "dedup_index_file": "dedup_index.db",  # MinHash/LSH signatures of stored articles
+    "archive_enabled": True,              # Append every run to a Parquet dataset (needs pyarrow)
+    "archive_dir": "archive",             # Partitioned as archive/month=YYYY-MM/source=<name>/
+    "schedule_state_file": "schedule_state.json",  # Per-source intervals and publishing rates
+    "run_registry_file": "scraper_runs.db",        # Cross-process run lock and shared status
+    "metrics_file": "run_metrics.jsonl"  # One JSON record per scrape run
+}
+
+# Web API settings
+API_SETTINGS = {
+    "response_cache_entries": 256,  # Cached article pages/responses kept in memory per worker
+    "export_batch_size": 1000,      # Rows read from the store per query while streaming /api/export
+    "export_gzip_level": 6,         # zlib level for gzip-compressed exports
+    "events_poll_seconds": 0.5,     # How often each worker checks the shared event log for /api/events
+    "events_keepalive_seconds": 15, # Comment lines sent to idle /api/events streams to keep proxies open
+    "events_retained": 1000         # Progress events kept in the shared log for reconnecting clients
+}
+
+# Summarization settings (free summarizer and the shared summary cache)
+SUMMARIZATION_SETTINGS = {
+    "tfidf_max_features": 20000,  # Vocabulary size of the corpus-wide TF-IDF vectorizer
+    "vectorizer_file": None,      # Optional pickled vectorizer reused by summarize_many instead of fitting
+    "workers": int(os.getenv('SUMMARIZATION_WORKERS', os.cpu_count() or 1)),  # Summarizer processes; 1 keeps it in process
+    "chunk_size": 100,            # Texts sent to a worker per batch
+    "start_method": "spawn",      # Fresh worker processes rather than forks of the threaded web server
+    "cache_enabled": True,        # Reuse summaries of unchanged text across runs, for both summarizers
+    "cache_max_entries": 50000    # Least recently used summaries beyond this are evicted
 }
 
 # OpenAI settings (for summarization)
 OPENAI_SETTINGS = {
     "model": "gpt-3.5-turbo",
     "max_tokens": 150,
-    "temperature": 0.7
+    "temperature": 0.7,
+    "base_url": os.getenv('OPENAI_BASE_URL'),  # e.g. a local stub server for testing
+    "max_concurrency": 8,          # In-flight requests for Summarizer.summarize_many
+    "requests_per_minute": 500,
+    "tokens_per_minute": 200000,   # Prompt estimate plus max_tokens per request
+    "max_retries": 5,              # Retries on 429s, timeouts and 5xx errors
+    "backoff_base": 1.0,           # Seconds, doubled on each retry
+    "backoff_max": 60,
+    "request_timeout": 60,
+    "pack_short_articles": True,   # Summarize several short articles in one prompt
+    "pack_max_chars": 600,
+    "pack_size": 5
 } 
\ No newline at end of file
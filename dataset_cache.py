@@ -0,0 +1,77 @@
+import os
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, Hashable, Iterable
+
+from config import API_SETTINGS
+
+
+class DatasetCache:
+    """Thread-safe LRU of article query results and serialized responses
+
+    Entries are dropped when invalidate() is called after a save, or when
+    the watched database files change on disk (e.g. written by another process).
+    """
+
+    def __init__(self, max_entries: int = 256):
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self._generation = 0
+        self._token = None
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _file_token(paths: Iterable[str]) -> tuple:
+        token = []
+        for path in paths:
+            try:
+                stat = os.stat(path)
+                token.append((stat.st_mtime_ns, stat.st_size))
+            except OSError:
+                token.append(None)
+        return tuple(token)
+
+    def get_or_compute(self, key: Hashable, paths: Iterable[str], compute: Callable):
+        """Return the cached value for key, computing it when missing or stale"""
+        paths = tuple(paths)
+        with self._lock:
+            token = (self._generation, self._file_token(paths))
+            if token != self._token:
+                self._entries.clear()
+                self._token = token
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key]
+            self.misses += 1
+
+        value = compute()
+
+        with self._lock:
+            # Skip storing if a save landed while the value was being computed
+            if self._token == token:
+                self._entries[key] = value
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+        return value
+
+    def invalidate(self):
+        """Drop every entry, e.g. once save_results has committed new articles"""
+        with self._lock:
+            self._generation += 1
+            self._entries.clear()
+            self._token = None
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {'entries': len(self._entries), 'hits': self.hits, 'misses': self.misses}
+
+
+def database_files(db_path: str) -> tuple:
+    """Files whose changes make cached query results stale (WAL writes skip the main file)"""
+    return (db_path, f"{db_path}-wal")
+
+
+dataset_cache = DatasetCache(API_SETTINGS.get('response_cache_entries', 256))
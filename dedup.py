@@ -0,0 +1,223 @@
+import hashlib
+import logging
+import re
+import sqlite3
+import threading
+import zlib
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from seen_store import canonicalize_url
+
+# Universal hashing modulus for the MinHash permutations (Mersenne prime 2^31 - 1)
+_PRIME = (1 << 31) - 1
+_WORD_RE = re.compile(r'[a-z0-9]+')
+_TAG_RE = re.compile(r'<[^>]+>')
+
+
+def shingles(text: str, size: int = 3) -> set:
+    """Word n-grams of the lower-cased text without markup; short texts become a single shingle"""
+    words = _WORD_RE.findall(_TAG_RE.sub(' ', text or '').lower())
+    if len(words) <= size:
+        return {' '.join(words)} if words else set()
+    return {' '.join(words[i:i + size]) for i in range(len(words) - size + 1)}
+
+
+class DuplicateIndex:
+    """Persistent MinHash/LSH index of stored articles for near-duplicate detection
+
+    Each article's title and summary shingles are reduced to a MinHash
+    signature, split into bands whose hashes are stored in SQLite. A new article
+    is only compared with articles sharing at least one band bucket, so lookups
+    stay cheap as the archive grows; candidates count as duplicates when their
+    estimated Jaccard similarity reaches the threshold.
+    """
+
+    def __init__(self, db_path: str, num_perm: int = 64, bands: int = 16, threshold: float = 0.6):
+        if num_perm % bands:
+            raise ValueError(f"num_perm ({num_perm}) must be a multiple of bands ({bands})")
+        self.db_path = db_path
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.threshold = threshold
+        self.logger = logging.getLogger(__name__)
+        rng = np.random.RandomState(1)
+        self._a = rng.randint(1, _PRIME, size=num_perm).astype(np.uint64)
+        self._b = rng.randint(0, _PRIME, size=num_perm).astype(np.uint64)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._create_schema()
+
+    def _create_schema(self):
+        params = f"{self.num_perm}/{self.bands}"
+        with self._lock, self._conn:
+            self._conn.execute("CREATE TABLE IF NOT EXISTS dedup_meta (key TEXT PRIMARY KEY, value TEXT)")
+            row = self._conn.execute("SELECT value FROM dedup_meta WHERE key = 'params'").fetchone()
+            if row is not None and row[0] != params:
+                # Signatures from other MinHash settings cannot be compared; start over
+                self.logger.warning(f"MinHash settings changed from {row[0]} to {params}, rebuilding the duplicate index")
+                self._conn.execute("DROP TABLE IF EXISTS dedup_bands")
+                self._conn.execute("DROP TABLE IF EXISTS dedup_signatures")
+            self._conn.execute("INSERT OR REPLACE INTO dedup_meta (key, value) VALUES ('params', ?)", (params,))
+            self._conn.execute('''
+                CREATE TABLE IF NOT EXISTS dedup_signatures (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    url_key TEXT UNIQUE NOT NULL,
+                    signature BLOB NOT NULL,
+                    added TEXT NOT NULL
+                )
+            ''')
+            self._conn.execute('''
+                CREATE TABLE IF NOT EXISTS dedup_bands (
+                    bucket INTEGER NOT NULL,
+                    doc_id INTEGER NOT NULL
+                )
+            ''')
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_dedup_bands_bucket ON dedup_bands(bucket)")
+
+    def signature(self, text: str) -> Optional[np.ndarray]:
+        """MinHash signature of the text's shingles, or None when it has no words"""
+        grams = shingles(text)
+        if not grams:
+            return None
+        hashes = np.fromiter((zlib.crc32(gram.encode('utf-8')) & _PRIME for gram in grams),
+                             dtype=np.uint64, count=len(grams))
+        # a < 2^31 and hash < 2^31, so a * hash + b fits comfortably in uint64
+        return ((self._a[:, None] * hashes[None, :] + self._b[:, None]) % _PRIME).min(axis=1).astype(np.uint32)
+
+    def buckets(self, signature: np.ndarray) -> List[int]:
+        """One signed 64-bit bucket key per band, with the band number mixed in"""
+        keys = []
+        for band, values in enumerate(signature.reshape(self.bands, self.rows)):
+            digest = hashlib.blake2b(band.to_bytes(2, 'little') + values.tobytes(), digest_size=8).digest()
+            keys.append(int.from_bytes(digest, 'little', signed=True))
+        return keys
+
+    @staticmethod
+    def _text(article: Dict) -> str:
+        return f"{article.get('title') or ''} {article.get('summary') or ''}"
+
+    @staticmethod
+    def _url_key(article: Dict) -> str:
+        return canonicalize_url(article.get('url', ''))
+
+    def _stored_candidates(self, bucket_keys: List[int]) -> Dict[int, List[int]]:
+        """Map bucket key -> stored doc ids, queried in chunks below SQLite's parameter limit"""
+        found = {}
+        unique_keys = list(set(bucket_keys))
+        with self._lock:
+            for start in range(0, len(unique_keys), 500):
+                chunk = unique_keys[start:start + 500]
+                placeholders = ','.join('?' * len(chunk))
+                for bucket, doc_id in self._conn.execute(
+                    f"SELECT bucket, doc_id FROM dedup_bands WHERE bucket IN ({placeholders})", chunk
+                ):
+                    found.setdefault(bucket, []).append(doc_id)
+        return found
+
+    def _stored_signatures(self, doc_ids: List[int]) -> Dict[int, Tuple[str, np.ndarray]]:
+        """Map doc id -> (url_key, signature)"""
+        signatures = {}
+        doc_ids = list(set(doc_ids))
+        with self._lock:
+            for start in range(0, len(doc_ids), 500):
+                chunk = doc_ids[start:start + 500]
+                placeholders = ','.join('?' * len(chunk))
+                for doc_id, url_key, blob in self._conn.execute(
+                    f"SELECT id, url_key, signature FROM dedup_signatures WHERE id IN ({placeholders})", chunk
+                ):
+                    signatures[doc_id] = (url_key, np.frombuffer(blob, dtype=np.uint32))
+        return signatures
+
+    def find_duplicates(self, articles: List[Dict]) -> Tuple[List[Dict], List[Tuple], int]:
+        """Drop articles duplicating an earlier one in the list or an indexed article
+
+        Returns (unique articles, index entries to add() once they are stored,
+        number of duplicates removed). The first occurrence in list order wins.
+        """
+        prepared = []
+        for article in articles:
+            signature = self.signature(self._text(article))
+            prepared.append((article, self._url_key(article), signature,
+                             self.buckets(signature) if signature is not None else []))
+
+        stored = self._stored_candidates([key for _, _, _, keys in prepared for key in keys])
+        stored_signatures = self._stored_signatures([doc_id for ids in stored.values() for doc_id in ids])
+
+        unique, entries = [], []
+        seen_urls = set()
+        run_buckets = {}
+        run_signatures = []
+        duplicates = 0
+        for article, url_key, signature, keys in prepared:
+            if url_key and url_key in seen_urls:
+                duplicates += 1
+                continue
+            if signature is not None and self._is_near_duplicate(url_key, signature, keys, stored,
+                                                                 stored_signatures, run_buckets, run_signatures):
+                duplicates += 1
+                continue
+
+            unique.append(article)
+            if url_key:
+                seen_urls.add(url_key)
+            if signature is not None:
+                for key in keys:
+                    run_buckets.setdefault(key, []).append(len(run_signatures))
+                run_signatures.append(signature)
+                entries.append((url_key or f"hash:{hashlib.sha1(signature.tobytes()).hexdigest()}", signature, keys))
+
+        if duplicates:
+            self.logger.info(f"Removed {duplicates} duplicate articles of {len(articles)}")
+        return unique, entries, duplicates
+
+    def _is_near_duplicate(self, url_key, signature, keys, stored, stored_signatures, run_buckets,
+                           run_signatures) -> bool:
+        candidates = {doc_id for key in keys for doc_id in stored.get(key, ())}
+        for doc_id in candidates:
+            stored_entry = stored_signatures.get(doc_id)
+            if stored_entry is None:
+                continue
+            other_key, other = stored_entry
+            # The article's own earlier version is a re-fetch or an edit, left to the seen store
+            if url_key and other_key == url_key:
+                continue
+            if np.mean(other == signature) >= self.threshold:
+                return True
+        for index in {index for key in keys for index in run_buckets.get(key, ())}:
+            if np.mean(run_signatures[index] == signature) >= self.threshold:
+                return True
+        return False
+
+    def add(self, entries: List[Tuple]):
+        """Index (url_key, signature, bucket keys) entries returned by find_duplicates"""
+        if not entries:
+            return
+        now = datetime.now().isoformat()
+        with self._lock, self._conn:
+            for url_key, signature, keys in entries:
+                row = self._conn.execute("SELECT id FROM dedup_signatures WHERE url_key = ?", (url_key,)).fetchone()
+                if row is not None:
+                    self._conn.execute("DELETE FROM dedup_bands WHERE doc_id = ?", (row[0],))
+                    self._conn.execute("UPDATE dedup_signatures SET signature = ?, added = ? WHERE id = ?",
+                                       (signature.tobytes(), now, row[0]))
+                    doc_id = row[0]
+                else:
+                    doc_id = self._conn.execute(
+                        "INSERT INTO dedup_signatures (url_key, signature, added) VALUES (?, ?, ?)",
+                        (url_key, signature.tobytes(), now)
+                    ).lastrowid
+                self._conn.executemany("INSERT INTO dedup_bands (bucket, doc_id) VALUES (?, ?)",
+                                       [(key, doc_id) for key in keys])
+        self.logger.info(f"Indexed {len(entries)} articles in {self.db_path}")
+
+    def count(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM dedup_signatures").fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
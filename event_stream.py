@@ -0,0 +1,118 @@
+import json
+import logging
+import sqlite3
+import threading
+import time
+from collections import deque
+from typing import Dict, Iterator, Optional
+
+from config import API_SETTINGS
+from run_registry import RunRegistry, get_run_registry
+
+
+def format_event(event: str, data: Dict, event_id: Optional[int] = None) -> str:
+    """One server-sent event message"""
+    lines = [f"id: {event_id}"] if event_id is not None else []
+    lines.append(f"event: {event}")
+    lines.append(f"data: {json.dumps(data)}")
+    return '\n'.join(lines) + '\n\n'
+
+
+class EventBroadcaster:
+    """Relays the shared run event log to this process's /api/events clients
+
+    Progress events are written to the run registry by whichever process is
+    scraping. One daemon thread per process tails that log while at least one
+    client is connected and wakes every subscriber, so each open dashboard tab
+    costs a waiting generator rather than its own database polling.
+    """
+
+    def __init__(self, registry: RunRegistry, poll_seconds: float = 0.5, keepalive_seconds: float = 15,
+                 buffer_size: int = 1000):
+        self.registry = registry
+        self.poll_seconds = poll_seconds
+        self.keepalive_seconds = keepalive_seconds
+        self.logger = logging.getLogger(__name__)
+        self._cond = threading.Condition()
+        self._events = deque(maxlen=buffer_size)
+        self._last_id = 0
+        self._subscribers = 0
+        self._thread = None
+
+    def _start_if_idle(self):
+        # Called with the condition held
+        if self._thread is None:
+            self._last_id = self.registry.last_event_id()
+            self._thread = threading.Thread(target=self._tail, name='event-tail', daemon=True)
+            self._thread.start()
+
+    def _tail(self):
+        while True:
+            with self._cond:
+                if self._subscribers == 0:
+                    self._thread = None
+                    return
+                last_id = self._last_id
+            try:
+                events = self.registry.events_since(last_id)
+            except sqlite3.Error as e:
+                self.logger.warning(f"Could not read run events: {str(e)}")
+                events = []
+            if events:
+                with self._cond:
+                    self._events.extend(events)
+                    self._last_id = events[-1][0]
+                    self._cond.notify_all()
+            time.sleep(self.poll_seconds)
+
+    def subscribe(self, last_id: Optional[int] = None) -> Iterator[str]:
+        """Yield SSE messages: the current status, events missed since last_id, then live events"""
+        with self._cond:
+            self._subscribers += 1
+            self._start_if_idle()
+            cursor = self._last_id
+        try:
+            yield "retry: 3000\n\n"
+            yield format_event('status', self.registry.status())
+            if last_id is not None and last_id < cursor:
+                # Reconnecting client (Last-Event-ID): replay what it missed from the shared log
+                for event_id, event, data in self.registry.events_since(last_id, limit=cursor - last_id):
+                    if event_id <= cursor:
+                        yield format_event(event, data, event_id)
+            while True:
+                with self._cond:
+                    pending = [entry for entry in self._events if entry[0] > cursor]
+                    if not pending:
+                        self._cond.wait(timeout=self.keepalive_seconds)
+                        pending = [entry for entry in self._events if entry[0] > cursor]
+                if not pending:
+                    yield ": keepalive\n\n"
+                    continue
+                for event_id, event, data in pending:
+                    yield format_event(event, data, event_id)
+                cursor = pending[-1][0]
+        finally:
+            with self._cond:
+                self._subscribers -= 1
+
+    def subscribers(self) -> int:
+        with self._cond:
+            return self._subscribers
+
+
+_broadcaster = None
+_broadcaster_lock = threading.Lock()
+
+
+def get_broadcaster() -> EventBroadcaster:
+    """Return this process's broadcaster for the shared run registry"""
+    global _broadcaster
+    with _broadcaster_lock:
+        if _broadcaster is None:
+            _broadcaster = EventBroadcaster(
+                get_run_registry(),
+                poll_seconds=API_SETTINGS.get('events_poll_seconds', 0.5),
+                keepalive_seconds=API_SETTINGS.get('events_keepalive_seconds', 15),
+                buffer_size=API_SETTINGS.get('events_retained', 1000)
+            )
+        return _broadcaster
@@ -0,0 +1,59 @@
+import csv
+import io
+import json
+import zlib
+from typing import Dict, Iterable, Iterator, List
+
+# Export formats: (mimetype, file extension)
+EXPORT_FORMATS = {
+    'ndjson': ('application/x-ndjson', 'ndjson'),
+    'csv': ('text/csv', 'csv')
+}
+
+
+def ndjson_chunks(rows: Iterable[Dict], rows_per_chunk: int = 500) -> Iterator[bytes]:
+    """Encode rows as newline-delimited JSON, a few hundred rows per chunk"""
+    lines = []
+    for row in rows:
+        lines.append(json.dumps(row, ensure_ascii=False))
+        if len(lines) >= rows_per_chunk:
+            yield ('\n'.join(lines) + '\n').encode('utf-8')
+            lines = []
+    if lines:
+        yield ('\n'.join(lines) + '\n').encode('utf-8')
+
+
+def csv_chunks(rows: Iterable[Dict], fields: List[str], rows_per_chunk: int = 500) -> Iterator[bytes]:
+    """Encode rows as CSV with a header line, reusing one small buffer"""
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=fields, extrasaction='ignore')
+    writer.writeheader()
+    written = 0
+    for row in rows:
+        writer.writerow(row)
+        written += 1
+        if written % rows_per_chunk == 0:
+            yield buffer.getvalue().encode('utf-8')
+            buffer.seek(0)
+            buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue().encode('utf-8')
+
+
+def gzip_chunks(chunks: Iterable[bytes], level: int = 6) -> Iterator[bytes]:
+    """Compress a byte stream into one gzip member as it is produced"""
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+    for chunk in chunks:
+        compressed = compressor.compress(chunk)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
+
+
+def export_chunks(rows: Iterable[Dict], fmt: str, fields: List[str], compress: bool = False,
+                  level: int = 6) -> Iterator[bytes]:
+    """Stream rows in an EXPORT_FORMATS format, optionally gzip-compressed"""
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"Unknown format '{fmt}', expected one of {', '.join(EXPORT_FORMATS)}")
+    chunks = csv_chunks(rows, fields) if fmt == 'csv' else ndjson_chunks(rows)
+    return gzip_chunks(chunks, level) if compress else chunks
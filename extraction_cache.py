@@ -0,0 +1,78 @@
+import json
+import logging
+import sqlite3
+import threading
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from seen_store import canonicalize_url
+
+
+class ExtractionCache:
+    """SQLite record of full-text fields already extracted from article URLs"""
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        self.logger = logging.getLogger(__name__)
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute('''
+                CREATE TABLE IF NOT EXISTS extracted_articles (
+                    url_key TEXT PRIMARY KEY,
+                    fields TEXT NOT NULL,
+                    extracted TEXT NOT NULL
+                )
+            ''')
+
+    def get_many(self, urls: List[str]) -> Dict[str, Dict]:
+        """Return the cached fields for each URL that was extracted before, keyed by the given URL"""
+        keys = {}
+        for url in urls:
+            key = canonicalize_url(url)
+            if key:
+                keys.setdefault(key, []).append(url)
+        found = {}
+        with self._lock:
+            # Stay well below SQLite's bound-parameter limit
+            key_list = list(keys)
+            for start in range(0, len(key_list), 500):
+                chunk = key_list[start:start + 500]
+                placeholders = ','.join('?' * len(chunk))
+                rows = self._conn.execute(
+                    f"SELECT url_key, fields FROM extracted_articles WHERE url_key IN ({placeholders})", chunk
+                ).fetchall()
+                for key, fields in rows:
+                    for url in keys[key]:
+                        found[url] = json.loads(fields)
+            self.hits += len(found)
+            self.misses += len(urls) - len(found)
+        return found
+
+    def get(self, url: str) -> Optional[Dict]:
+        return self.get_many([url]).get(url)
+
+    def put(self, url: str, fields: Dict):
+        """Store the fields extracted from a URL, replacing an earlier extraction"""
+        key = canonicalize_url(url)
+        if not key:
+            return
+        with self._lock, self._conn:
+            self._conn.execute('''
+                INSERT INTO extracted_articles (url_key, fields, extracted)
+                VALUES (?, ?, ?)
+                ON CONFLICT(url_key) DO UPDATE SET
+                    fields = excluded.fields,
+                    extracted = excluded.extracted
+            ''', (key, json.dumps(fields), datetime.now().isoformat()))
+
+    def stats(self) -> Dict:
+        with self._lock:
+            entries = self._conn.execute("SELECT COUNT(*) FROM extracted_articles").fetchone()[0]
+            return {'hits': self.hits, 'misses': self.misses, 'entries': entries}
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,87 @@
+import json
+import logging
+import os
+import threading
+from datetime import datetime
+from typing import Dict, List, Optional
+
+
+class FeedCache:
+    """Persistent ETag/Last-Modified validators and last parsed entries per feed URL"""
+
+    def __init__(self, cache_file: str):
+        self.cache_file = cache_file
+        self.logger = logging.getLogger(__name__)
+        self._lock = threading.Lock()
+        self._feeds = {}
+        self._stats = {'hits': 0, 'misses': 0}
+        self.run_stats = {'hits': 0, 'misses': 0}
+        self.load()
+
+    def load(self):
+        """Load validators and cumulative counters from disk"""
+        if not os.path.exists(self.cache_file):
+            return
+        try:
+            with open(self.cache_file, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            self._feeds = data.get('feeds', {})
+            self._stats.update(data.get('stats', {}))
+        except Exception as e:
+            self.logger.warning(f"Could not read feed cache {self.cache_file}: {str(e)}")
+
+    def save(self):
+        """Write the cache atomically so a crash never leaves a truncated file"""
+        with self._lock:
+            data = {'feeds': self._feeds, 'stats': dict(self._stats)}
+        tmp_path = f"{self.cache_file}.tmp"
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(data, f)
+            os.replace(tmp_path, self.cache_file)
+        except Exception as e:
+            self.logger.warning(f"Could not write feed cache {self.cache_file}: {str(e)}")
+
+    def validators(self, feed_url: str) -> Dict[str, Optional[str]]:
+        """Return the stored etag/modified values for a feed, if any"""
+        with self._lock:
+            entry = self._feeds.get(feed_url) or {}
+        return {'etag': entry.get('etag'), 'modified': entry.get('modified')}
+
+    def hit(self, feed_url: str) -> Optional[List[Dict]]:
+        """Record a 304 response and return the articles parsed on the last change"""
+        with self._lock:
+            entry = self._feeds.get(feed_url)
+            if entry is None:
+                return None
+            self._stats['hits'] += 1
+            self.run_stats['hits'] += 1
+            return [dict(article) for article in entry.get('articles', [])]
+
+    def store(self, feed_url: str, etag: Optional[str], modified: Optional[str], articles: List[Dict]):
+        """Record a full download together with its new validators"""
+        with self._lock:
+            self._stats['misses'] += 1
+            self.run_stats['misses'] += 1
+            if etag or modified:
+                self._feeds[feed_url] = {
+                    'etag': etag,
+                    'modified': modified,
+                    'articles': [dict(article) for article in articles],
+                    'updated': datetime.now().isoformat()
+                }
+            else:
+                self._feeds.pop(feed_url, None)
+
+    def stats(self) -> Dict:
+        """Return cumulative and current-run hit/miss counts"""
+        with self._lock:
+            total = self._stats['hits'] + self._stats['misses']
+            return {
+                'hits': self._stats['hits'],
+                'misses': self._stats['misses'],
+                'hit_rate': round(self._stats['hits'] / total, 3) if total else 0.0,
+                'run_hits': self.run_stats['hits'],
+                'run_misses': self.run_stats['misses'],
+                'feeds': len(self._feeds)
+            }
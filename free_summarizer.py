@@ -1,5 +1,12 @@
+import atexit
+import multiprocessing
+import os
+import pickle
 import re
+import threading
+from concurrent.futures import ProcessPoolExecutor
 from collections import Counter
+from contextlib import contextmanager
 from sklearn.feature_extraction.text import TfidfVectorizer
 from sklearn.metrics.pairwise import cosine_similarity
 import numpy as np
@@ -7,21 +14,51 @@ import nltk
 from nltk.tokenize import sent_tokenize, word_tokenize
 from nltk.corpus import stopwords
 import logging
+from keyword_matcher import get_scorer
+from config import SUMMARIZATION_SETTINGS
+from summary_cache import get_summary_cache, summary_key
 
-# Download required NLTK data (run once)
-try:
-    nltk.data.find('tokenizers/punkt')
-except LookupError:
-    nltk.download('punkt')
-try:
-    nltk.data.find('corpora/stopwords')
-except LookupError:
-    nltk.download('stopwords')
+# NLTK data the summarizer needs; preflight_nltk.py fetches it at deploy time
+NLTK_RESOURCES = {'punkt': 'tokenizers/punkt', 'stopwords': 'corpora/stopwords'}
+
+_nltk_checked = False
+
+
+def ensure_nltk_data(download=True):
+    """Check the NLTK resources once per process, downloading any that are missing
+    
+    Returns the names of resources that are still unavailable.
+    """
+    global _nltk_checked
+    missing = []
+    for name, path in NLTK_RESOURCES.items():
+        try:
+            nltk.data.find(path)
+        except LookupError:
+            if not (download and nltk.download(name, quiet=True)):
+                missing.append(name)
+    _nltk_checked = True
+    return missing
 
 class FreeSummarizer:
     def __init__(self):
         self.logger = logging.getLogger(__name__)
+        if not _nltk_checked:
+            # Never download at runtime; preflight_nltk.py fetches the data at deploy time
+            missing = ensure_nltk_data(download=False)
+            if missing:
+                self.logger.warning(f"NLTK data missing ({', '.join(missing)}); run preflight_nltk.py at deploy time")
         self.stop_words = set(stopwords.words('english'))
+        self.scorer = get_scorer()
+        self.vectorizer = None
+        
+        # Reuse a persisted corpus vectorizer for summarize_many when one is configured
+        vectorizer_file = SUMMARIZATION_SETTINGS.get('vectorizer_file')
+        if vectorizer_file and os.path.exists(vectorizer_file):
+            try:
+                self.load_vectorizer(vectorizer_file)
+            except Exception as e:
+                self.logger.warning(f"Could not load vectorizer {vectorizer_file}: {str(e)}")
         
     def clean_text(self, text):
         """Clean and preprocess text"""
@@ -105,21 +142,115 @@ class FreeSummarizer:
             # Fallback to extractive summarization
             return self.extractive_summarize(text, max_sentences)
     
+    def summarize_many(self, texts, max_sentences=3):
+        """TF-IDF summaries for many texts from one vectorizer fitted across the corpus
+        
+        Texts follow the same rules as tfidf_summarize; sentence scores are the
+        sparse row means of a single TF-IDF matrix built for all articles.
+        Summaries already in the summary cache are reused.
+        """
+        return cached_summaries(texts, self._batch_cache_params(max_sentences),
+                                lambda misses: self._summarize_batch(misses, max_sentences))
+    
+    def _batch_cache_params(self, max_sentences):
+        return ('tfidf-corpus', {
+            'max_sentences': max_sentences,
+            'max_features': SUMMARIZATION_SETTINGS['tfidf_max_features'],
+            'vectorizer_file': SUMMARIZATION_SETTINGS.get('vectorizer_file') if self.vectorizer is not None else None
+        })
+    
+    def _batch_documents(self, texts, max_sentences):
+        """Split texts into (results, documents): short texts are final, the rest need scoring"""
+        results = list(texts)
+        documents = []
+        for index, text in enumerate(results):
+            if not text or len(text) < 100:
+                continue
+            cleaned = self.clean_text(text)
+            sentences = sent_tokenize(cleaned)
+            if len(sentences) <= max_sentences:
+                results[index] = cleaned
+            else:
+                documents.append((index, sentences))
+        return results, documents
+    
+    def batch_vectorizer(self, texts, max_sentences=3):
+        """The vectorizer _summarize_batch would score these texts with when run on all of them
+        
+        Lets chunks of one batch share a single vocabulary; None when there is nothing to fit.
+        """
+        if self.vectorizer is not None:
+            return self.vectorizer
+        _, documents = self._batch_documents(texts, max_sentences)
+        all_sentences = [sentence for _, sentences in documents for sentence in sentences]
+        if not all_sentences:
+            return None
+        try:
+            return self._new_vectorizer().fit(all_sentences)
+        except ValueError as e:
+            self.logger.error(f"Could not fit a batch vectorizer: {str(e)}")
+            return None
+    
+    def _summarize_batch(self, texts, max_sentences=3, vectorizer=None):
+        results, documents = self._batch_documents(texts, max_sentences)
+        if not documents:
+            return results
+        
+        vectorizer = vectorizer if vectorizer is not None else self.vectorizer
+        all_sentences = [sentence for _, sentences in documents for sentence in sentences]
+        try:
+            if vectorizer is not None:
+                tfidf_matrix = vectorizer.transform(all_sentences)
+            else:
+                tfidf_matrix = self._new_vectorizer().fit_transform(all_sentences)
+            # Mean over all vocabulary columns, computed on the sparse matrix in one call
+            scores = np.asarray(tfidf_matrix.mean(axis=1)).ravel()
+        except ValueError as e:
+            self.logger.error(f"Batch TF-IDF summarization failed, summarizing one by one: {str(e)}")
+            for index, _ in documents:
+                results[index] = self.tfidf_summarize(texts[index], max_sentences)
+            return results
+        
+        offset = 0
+        for index, sentences in documents:
+            sentence_scores = [(scores[offset + i], i) for i in range(len(sentences))]
+            offset += len(sentences)
+            
+            # Sort sentences by score and take top ones
+            sentence_scores.sort(reverse=True)
+            top_indices = sorted(idx for score, idx in sentence_scores[:max_sentences])
+            results[index] = ' '.join(sentences[i] for i in top_indices)
+        
+        return results
+    
+    def _new_vectorizer(self):
+        return TfidfVectorizer(
+            stop_words='english',
+            ngram_range=(1, 2),
+            max_features=SUMMARIZATION_SETTINGS['tfidf_max_features']
+        )
+    
+    def fit_vectorizer(self, texts):
+        """Fit a corpus-wide vectorizer on the sentences of the given texts and keep it for reuse"""
+        sentences = [sentence for text in texts if text for sentence in sent_tokenize(self.clean_text(text))]
+        self.vectorizer = self._new_vectorizer().fit(sentences)
+        return self.vectorizer
+    
+    def save_vectorizer(self, path):
+        """Persist the fitted vectorizer so later runs can skip fitting"""
+        with open(path, 'wb') as f:
+            pickle.dump(self.vectorizer, f)
+    
+    def load_vectorizer(self, path):
+        with open(path, 'rb') as f:
+            self.vectorizer = pickle.load(f)
+        return self.vectorizer
+    
     def keyword_based_summarize(self, text, max_sentences=3):
         """Keyword-based summarization using anti-aging related keywords"""
         if not text or len(text) < 100:
             return text
         
-        # Anti-aging related keywords (weighted)
-        keywords = {
-            'anti-aging': 3, 'longevity': 3, 'senescence': 3, 'aging': 2,
-            'telomere': 3, 'sirtuin': 3, 'rapamycin': 3, 'metformin': 3,
-            'NAD+': 3, 'mitochondria': 2, 'autophagy': 3, 'inflammation': 2,
-            'oxidative stress': 3, 'cellular aging': 3, 'biological age': 3,
-            'epigenetic clock': 3, 'senolytics': 3, 'gerontology': 2,
-            'research': 1, 'study': 1, 'clinical': 1, 'trial': 1
-        }
-        
         # Clean the text
         text = self.clean_text(text)
         sentences = sent_tokenize(text)
@@ -130,13 +261,8 @@ class FreeSummarizer:
         # Score sentences based on keyword presence
         sentence_scores = []
         for i, sentence in enumerate(sentences):
-            score = 0
-            sentence_lower = sentence.lower()
-            
-            for keyword, weight in keywords.items():
-                if keyword.lower() in sentence_lower:
-                    score += weight
-            
+            # Keyword weights come from the active scoring profile's precompiled matcher
+            score = self.scorer.sentence_score(sentence)
             sentence_scores.append((score, i))
         
         # Sort by score and take top sentences
@@ -154,25 +280,165 @@ class FreeSummarizer:
         if not text or len(text) < 100:
             return text
         
+        cache = get_summary_cache()
+        key = summary_key(text, 'free', method, {'max_sentences': max_sentences})
+        if cache is not None:
+            cached = cache.get(key)
+            if cached is not None:
+                return cached
+        
         try:
             if method == 'extractive':
-                return self.extractive_summarize(text, max_sentences)
+                summary = self.extractive_summarize(text, max_sentences)
             elif method == 'tfidf':
-                return self.tfidf_summarize(text, max_sentences)
+                summary = self.tfidf_summarize(text, max_sentences)
             elif method == 'keyword':
-                return self.keyword_based_summarize(text, max_sentences)
+                summary = self.keyword_based_summarize(text, max_sentences)
             elif method == 'hybrid':
                 # Try TF-IDF first, fallback to keyword-based, then extractive
                 try:
-                    return self.tfidf_summarize(text, max_sentences)
+                    summary = self.tfidf_summarize(text, max_sentences)
                 except:
                     try:
-                        return self.keyword_based_summarize(text, max_sentences)
+                        summary = self.keyword_based_summarize(text, max_sentences)
                     except:
-                        return self.extractive_summarize(text, max_sentences)
+                        summary = self.extractive_summarize(text, max_sentences)
             else:
-                return self.extractive_summarize(text, max_sentences)
+                summary = self.extractive_summarize(text, max_sentences)
                 
         except Exception as e:
             self.logger.error(f"Summarization failed: {str(e)}")
-            return text[:500] + "..." if len(text) > 500 else text 
\ No newline at end of file
+            return text[:500] + "..." if len(text) > 500 else text
+        
+        if cache is not None:
+            cache.put(key, 'free', summary)
+        return summary
+
+
+def cached_summaries(texts, cache_params, summarize_misses):
+    """Serve texts from the summary cache and summarize only the misses, in one call
+    
+    Texts too short to summarize are passed through untouched.
+    """
+    results = list(texts)
+    cache = get_summary_cache()
+    if cache is None:
+        return summarize_misses(results)
+    
+    model, params = cache_params
+    keys = {index: summary_key(text, 'free', model, params)
+            for index, text in enumerate(results) if text and len(text) >= 100}
+    found = cache.get_many(keys.values())
+    misses = [index for index, key in keys.items() if key not in found]
+    for index, key in keys.items():
+        if key in found:
+            results[index] = found[key]
+    
+    if misses:
+        summaries = summarize_misses([results[index] for index in misses])
+        for index, summary in zip(misses, summaries):
+            results[index] = summary
+        cache.put_many([(keys[index], results[index]) for index in misses], 'free')
+    return results
+
+
+# Process pool for CPU-bound batch summarization. Workers are started once and
+# reused across runs; each builds its FreeSummarizer (stopwords, scorer,
+# vectorizer) a single time in the initializer.
+_worker_summarizer = None
+_pool = None
+_pool_workers = 0
+_pool_users = 0
+_pool_cond = threading.Condition()
+
+
+def _init_worker():
+    global _worker_summarizer
+    _worker_summarizer = FreeSummarizer()
+
+
+def _summarize_chunk(texts, max_sentences, vectorizer):
+    # The parent process has already consulted and will fill the summary cache
+    return _worker_summarizer._summarize_batch(texts, max_sentences, vectorizer)
+
+
+@contextmanager
+def _leased_pool(workers):
+    """Borrow the shared worker pool, starting it on first use
+
+    A pool of another size is only replaced once no other run is still
+    submitting to it, so nobody schedules work on a pool that was shut down.
+    """
+    global _pool, _pool_workers, _pool_users
+    with _pool_cond:
+        while _pool is None or _pool_workers != workers:
+            if _pool is None:
+                context = multiprocessing.get_context(SUMMARIZATION_SETTINGS.get('start_method', 'spawn'))
+                _pool = ProcessPoolExecutor(max_workers=workers, mp_context=context, initializer=_init_worker)
+                _pool_workers = workers
+            elif _pool_users:
+                _pool_cond.wait()
+            else:
+                _pool.shutdown(wait=True)
+                _pool = None
+        _pool_users += 1
+        pool = _pool
+    try:
+        yield pool
+    finally:
+        with _pool_cond:
+            _pool_users -= 1
+            _pool_cond.notify_all()
+
+
+def shutdown_pool():
+    """Stop the shared worker pool once it is idle; it is started again on the next parallel run"""
+    global _pool
+    with _pool_cond:
+        _pool_cond.wait_for(lambda: _pool_users == 0)
+        if _pool is not None:
+            _pool.shutdown(wait=True)
+            _pool = None
+        _pool_cond.notify_all()
+
+
+atexit.register(shutdown_pool)
+
+
+def summarize_parallel(texts, max_sentences=3, workers=None, chunk_size=None):
+    """Summarize texts in chunks across the worker pool, preserving order
+    
+    Cached summaries are served first; each chunk of the remaining texts goes
+    through summarize_many in one worker, scored with one vectorizer fitted here
+    on all of them, so the summaries do not depend on the chunking. With a
+    single worker, or when there is only one chunk, the texts are summarized in
+    this process.
+    """
+    summarizer = FreeSummarizer()
+    return cached_summaries(texts, summarizer._batch_cache_params(max_sentences),
+                            lambda misses: _summarize_in_pool(summarizer, misses, max_sentences, workers, chunk_size))
+
+
+def _summarize_in_pool(summarizer, texts, max_sentences, workers, chunk_size):
+    workers = workers or SUMMARIZATION_SETTINGS.get('workers') or os.cpu_count() or 1
+    chunk_size = chunk_size or SUMMARIZATION_SETTINGS.get('chunk_size', 100)
+    chunks = [texts[start:start + chunk_size] for start in range(0, len(texts), chunk_size)]
+    
+    if workers <= 1 or len(chunks) <= 1:
+        return summarizer._summarize_batch(texts, max_sentences)
+    
+    logger = logging.getLogger(__name__)
+    vectorizer = summarizer.batch_vectorizer(texts, max_sentences)
+    try:
+        with _leased_pool(workers) as pool:
+            results = []
+            for summaries in pool.map(_summarize_chunk, chunks, [max_sentences] * len(chunks),
+                                      [vectorizer] * len(chunks)):
+                results.extend(summaries)
+        logger.info(f"Summarized {len(texts)} texts in {len(chunks)} chunks across {workers} workers")
+        return results
+    except Exception as e:
+        logger.error(f"Parallel summarization failed, summarizing in process: {str(e)}")
+        # Outside the lease, so this waits for other runs instead of pulling the pool from under them
+        shutdown_pool()
+        return summarizer._summarize_batch(texts, max_sentences)
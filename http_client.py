@@ -0,0 +1,78 @@
+import threading
+from typing import Dict, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util import make_headers
+from urllib3.util.retry import Retry
+
+from config import HTTP_SETTINGS, SCRAPING_SETTINGS
+
+# Encodings urllib3 can decode here: gzip/deflate always, br once brotli is installed
+ACCEPT_ENCODING = make_headers(accept_encoding=True)['accept-encoding']
+
+
+def _adapter(pool_maxsize: int) -> HTTPAdapter:
+    retries = Retry(
+        total=HTTP_SETTINGS.get('max_retries', 2),
+        backoff_factor=0.5,
+        status_forcelist=(502, 503, 504),
+        allowed_methods=frozenset(['GET', 'HEAD'])
+    )
+    return HTTPAdapter(
+        pool_connections=HTTP_SETTINGS.get('pool_connections', 20),
+        pool_maxsize=pool_maxsize,
+        max_retries=retries
+    )
+
+
+def build_session(host_pool_sizes: Optional[Dict[str, int]] = None) -> requests.Session:
+    """Create a keep-alive session with a connection pool per host
+
+    Hosts listed in host_pool_sizes get an adapter with their own pool size;
+    every other host uses HTTP_SETTINGS['pool_maxsize'].
+    """
+    session = requests.Session()
+    session.headers.update({
+        'User-Agent': SCRAPING_SETTINGS['user_agent'],
+        'Accept-Encoding': ACCEPT_ENCODING,
+        'Connection': 'keep-alive'
+    })
+    default = _adapter(HTTP_SETTINGS.get('pool_maxsize', 4))
+    session.mount('https://', default)
+    session.mount('http://', default)
+    host_pool_sizes = HTTP_SETTINGS.get('host_pool_sizes', {}) if host_pool_sizes is None else host_pool_sizes
+    for host, size in host_pool_sizes.items():
+        adapter = _adapter(size)
+        # requests picks the longest matching mount prefix
+        session.mount(f'https://{host}/', adapter)
+        session.mount(f'http://{host}/', adapter)
+    return session
+
+
+def wire_bytes(response) -> int:
+    """Body bytes received for a response, before gzip/deflate decoding
+
+    For a streamed response closed early this is only what was read. Falls
+    back to Content-Length when the raw stream does not report a position.
+    """
+    try:
+        return int(response.raw.tell())
+    except (AttributeError, TypeError, ValueError, OSError):
+        try:
+            return int(response.headers.get('Content-Length', 0))
+        except (TypeError, ValueError):
+            return 0
+
+
+_session = None
+_session_lock = threading.Lock()
+
+
+def get_session() -> requests.Session:
+    """Return the process-wide session shared by feed, page and full-text fetches"""
+    global _session
+    with _session_lock:
+        if _session is None:
+            _session = build_session()
+        return _session
@@ -0,0 +1,250 @@
+import re
+import threading
+from collections import defaultdict
+from typing import Dict, Iterable, List, Set
+
+import numpy as np
+import pandas as pd
+
+from config import SCORING_PROFILES, SCRAPING_SETTINGS
+
+try:
+    import ahocorasick
+except ImportError:  # Optional C accelerator; the regex trie below gives identical results
+    ahocorasick = None
+
+
+class KeywordMatcher:
+    """Finds which of a fixed set of keywords occur in a text, in one pass
+
+    With pyahocorasick installed the keywords are compiled into an
+    Aho-Corasick automaton, which reports every occurrence including
+    overlapping ones. Otherwise the keywords are compiled into one prefix-trie regex whose greedy groups
+    match the longest keyword at a position. Searching again from the next
+    character visits every position where some keyword starts, and the
+    shorter keywords starting at the same position are exactly the match's
+    keyword prefixes, so the result equals running `keyword in text` for each
+    keyword separately, overlaps included.
+    """
+
+    def __init__(self, keywords: Iterable[str]):
+        self.keywords = sorted({keyword.lower() for keyword in keywords if keyword}, key=len, reverse=True)
+        self._prefixes = {
+            keyword: [other for other in self.keywords if other != keyword and keyword.startswith(other)]
+            for keyword in self.keywords
+        }
+        self._pattern = re.compile(self._trie_pattern(self.keywords)) if self.keywords else None
+        self._automaton = None
+        if ahocorasick is not None and self.keywords:
+            self._automaton = ahocorasick.Automaton()
+            for keyword in self.keywords:
+                self._automaton.add_word(keyword, keyword)
+            self._automaton.make_automaton()
+
+    @classmethod
+    def _trie_pattern(cls, keywords: List[str]) -> str:
+        """Build a prefix-trie regex so each position is checked in O(keyword length)
+
+        Optional groups are greedy, so the longest keyword at a position wins.
+        """
+        trie = {}
+        for keyword in keywords:
+            node = trie
+            for char in keyword:
+                node = node.setdefault(char, {})
+            node[''] = {}
+        return cls._node_pattern(trie)
+
+    @classmethod
+    def _node_pattern(cls, node: Dict) -> str:
+        branches = [re.escape(char) + cls._node_pattern(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ''
+        body = branches[0] if len(branches) == 1 else f"(?:{'|'.join(branches)})"
+        return f"(?:{body})?" if '' in node else body
+
+    @property
+    def has_automaton(self) -> bool:
+        return self._automaton is not None
+
+    def find(self, text: str) -> Set[str]:
+        """Return the keywords occurring in an already lower-cased text"""
+        if self._pattern is None or not text:
+            return set()
+        if self._automaton is not None:
+            return {keyword for _, keyword in self._automaton.iter(text)}
+        found = set()
+        search = self._pattern.search
+        match = search(text)
+        while match is not None:
+            keyword = match.group()
+            found.add(keyword)
+            found.update(self._prefixes[keyword])
+            # Resume just after the match start so overlapping keywords are still seen
+            match = search(text, match.start() + 1)
+        return found
+
+
+class RelevanceScorer:
+    """A scoring profile from config compiled into one shared keyword matcher
+
+    Serves both hot paths: article relevance in the scraper filter and
+    sentence weights in FreeSummarizer.keyword_based_summarize.
+    """
+
+    def __init__(self, profile: Dict = None, name: str = 'custom'):
+        profile = profile or SCORING_PROFILES['default']
+        self.name = name
+        self.threshold = profile.get('threshold', 5)
+        self.missing_required_penalty = profile.get('missing_required_penalty', -10)
+
+        # Weights always applied, and weights only applied once a required keyword matched.
+        # Duplicates add up just like repeated substring scans would.
+        always = {'title': defaultdict(int), 'summary': defaultdict(int), 'source': defaultdict(int)}
+        gated = {'title': defaultdict(int), 'summary': defaultdict(int), 'source': defaultdict(int)}
+        required = set()
+        words = []
+        for group in profile.get('groups', {}).values():
+            keywords = [keyword.lower() for keyword in group.get('keywords', [])]
+            words.extend(keywords)
+            if group.get('required'):
+                required.update(keywords)
+            target = gated if group.get('requires_primary') else always
+            for field in target:
+                weight = group.get(f'{field}_weight', 0)
+                if weight:
+                    for keyword in keywords:
+                        target[field][keyword] += weight
+
+        self.title_weights, self.summary_weights, self.source_weights = (dict(always[f]) for f in always)
+        self.title_bonus, self.summary_bonus, self.source_bonus = (dict(gated[f]) for f in gated)
+        self.primary_keywords = frozenset(required)
+
+        self.sentence_weights = defaultdict(int)
+        for keyword, weight in profile.get('summary_keywords', {}).items():
+            self.sentence_weights[keyword.lower()] += weight
+        self.sentence_weights = dict(self.sentence_weights)
+
+        self.matcher = KeywordMatcher(words + list(self.sentence_weights))
+
+    def _has_primary(self, title_hits: Set[str], summary_hits: Set[str]) -> bool:
+        if not self.primary_keywords:
+            return True
+        return not (self.primary_keywords.isdisjoint(title_hits) and self.primary_keywords.isdisjoint(summary_hits))
+
+    def score(self, article: Dict) -> int:
+        """Score one article; identical to scanning every keyword list separately"""
+        find = self.matcher.find
+        title_hits = find((article.get('title') or '').lower())
+        summary_hits = find((article.get('summary') or '').lower())
+        source_hits = None
+
+        score = 0
+        for keyword in title_hits:
+            score += self.title_weights.get(keyword, 0)
+        for keyword in summary_hits:
+            score += self.summary_weights.get(keyword, 0)
+        if self.source_weights:
+            source_hits = find((article.get('source') or '').lower())
+            for keyword in source_hits:
+                score += self.source_weights.get(keyword, 0)
+
+        if self._has_primary(title_hits, summary_hits):
+            for keyword in title_hits:
+                score += self.title_bonus.get(keyword, 0)
+            for keyword in summary_hits:
+                score += self.summary_bonus.get(keyword, 0)
+            if self.source_bonus:
+                if source_hits is None:
+                    source_hits = find((article.get('source') or '').lower())
+                for keyword in source_hits:
+                    score += self.source_bonus.get(keyword, 0)
+        else:
+            score += self.missing_required_penalty
+
+        return max(0, int(score))
+
+    def score_many(self, articles: List[Dict]) -> List[int]:
+        """Score a list of articles with the same compiled matcher"""
+        score = self.score
+        return [score(article) for article in articles]
+
+    def sentence_score(self, sentence: str) -> int:
+        """Sum the profile's summary keyword weights found in a sentence"""
+        return sum(self.sentence_weights.get(keyword, 0) for keyword in self.matcher.find(sentence.lower()))
+
+    def score_frame(self, df: pd.DataFrame) -> np.ndarray:
+        """Score every row of a frame with title/summary/source columns at once
+
+        Builds boolean keyword hit matrices with vectorized substring tests
+        and combines them with the weight vectors; gives the same scores as score().
+        """
+        keywords = self.matcher.keywords
+        if df.empty or not keywords:
+            return np.zeros(len(df), dtype=int)
+
+        def lowered(column: str) -> pd.Series:
+            if column not in df:
+                return pd.Series([''] * len(df), index=df.index)
+            return df[column].fillna('').astype(str).str.lower()
+
+        def hit_matrix(texts: pd.Series, words: List[str]) -> np.ndarray:
+            values = texts.tolist()
+            matrix = np.zeros((len(values), len(words)), dtype=bool)
+            if self.matcher.has_automaton:
+                # One automaton pass per cell, independent of the number of keywords
+                columns = {word: column for column, word in enumerate(words)}
+                rows, cols = [], []
+                for row, text in enumerate(values):
+                    for word in self.matcher.find(text):
+                        column = columns.get(word)
+                        if column is not None:
+                            rows.append(row)
+                            cols.append(column)
+                matrix[rows, cols] = True
+            else:
+                # One column-wise substring test per keyword; CPython's `in` search
+                # beats both pandas .str.contains and np.char.find here
+                for column, word in enumerate(words):
+                    matrix[:, column] = np.fromiter((word in text for text in values), dtype=bool, count=len(values))
+            return matrix
+
+        def vector(weights: Dict[str, int], words: List[str]) -> np.ndarray:
+            return np.array([weights.get(word, 0) for word in words], dtype=np.int64)
+
+        title_hits = hit_matrix(lowered('title'), keywords)
+        summary_hits = hit_matrix(lowered('summary'), keywords)
+        source_words = sorted(set(self.source_weights) | set(self.source_bonus))
+        source_hits = hit_matrix(lowered('source'), source_words)
+
+        if self.primary_keywords:
+            primary = np.array([word in self.primary_keywords for word in keywords], dtype=bool)
+            has_primary = (title_hits[:, primary] | summary_hits[:, primary]).any(axis=1)
+        else:
+            has_primary = np.ones(len(df), dtype=bool)
+
+        base = (title_hits @ vector(self.title_weights, keywords)
+                + summary_hits @ vector(self.summary_weights, keywords)
+                + source_hits @ vector(self.source_weights, source_words))
+        bonus = (title_hits @ vector(self.title_bonus, keywords)
+                 + summary_hits @ vector(self.summary_bonus, keywords)
+                 + source_hits @ vector(self.source_bonus, source_words))
+        scores = base + np.where(has_primary, bonus, self.missing_required_penalty)
+        return np.maximum(scores, 0).astype(int)
+
+
+_scorers = {}
+_scorers_lock = threading.Lock()
+
+
+def get_scorer(profile_name: str = None) -> RelevanceScorer:
+    """Return the compiled scorer for a profile, building it only once per process"""
+    profile_name = profile_name or SCRAPING_SETTINGS.get('scoring_profile', 'default')
+    with _scorers_lock:
+        scorer = _scorers.get(profile_name)
+        if scorer is None:
+            if profile_name not in SCORING_PROFILES:
+                raise ValueError(f"Unknown scoring profile '{profile_name}', expected one of {', '.join(SCORING_PROFILES)}")
+            scorer = RelevanceScorer(SCORING_PROFILES[profile_name], profile_name)
+            _scorers[profile_name] = scorer
+        return scorer
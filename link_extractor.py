@@ -0,0 +1,100 @@
+import codecs
+import itertools
+import re
+from html.parser import HTMLParser
+from typing import Callable, Iterable, List, Tuple, Union
+from urllib.parse import urljoin, urldefrag
+
+# <meta charset="..."> or <meta http-equiv="Content-Type" content="text/html; charset=...">
+_META_CHARSET_RE = re.compile(rb'<meta[^>]+charset\s*=\s*["\']?\s*([a-zA-Z0-9_.:-]+)', re.IGNORECASE)
+
+
+class AnchorParser(HTMLParser):
+    """Incremental <a href> collector that stops once enough accepted links are found
+
+    Relative hrefs are resolved with urljoin against the page URL, or the
+    page's <base href> when it declares one.
+    """
+
+    def __init__(self, base_url: str, accept: Callable[[str], bool], limit: int):
+        super().__init__(convert_charrefs=True)
+        self.base_url = base_url
+        self.accept = accept
+        self.limit = limit
+        self.links = []
+        self.done = False
+        self.bytes_read = 0
+        self._seen = set()
+        self._href = None
+        self._text = []
+
+    def handle_starttag(self, tag, attrs):
+        if tag == 'base':
+            href = dict(attrs).get('href')
+            if href:
+                self.base_url = urljoin(self.base_url, href.strip())
+        elif tag == 'a':
+            # An unclosed anchor ends where the next one starts
+            if self._href is not None:
+                self._finish()
+            href = dict(attrs).get('href')
+            if href and not self.done:
+                self._href = href.strip()
+                self._text = []
+
+    def handle_endtag(self, tag):
+        if tag == 'a' and self._href is not None:
+            self._finish()
+
+    def handle_data(self, data):
+        if self._href is not None:
+            self._text.append(data)
+
+    def _finish(self):
+        url = urldefrag(urljoin(self.base_url, self._href))[0]
+        title = ' '.join(''.join(self._text).split())
+        self._href = None
+        if url.startswith(('http://', 'https://')) and url not in self._seen and self.accept(url):
+            self._seen.add(url)
+            self.links.append((url, title))
+            if len(self.links) >= self.limit:
+                self.done = True
+
+    def feed_until_done(self, chunks: Iterable[Union[str, bytes]], encoding: str = 'utf-8') -> List[Tuple[str, str]]:
+        """Feed chunks until the limit is reached or the input ends; returns (url, title) pairs"""
+        decoder = codecs.getincrementaldecoder(encoding)(errors='replace')
+        for chunk in chunks:
+            self.bytes_read += len(chunk)
+            self.feed(decoder.decode(chunk) if isinstance(chunk, bytes) else chunk)
+            if self.done:
+                return self.links
+        self.feed(decoder.decode(b'', final=True))
+        self.close()
+        if self._href is not None:
+            self._finish()
+        return self.links
+
+
+def extract_links(response, accept: Callable[[str], bool], limit: int,
+                  chunk_size: int = 16384) -> List[Tuple[str, str]]:
+    """Stream a requests response through AnchorParser, closing it as soon as enough links are found"""
+    parser = AnchorParser(response.url, accept, limit)
+    try:
+        chunks = response.iter_content(chunk_size=chunk_size)
+        if 'charset' in response.headers.get('Content-Type', '').lower():
+            encoding = response.encoding
+        else:
+            # Without a header charset requests assumes ISO-8859-1 for text/html; the page's own
+            # <meta charset> (normally within the first chunk) is the better guess, then UTF-8
+            first = next(chunks, b'')
+            chunks = itertools.chain([first], chunks)
+            match = _META_CHARSET_RE.search(first)
+            encoding = match.group(1).decode('ascii') if match else 'utf-8'
+        encoding = encoding or 'utf-8'
+        try:
+            codecs.lookup(encoding)
+        except LookupError:
+            encoding = 'utf-8'
+        return parser.feed_until_done(chunks, encoding)
+    finally:
+        response.close()
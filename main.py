@@ -1,6 +1,8 @@
-import schedule
-import time
 import os
+from datetime import datetime
+from config import TARGET_WEBSITES, OUTPUT_SETTINGS, SCHEDULER_SETTINGS
+from run_registry import get_run_registry
+from scheduler import SourceScheduler
 from scraper import AntiAgingScraper
 from summarizer import Summarizer
 
@@ -9,24 +11,47 @@ OPENAI_API_KEY = os.getenv('OPENAI_API_KEY')  # Set this in your environment
 # Set to True to enable summarization
 ENABLE_SUMMARIZATION = True if OPENAI_API_KEY else False
 
-def run_scraper():
-    scraper = AntiAgingScraper()
-    articles = scraper.scrape_all_sources()
+def run_scraper(websites=None):
+    """Scrape under the shared run lock; returns new items per source, or None if another process is scraping"""
+    websites = TARGET_WEBSITES if websites is None else websites
+    registry = get_run_registry()
+    owner = registry.acquire()
+    if owner is None:
+        print("Another process is already scraping.")
+        return None
+    heartbeat = registry.keep_alive(owner)
+    try:
+        scraper = AntiAgingScraper()
+        scraper.metrics.listeners.append(registry.track_progress)
+        articles = scraper.scrape_all_sources(websites)
 
-    if ENABLE_SUMMARIZATION and articles:
-        summarizer = Summarizer(OPENAI_API_KEY)
-        for article in articles:
-            if 'summary' in article and article['summary']:
-                article['summary'] = summarizer.summarize(article['summary'])
+        if ENABLE_SUMMARIZATION and articles:
+            summarizer = Summarizer(OPENAI_API_KEY)
+            to_summarize = [article for article in articles if article.get('summary')]
+            summaries = summarizer.summarize_many([article['summary'] for article in to_summarize])
+            for article, summary in zip(to_summarize, summaries):
+                article['summary'] = summary
 
-    scraper.save_results(articles)
+        scraper.save_results(articles)
+        registry.finish_run(owner, last_run=datetime.now().isoformat(), articles_count=len(articles))
+        return scraper.new_item_counts(websites)
+    except Exception as e:
+        registry.finish_run(owner, error=str(e))
+        raise
+    finally:
+        heartbeat.set()
+        registry.release(owner)
+
+def run_batch(scheduler, websites):
+    counts = run_scraper(websites)
+    if counts is None:
+        scheduler.defer(websites, SCHEDULER_SETTINGS['retry_seconds'])
+    else:
+        scheduler.record(counts)
 
 if __name__ == "__main__":
-    # Run once immediately
-    run_scraper()
-    # Schedule to run daily at 7am
-    schedule.every().day.at("07:00").do(run_scraper)
-    print("Scheduled scraper to run daily at 7:00 AM.")
-    while True:
-        schedule.run_pending()
-        time.sleep(60) 
\ No newline at end of file
+    # Sources without history are due immediately; after that each one is
+    # polled at an interval adapted to how often its feed publishes
+    scheduler = SourceScheduler(TARGET_WEBSITES, OUTPUT_SETTINGS['schedule_state_file'])
+    print("Scraping sources as they come due (state in schedule_state.json).")
+    scheduler.run_forever(lambda websites: run_batch(scheduler, websites))
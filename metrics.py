@@ -0,0 +1,182 @@
+import json
+import logging
+import os
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from config import OUTPUT_SETTINGS
+
+# Per-source values that are durations; everything else is a count
+SOURCE_TIMINGS = ('fetch_seconds', 'parse_seconds', 'seen_seconds', 'filter_seconds')
+
+
+class RunMetrics:
+    """Stage and per-source measurements for one scrape run, written as one JSONL record"""
+
+    def __init__(self):
+        self.logger = logging.getLogger(__name__)
+        self._lock = threading.Lock()
+        self.started = time.time()
+        self.stages = {}
+        self.sources = defaultdict(lambda: defaultdict(float))
+        self.finished = False
+        # Callables receiving (event, data) progress updates while the run is going
+        self.listeners = []
+
+    def notify(self, event: str, **data):
+        """Pass a progress event to every listener; a failing listener never breaks the run"""
+        for listener in list(self.listeners):
+            try:
+                listener(event, data)
+            except Exception as e:
+                self.logger.warning(f"Progress listener failed on {event}: {str(e)}")
+
+    @contextmanager
+    def stage(self, name: str, articles_in: Optional[int] = None):
+        """Time a pipeline stage; set result['articles_out'] inside the block to record its output"""
+        result = {}
+        start = time.perf_counter()
+        self.notify('stage_started', stage=name, articles_in=articles_in)
+        try:
+            yield result
+        finally:
+            self.record_stage(name, time.perf_counter() - start, articles_in, result.get('articles_out'))
+
+    def record_stage(self, name: str, seconds: float, articles_in: Optional[int] = None,
+                     articles_out: Optional[int] = None):
+        with self._lock:
+            entry = self.stages.setdefault(name, {'seconds': 0.0})
+            entry['seconds'] += seconds
+            if articles_in is not None:
+                entry['articles_in'] = entry.get('articles_in', 0) + articles_in
+            if articles_out is not None:
+                entry['articles_out'] = entry.get('articles_out', 0) + articles_out
+        self.notify('stage_finished', stage=name, seconds=round(seconds, 4), articles_in=articles_in,
+                    articles_out=articles_out)
+
+    def add_source(self, source: str, **values):
+        """Add to the counters and timings of one source, e.g. bytes=..., fetch_seconds=..."""
+        with self._lock:
+            counters = self.sources[source]
+            for key, value in values.items():
+                counters[key] += value
+
+    def record(self) -> Dict:
+        with self._lock:
+            sources = {
+                name: {key: round(value, 4) if key in SOURCE_TIMINGS else int(value) for key, value in counters.items()}
+                for name, counters in self.sources.items()
+            }
+            return {
+                'started': datetime.fromtimestamp(self.started).isoformat(),
+                'duration_seconds': round(time.time() - self.started, 4),
+                'stages': {name: {key: round(value, 4) if key == 'seconds' else value for key, value in entry.items()}
+                           for name, entry in self.stages.items()},
+                'sources': sources,
+                'totals': {
+                    key: round(sum(counters.get(key, 0) for counters in sources.values()), 4)
+                    for key in sorted({key for counters in sources.values() for key in counters})
+                }
+            }
+
+    def finish(self, **extra) -> Dict:
+        """Close the run: append its record to the metrics file and publish it to the registry"""
+        record = self.record()
+        record.update(extra)
+        self.finished = True
+        registry.observe(record)
+        path = OUTPUT_SETTINGS.get('metrics_file')
+        if path:
+            try:
+                with open(path, 'a', encoding='utf-8') as f:
+                    f.write(json.dumps(record) + '\n')
+            except Exception as e:
+                self.logger.warning(f"Could not write run metrics to {path}: {str(e)}")
+        return record
+
+
+class MetricsRegistry:
+    """Latest run record plus cumulative run counters, rendered in Prometheus text format"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.last_run = None
+        self.runs = 0
+
+    def observe(self, record: Dict):
+        with self._lock:
+            self.last_run = record
+            self.runs += 1
+
+    def latest(self) -> Optional[Dict]:
+        """Return the last run of this process, or the last one recorded on disk by another process"""
+        with self._lock:
+            if self.last_run is not None:
+                return self.last_run
+        return read_last_record(OUTPUT_SETTINGS.get('metrics_file'))
+
+    def render(self, gauges: Optional[Dict[str, float]] = None) -> str:
+        """Prometheus exposition of the latest run, plus any extra values from the caller"""
+        lines = []
+
+        def metric(name: str, kind: str, help_text: str, samples: List):
+            if not samples:
+                return
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            for labels, value in samples:
+                label_text = ','.join(f'{key}="{_escape(label)}"' for key, label in labels.items())
+                lines.append(f"{name}{{{label_text}}} {value}" if label_text else f"{name} {value}")
+
+        with self._lock:
+            runs = self.runs
+        metric('scraper_runs_total', 'counter', 'Scrape runs finished by this process', [({}, runs)])
+
+        record = self.latest()
+        if record is not None:
+            started = datetime.fromisoformat(record['started']).timestamp()
+            metric('scraper_last_run_start_timestamp_seconds', 'gauge', 'Start time of the last run', [({}, started)])
+            metric('scraper_last_run_duration_seconds', 'gauge', 'Wall time of the last run',
+                   [({}, record['duration_seconds'])])
+            stages = record.get('stages', {})
+            metric('scraper_stage_duration_seconds', 'gauge', 'Duration of each pipeline stage in the last run',
+                   [({'stage': name}, entry['seconds']) for name, entry in stages.items()])
+            metric('scraper_stage_articles', 'gauge', 'Articles entering and leaving each stage in the last run',
+                   [({'stage': name, 'direction': direction}, entry[f'articles_{direction}'])
+                    for name, entry in stages.items() for direction in ('in', 'out') if f'articles_{direction}' in entry])
+            sources = record.get('sources', {})
+            for key in sorted({key for counters in sources.values() for key in counters}):
+                metric(f"scraper_source_{key}", 'gauge', f"{key.replace('_', ' ').capitalize()} per source in the last run",
+                       [({'source': name}, counters[key]) for name, counters in sources.items() if key in counters])
+
+        for name, value in (gauges or {}).items():
+            # Process-lifetime counts follow the Prometheus _total naming for counters
+            metric(name, 'counter' if name.endswith('_total') else 'gauge', name.replace('_', ' '), [({}, value)])
+
+        return '\n'.join(lines) + '\n'
+
+
+def _escape(value) -> str:
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def read_last_record(path: Optional[str]) -> Optional[Dict]:
+    """Return the last JSON line of the metrics file without reading the whole file"""
+    if not path or not os.path.exists(path):
+        return None
+    try:
+        with open(path, 'rb') as f:
+            f.seek(0, os.SEEK_END)
+            size = f.tell()
+            f.seek(max(0, size - 65536))
+            lines = f.read().splitlines()
+        return json.loads(lines[-1]) if lines else None
+    except Exception:
+        return None
+
+
+registry = MetricsRegistry()
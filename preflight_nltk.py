@@ -0,0 +1,20 @@
+#!/usr/bin/env python3
+"""
+Deploy-time check that the NLTK data used by the free summarizer is installed,
+so the app never downloads it while importing or serving requests
+"""
+import sys
+
+from free_summarizer import NLTK_RESOURCES, ensure_nltk_data
+
+def main():
+    print(f"Checking NLTK resources: {', '.join(NLTK_RESOURCES)}")
+    missing = ensure_nltk_data()
+    if missing:
+        print(f"✗ Missing NLTK resources: {', '.join(missing)}")
+        return 1
+    print("✓ NLTK resources available")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
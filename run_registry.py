@@ -0,0 +1,260 @@
+import json
+import logging
+import os
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from typing import Dict, List, Optional, Tuple
+
+from config import API_SETTINGS, OUTPUT_SETTINGS, SCRAPING_SETTINGS
+
+# Status reported before the first run, matching the old in-process status dict
+DEFAULT_STATUS = {
+    'last_run': None,
+    'articles_count': 0,
+    'error': None,
+    'stage': None,
+    'sources_total': 0,
+    'sources_done': 0,
+    'last_source': None,
+    'started': None
+}
+
+
+def _pid_alive(pid: int) -> bool:
+    if os.name == 'nt':
+        # os.kill(pid, 0) would send CTRL_C_EVENT on Windows; rely on the heartbeat there
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+class RunRegistry:
+    """Cross-process scrape lock and shared run status in one SQLite file
+
+    Every web worker and scheduler process opens the same database: acquire()
+    takes the single run lock inside an IMMEDIATE transaction, so only one
+    process scrapes at a time, and all of them read the same status row. The
+    lock holder refreshes a heartbeat while it runs; a lock whose heartbeat is
+    older than stale_seconds, or whose process is gone, can be taken over.
+    """
+
+    def __init__(self, db_path: str, stale_seconds: float = 120, heartbeat_seconds: float = 15,
+                 events_retained: int = 1000):
+        self.db_path = db_path
+        self.stale_seconds = stale_seconds
+        self.heartbeat_seconds = heartbeat_seconds
+        self.events_retained = events_retained
+        self.host = socket.gethostname()
+        self.logger = logging.getLogger(__name__)
+        self._lock = threading.Lock()
+        # Heartbeat stop events by owner, set when the run finishes or releases the lock
+        self._heartbeats = {}
+        self._conn = sqlite3.connect(db_path, timeout=30, isolation_level=None, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._create_schema()
+
+    def _create_schema(self):
+        with self._lock:
+            self._conn.execute('''
+                CREATE TABLE IF NOT EXISTS run_lock (
+                    id INTEGER PRIMARY KEY CHECK (id = 1),
+                    owner TEXT NOT NULL,
+                    host TEXT NOT NULL,
+                    pid INTEGER NOT NULL,
+                    acquired REAL NOT NULL,
+                    heartbeat REAL NOT NULL
+                )
+            ''')
+            self._conn.execute('''
+                CREATE TABLE IF NOT EXISTS run_status (
+                    id INTEGER PRIMARY KEY CHECK (id = 1),
+                    status TEXT NOT NULL,
+                    updated REAL NOT NULL
+                )
+            ''')
+            self._conn.execute('''
+                CREATE TABLE IF NOT EXISTS run_events (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    created REAL NOT NULL,
+                    event TEXT NOT NULL,
+                    data TEXT NOT NULL
+                )
+            ''')
+
+    @contextmanager
+    def _transaction(self):
+        """Serialize writers across processes: BEGIN IMMEDIATE takes SQLite's write lock up front"""
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield self._conn
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._conn.execute("COMMIT")
+
+    def _is_live(self, row, now: float) -> bool:
+        owner, host, pid, heartbeat = row
+        if now - heartbeat > self.stale_seconds:
+            return False
+        return host != self.host or _pid_alive(pid)
+
+    def acquire(self) -> Optional[str]:
+        """Take the run lock; returns an owner token, or None while another live run holds it"""
+        owner = f"{self.host}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        now = time.time()
+        with self._transaction() as conn:
+            row = conn.execute("SELECT owner, host, pid, heartbeat FROM run_lock WHERE id = 1").fetchone()
+            if row is not None and self._is_live(row, now):
+                return None
+            if row is not None:
+                self.logger.warning(f"Taking over stale scrape lock from {row[0]}")
+            conn.execute(
+                "INSERT OR REPLACE INTO run_lock (id, owner, host, pid, acquired, heartbeat) VALUES (1, ?, ?, ?, ?, ?)",
+                (owner, self.host, os.getpid(), now, now)
+            )
+            self._write_status(conn, {'error': None, 'stage': None, 'sources_total': 0, 'sources_done': 0,
+                                      'last_source': None, 'started': now})
+            self._append_event(conn, 'run_started', {'owner': owner, 'started': now})
+            # Keep the event log bounded; late subscribers only need the recent tail
+            conn.execute("DELETE FROM run_events WHERE id <= (SELECT MAX(id) FROM run_events) - ?",
+                         (self.events_retained,))
+        return owner
+
+    def heartbeat(self, owner: str) -> bool:
+        """Refresh the lock; False means it was lost (e.g. taken over after a long stall)"""
+        with self._transaction() as conn:
+            return conn.execute("UPDATE run_lock SET heartbeat = ? WHERE id = 1 AND owner = ?",
+                                (time.time(), owner)).rowcount == 1
+
+    def release(self, owner: str):
+        self._stop_heartbeat(owner)
+        with self._transaction() as conn:
+            conn.execute("DELETE FROM run_lock WHERE id = 1 AND owner = ?", (owner,))
+
+    def keep_alive(self, owner: str) -> threading.Event:
+        """Heartbeat the lock from a daemon thread until the returned event is set"""
+        stop = threading.Event()
+
+        def beat():
+            while not stop.wait(self.heartbeat_seconds):
+                try:
+                    if not self.heartbeat(owner):
+                        self.logger.warning(f"Scrape lock {owner} was lost")
+                        return
+                except sqlite3.Error as e:
+                    self.logger.warning(f"Could not refresh scrape lock: {str(e)}")
+
+        self._heartbeats[owner] = stop
+        threading.Thread(target=beat, name='run-heartbeat', daemon=True).start()
+        return stop
+
+    def _stop_heartbeat(self, owner: str):
+        stop = self._heartbeats.pop(owner, None)
+        if stop is not None:
+            stop.set()
+
+    def _read_status(self, conn) -> Dict:
+        row = conn.execute("SELECT status FROM run_status WHERE id = 1").fetchone()
+        status = dict(DEFAULT_STATUS)
+        if row is not None:
+            status.update(json.loads(row[0]))
+        return status
+
+    def _write_status(self, conn, changes: Dict, increments: Optional[Dict] = None):
+        status = self._read_status(conn)
+        status.update(changes)
+        for key, amount in (increments or {}).items():
+            status[key] = (status.get(key) or 0) + amount
+        conn.execute("INSERT OR REPLACE INTO run_status (id, status, updated) VALUES (1, ?, ?)",
+                     (json.dumps(status), time.time()))
+
+    def update_status(self, increments: Optional[Dict] = None, **changes):
+        """Merge fields into the shared status, e.g. update_status(stage='save') or increments={'sources_done': 1}"""
+        with self._transaction() as conn:
+            self._write_status(conn, changes, increments)
+
+    def _append_event(self, conn, event: str, data: Dict) -> int:
+        return conn.execute("INSERT INTO run_events (created, event, data) VALUES (?, ?, ?)",
+                            (time.time(), event, json.dumps(data))).lastrowid
+
+    def track_progress(self, event: str, data: Dict):
+        """RunMetrics listener mirroring scraper progress into the shared status and event log"""
+        changes, increments = {}, None
+        if event == 'sources':
+            changes = {'sources_total': data['total'], 'sources_done': 0}
+        elif event == 'source_finished':
+            changes, increments = {'last_source': data['source']}, {'sources_done': 1}
+        elif event == 'stage_started':
+            changes = {'stage': data['stage']}
+        with self._transaction() as conn:
+            if changes or increments:
+                self._write_status(conn, changes, increments)
+            if event == 'source_finished':
+                status = self._read_status(conn)
+                data = dict(data, sources_done=status['sources_done'], sources_total=status['sources_total'])
+            self._append_event(conn, event, data)
+
+    def finish_run(self, owner: str, **fields):
+        """Record the outcome of a run (e.g. last_run and articles_count, or error), release its lock and announce it
+
+        All three happen in one transaction, so once run_finished is out no
+        process still reports the run as live or refuses a new one.
+        """
+        self._stop_heartbeat(owner)
+        with self._transaction() as conn:
+            self._write_status(conn, dict(fields, stage=None))
+            conn.execute("DELETE FROM run_lock WHERE id = 1 AND owner = ?", (owner,))
+            self._append_event(conn, 'run_finished', dict(self._read_status(conn), is_running=False))
+
+    def events_since(self, last_id: int, limit: int = 500) -> List[Tuple[int, str, Dict]]:
+        """Events after last_id in order, as (id, event, data)"""
+        with self._lock:
+            rows = self._conn.execute("SELECT id, event, data FROM run_events WHERE id > ? ORDER BY id LIMIT ?",
+                                      (last_id, limit)).fetchall()
+        return [(row[0], row[1], json.loads(row[2])) for row in rows]
+
+    def last_event_id(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COALESCE(MAX(id), 0) FROM run_events").fetchone()[0]
+
+    def status(self) -> Dict:
+        """Shared status as seen by every process; is_running reflects a live lock holder"""
+        now = time.time()
+        with self._lock:
+            status = self._read_status(self._conn)
+            row = self._conn.execute("SELECT owner, host, pid, heartbeat FROM run_lock WHERE id = 1").fetchone()
+        status['is_running'] = row is not None and self._is_live(row, now)
+        status['owner'] = row[0] if status['is_running'] else None
+        return status
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+_registry = None
+_registry_lock = threading.Lock()
+
+
+def get_run_registry() -> RunRegistry:
+    """Return this process's handle on the shared run registry"""
+    global _registry
+    with _registry_lock:
+        if _registry is None:
+            _registry = RunRegistry(
+                OUTPUT_SETTINGS['run_registry_file'],
+                stale_seconds=SCRAPING_SETTINGS.get('run_lock_stale_seconds', 120),
+                heartbeat_seconds=SCRAPING_SETTINGS.get('run_heartbeat_seconds', 15),
+                events_retained=API_SETTINGS.get('events_retained', 1000)
+            )
+        return _registry
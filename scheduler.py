@@ -0,0 +1,191 @@
+import heapq
+import json
+import logging
+import os
+import threading
+import time
+from typing import Callable, Dict, List, Optional
+
+from config import SCHEDULER_SETTINGS
+
+
+class SourceScheduler:
+    """Per-source scrape schedule kept in a priority queue of next-due times
+
+    Each source's polling interval follows how often its feed actually
+    publishes: the smoothed rate of new items seen per hour sets the interval
+    to roughly the time needed for target_new_items to appear, and polls that
+    find nothing back the interval off. Sources coming due close together are
+    coalesced into one run, and a source already in a running batch is not
+    queued again until that run reports back.
+    """
+
+    def __init__(self, websites: List[Dict], state_file: str, settings: Optional[Dict] = None):
+        self.settings = dict(SCHEDULER_SETTINGS, **(settings or {}))
+        self.websites = {website['name']: website for website in websites}
+        self.state_file = state_file
+        self.logger = logging.getLogger(__name__)
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._heap = []
+        self._in_flight = set()
+        self._state = {}
+        self.load()
+
+        now = time.time()
+        for name in self.websites:
+            entry = self._state.setdefault(name, {
+                'interval': self.settings['default_interval_hours'] * 3600,
+                'rate': None,
+                'last_run': None,
+                'next_due': now
+            })
+            heapq.heappush(self._heap, (entry['next_due'], name))
+
+    def load(self):
+        """Load intervals, publishing rates and due times from earlier runs"""
+        if not os.path.exists(self.state_file):
+            return
+        try:
+            with open(self.state_file, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            self._state = {name: entry for name, entry in data.get('sources', {}).items() if name in self.websites}
+        except Exception as e:
+            self.logger.warning(f"Could not read schedule state {self.state_file}: {str(e)}")
+
+    def save(self):
+        """Write the schedule atomically so a crash never leaves a truncated file"""
+        with self._lock:
+            data = {'sources': {name: dict(entry) for name, entry in self._state.items()}}
+        tmp_path = f"{self.state_file}.tmp"
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(data, f, indent=2)
+            os.replace(tmp_path, self.state_file)
+        except Exception as e:
+            self.logger.warning(f"Could not write schedule state {self.state_file}: {str(e)}")
+
+    def _push(self, name: str, due: float):
+        self._state[name]['next_due'] = due
+        heapq.heappush(self._heap, (due, name))
+
+    def seconds_until_due(self, now: Optional[float] = None) -> Optional[float]:
+        """Seconds until the earliest queued source is due, or None when nothing is queued"""
+        now = time.time() if now is None else now
+        with self._lock:
+            self._drop_stale()
+            return max(0.0, self._heap[0][0] - now) if self._heap else None
+
+    def _drop_stale(self):
+        # Rescheduling pushes a new entry; older entries for the same source are skipped here
+        while self._heap:
+            due, name = self._heap[0]
+            if name in self._in_flight or self._state[name]['next_due'] != due:
+                heapq.heappop(self._heap)
+            else:
+                break
+
+    def pop_due(self, now: Optional[float] = None) -> List[Dict]:
+        """Take every source due now or within the coalescing window, marking them in flight"""
+        now = time.time() if now is None else now
+        horizon = now + self.settings['coalesce_seconds']
+        batch = []
+        with self._lock:
+            self._drop_stale()
+            if not self._heap or self._heap[0][0] > now:
+                return []
+            while self._heap and self._heap[0][0] <= horizon:
+                _, name = heapq.heappop(self._heap)
+                if name in self._in_flight:
+                    continue
+                self._in_flight.add(name)
+                batch.append(self.websites[name])
+                self._drop_stale()
+        return batch
+
+    def defer(self, websites: List[Dict], seconds: float):
+        """Put sources taken by pop_due back in the queue, e.g. while another run is in progress"""
+        now = time.time()
+        with self._lock:
+            for website in websites:
+                self._in_flight.discard(website['name'])
+                self._push(website['name'], now + seconds)
+        self._wake.set()
+
+    def request(self, names: Optional[List[str]] = None):
+        """Make sources (all by default) due now; ones already running are left alone"""
+        now = time.time()
+        with self._lock:
+            for name in names or list(self.websites):
+                if name in self.websites and name not in self._in_flight:
+                    self._push(name, now)
+        self._wake.set()
+
+    def record(self, new_items: Dict[str, int], now: Optional[float] = None):
+        """Adapt each scraped source's interval to the new items it returned and queue it again
+
+        new_items maps source name -> articles not seen before; sources that
+        failed can be passed as None to keep their interval unchanged.
+        """
+        now = time.time() if now is None else now
+        settings = self.settings
+        min_interval = settings['min_interval_hours'] * 3600
+        max_interval = settings['max_interval_hours'] * 3600
+        with self._lock:
+            for name, count in new_items.items():
+                entry = self._state.get(name)
+                if entry is None:
+                    continue
+                self._in_flight.discard(name)
+                if count is not None:
+                    hours = (now - entry['last_run']) / 3600 if entry['last_run'] else entry['interval'] / 3600
+                    observed = count / max(hours, 1 / 60)
+                    rate = observed if entry['rate'] is None else \
+                        settings['rate_smoothing'] * observed + (1 - settings['rate_smoothing']) * entry['rate']
+                    if count == 0:
+                        interval = entry['interval'] * settings['backoff_factor']
+                    else:
+                        interval = settings['target_new_items'] / rate * 3600
+                    entry['rate'] = round(rate, 4)
+                    entry['interval'] = round(min(max_interval, max(min_interval, interval)))
+                    entry['last_run'] = now
+                self._push(name, now + entry['interval'])
+        self.save()
+        self._wake.set()
+
+    def snapshot(self) -> List[Dict]:
+        """Schedule of every source ordered by next due time"""
+        with self._lock:
+            rows = [
+                {
+                    'source': name,
+                    'next_due': entry['next_due'],
+                    'interval_hours': round(entry['interval'] / 3600, 2),
+                    'new_items_per_hour': entry['rate'],
+                    'last_run': entry['last_run'],
+                    'running': name in self._in_flight
+                }
+                for name, entry in self._state.items()
+            ]
+        return sorted(rows, key=lambda row: row['next_due'])
+
+    def run_forever(self, run_batch: Callable[[List[Dict]], None], stop: Optional[threading.Event] = None):
+        """Sleep until the next source is due, then hand the coalesced batch to run_batch
+
+        run_batch is expected to scrape the given sources and call record()
+        (or defer()) for them.
+        """
+        stop = stop or threading.Event()
+        while not stop.is_set():
+            batch = self.pop_due()
+            if batch:
+                self.logger.info(f"Scheduled scrape of {len(batch)} sources: {', '.join(w['name'] for w in batch)}")
+                try:
+                    run_batch(batch)
+                except Exception as e:
+                    self.logger.error(f"Scheduled scrape failed: {str(e)}")
+                    self.record({website['name']: None for website in batch})
+                continue
+            self._wake.clear()
+            wait = self.seconds_until_due()
+            self._wake.wait(timeout=min(wait if wait is not None else 3600, 3600))
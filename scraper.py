@@ -1,24 +1,74 @@
-import requests
 import feedparser
+import numpy as np
 import pandas as pd
-from bs4 import BeautifulSoup
-from newspaper import Article
 import time
+import hashlib
+import json
 import logging
 from datetime import datetime, timedelta
 from typing import List, Dict, Optional
 import re
-from config import TARGET_WEBSITES, TITLE_KEYWORDS, CONTENT_KEYWORDS, SCRAPING_SETTINGS, OUTPUT_SETTINGS
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from config import TARGET_WEBSITES, TITLE_KEYWORDS, CONTENT_KEYWORDS, SCORING_PROFILES, SCRAPING_SETTINGS, OUTPUT_SETTINGS
+from throttle import HostThrottle
+from http_client import get_session, wire_bytes
+from link_extractor import extract_links
+from metrics import RunMetrics
+from summary_cache import get_summary_cache
+from feed_cache import FeedCache
+from seen_store import SeenStore
+from extraction_cache import ExtractionCache
+from dedup import DuplicateIndex
+from article_store import get_store
+from archive import get_archive
+from dataset_cache import dataset_cache
+from keyword_matcher import get_scorer
 import os
+import threading
+
+HTML_TAG_RE = re.compile('<.*?>')
 
 class AntiAgingScraper:
     def __init__(self):
-        self.session = requests.Session()
-        self.session.headers.update({
-            'User-Agent': SCRAPING_SETTINGS['user_agent']
-        })
+        # One pooled keep-alive session for feeds, pages and full-text downloads
+        self.session = get_session()
         self.setup_logging()
+        self.relevance_scorer = get_scorer()
+        self.feed_cache = FeedCache(OUTPUT_SETTINGS['feed_cache_file'])
+        self.incremental = SCRAPING_SETTINGS.get('incremental', True)
+        self.seen_store = SeenStore(OUTPUT_SETTINGS['seen_store_file'], salt=self.filter_signature()) \
+            if self.incremental else None
+        self._pending_seen = []
+        self._pending_lock = threading.Lock()
+        self.metrics = RunMetrics()
+        self._current = threading.local()
+        self.extraction_cache = ExtractionCache(OUTPUT_SETTINGS['extraction_cache_file']) \
+            if SCRAPING_SETTINGS.get('extract_full_text', False) else None
+        self.dedup_index = DuplicateIndex(
+            OUTPUT_SETTINGS['dedup_index_file'],
+            num_perm=SCRAPING_SETTINGS.get('dedup_num_perm', 64),
+            bands=SCRAPING_SETTINGS.get('dedup_bands', 16),
+            threshold=SCRAPING_SETTINGS.get('dedup_threshold', 0.6)
+        ) if SCRAPING_SETTINGS.get('deduplicate', True) else None
+        self._pending_dedup = []
+        self.archive = get_archive(OUTPUT_SETTINGS['archive_dir']) \
+            if OUTPUT_SETTINGS.get('archive_enabled', True) else None
+        if self.archive is None and OUTPUT_SETTINGS.get('archive_enabled', True):
+            self.logger.warning("pyarrow is not installed, runs will not be added to the Parquet archive")
         
+    def filter_signature(self) -> str:
+        """Digest of everything that decides whether an article is kept, for the seen store"""
+        settings = {
+            'profile': self.relevance_scorer.name,
+            'scoring': SCORING_PROFILES.get(self.relevance_scorer.name, {}).get('groups'),
+            'threshold': self.relevance_scorer.threshold,
+            'missing_required_penalty': self.relevance_scorer.missing_required_penalty,
+            'content_filtering': SCRAPING_SETTINGS.get('content_filtering', True),
+            'require_recent_articles': SCRAPING_SETTINGS.get('require_recent_articles', True),
+            'date_filter_year': SCRAPING_SETTINGS.get('date_filter_year', 2025)
+        }
+        return hashlib.sha1(json.dumps(settings, sort_keys=True).encode('utf-8')).hexdigest()[:16]
+    
     def setup_logging(self):
         """Setup logging configuration"""
         logging.basicConfig(
@@ -35,7 +85,34 @@ class AntiAgingScraper:
         """Fetch articles from RSS feed"""
         try:
             self.logger.info(f"Fetching RSS feed: {feed_url}")
-            feed = feedparser.parse(feed_url)
+            headers = {}
+            if SCRAPING_SETTINGS.get('conditional_feed_requests', True):
+                validators = self.feed_cache.validators(feed_url)
+                if validators.get('etag'):
+                    headers['If-None-Match'] = validators['etag']
+                if validators.get('modified'):
+                    headers['If-Modified-Since'] = validators['modified']
+            source = self._source_name(feed_url)
+            start = time.perf_counter()
+            response = self.session.get(feed_url, headers=headers, timeout=SCRAPING_SETTINGS['timeout'])
+            
+            # Feed unchanged since the last run: reuse the stored entries without parsing
+            if response.status_code == 304:
+                cached_articles = self.feed_cache.hit(feed_url)
+                if cached_articles is not None:
+                    self.logger.info(f"RSS feed not modified, reusing {len(cached_articles)} cached articles")
+                    self.metrics.add_source(source, fetch_seconds=time.perf_counter() - start, feed_cache_hits=1)
+                    return cached_articles
+                response = self.session.get(feed_url, timeout=SCRAPING_SETTINGS['timeout'])
+            response.raise_for_status()
+            self.metrics.add_source(source, fetch_seconds=time.perf_counter() - start, bytes=wire_bytes(response))
+            
+            # Parse the downloaded bytes; the headers give feedparser the encoding and base URL
+            response_headers = dict(response.headers)
+            response_headers.setdefault('content-location', response.url)
+            start = time.perf_counter()
+            feed = feedparser.parse(response.content, response_headers=response_headers)
+            
             articles = []
             
             for entry in feed.entries[:SCRAPING_SETTINGS['max_articles_per_site']]:
@@ -48,46 +125,46 @@ class AntiAgingScraper:
                     'source': getattr(feed.feed, 'title', 'Unknown')
                 }
                 articles.append(article)
-                
+            
+            self.metrics.add_source(source, parse_seconds=time.perf_counter() - start, feed_cache_misses=1)
+            self.feed_cache.store(feed_url, response.headers.get('ETag'), response.headers.get('Last-Modified'), articles)
             self.logger.info(f"Found {len(articles)} articles from RSS feed")
             return articles
             
         except Exception as e:
             self.logger.error(f"Error fetching RSS feed {feed_url}: {str(e)}")
+            self.metrics.add_source(self._source_name(feed_url), errors=1)
             return []
     
     def scrape_website(self, url: str, site_name: str) -> List[Dict]:
         """Scrape articles from website directly"""
         try:
             self.logger.info(f"Scraping website: {url}")
-            response = self.session.get(url, timeout=SCRAPING_SETTINGS['timeout'])
+            start = time.perf_counter()
+            response = self.session.get(url, timeout=SCRAPING_SETTINGS['timeout'], stream=True)
             response.raise_for_status()
             
-            soup = BeautifulSoup(response.content, 'html.parser')
-            articles = []
-            
-            # Look for article links (this is a generic approach)
-            article_links = soup.find_all('a', href=True)
-            
-            for link in article_links[:SCRAPING_SETTINGS['max_articles_per_site']]:
-                # Use getattr for safer attribute access
-                href = getattr(link, 'href', '')
-                
-                if isinstance(href, str) and self._is_article_url(href):
-                    article = {
-                        'title': link.get_text(strip=True) if hasattr(link, 'get_text') else '',
-                        'url': href if href.startswith('http') else f"{url.rstrip('/')}/{href.lstrip('/')}" if isinstance(href, str) else '',
-                        'published_date': '',
-                        'summary': '',
-                        'source': site_name
-                    }
-                    articles.append(article)
+            # Look for article links (this is a generic approach), parsing only as much of the page as needed
+            links = extract_links(response, self._is_article_url, SCRAPING_SETTINGS['max_articles_per_site'])
+            self.metrics.add_source(self._source_name(url), fetch_seconds=time.perf_counter() - start,
+                                    bytes=wire_bytes(response))
+            articles = [
+                {
+                    'title': title,
+                    'url': link_url,
+                    'published_date': '',
+                    'summary': '',
+                    'source': site_name
+                }
+                for link_url, title in links
+            ]
             
             self.logger.info(f"Found {len(articles)} articles from website")
             return articles
             
         except Exception as e:
             self.logger.error(f"Error scraping website {url}: {str(e)}")
+            self.metrics.add_source(self._source_name(url), errors=1)
             return []
     
     def _is_article_url(self, url: str) -> bool:
@@ -105,6 +182,9 @@ class AntiAgingScraper:
     
     def filter_articles_by_keywords(self, articles: List[Dict]) -> List[Dict]:
         """Filter articles based on keywords with intelligent content-based filtering"""
+        if SCRAPING_SETTINGS.get('batch_filtering', True):
+            return self.filter_articles_batch(articles)
+        
         filtered_articles = []
         
         # Get target year for filtering
@@ -114,9 +194,13 @@ class AntiAgingScraper:
             if isinstance(article, dict):
                 article['title'] = self.clean_html(article.get('title', ''))
                 article['summary'] = self.clean_html(article.get('summary', ''))
-                published_date = article.get('published_date', '')
-            else:
-                published_date = ''
+        
+        # Score every article with the compiled matcher up front
+        content_filtering = SCRAPING_SETTINGS.get('content_filtering', True)
+        relevance_scores = self.relevance_scorer.score_many(articles) if content_filtering else [0] * len(articles)
+        
+        for article, relevance_score in zip(articles, relevance_scores):
+            published_date = article.get('published_date', '') if isinstance(article, dict) else ''
             
             # DATE FILTERING - Only include articles from 2025 (but be flexible with missing dates)
             if SCRAPING_SETTINGS.get('require_recent_articles', True) and published_date:
@@ -139,12 +223,12 @@ class AntiAgingScraper:
                     # If we can't parse the date, include the article (don't filter out)
             
             # INTELLIGENT CONTENT FILTERING
-            if SCRAPING_SETTINGS.get('content_filtering', True):
+            if content_filtering:
                 # Check for relevance using a scoring system
-                relevance_score = self.calculate_relevance_score(article)
+                article['relevance_score'] = relevance_score
                 
                 # Only include articles with sufficient relevance
-                if relevance_score < 5:  # Increased minimum score threshold
+                if relevance_score < self.relevance_scorer.threshold:
                     self.logger.info(f"Article '{article['title'][:50]}...' filtered out (low relevance score: {relevance_score})")
                     continue
                 
@@ -156,164 +240,417 @@ class AntiAgingScraper:
         # Sort articles by published date (most recent first)
         filtered_articles.sort(key=lambda x: x.get('published_date', ''), reverse=True)
         
-        self.logger.info(f"Filtered {len(filtered_articles)} relevant articles from {len(articles)} total (content filtering: {SCRAPING_SETTINGS.get('content_filtering', True)}, year filtering: {target_year})")
+        self.logger.info(f"Filtered {len(filtered_articles)} relevant articles from {len(articles)} total (content filtering: {content_filtering}, year filtering: {target_year})")
+        return filtered_articles
+    
+    def filter_articles_batch(self, articles: List[Dict]) -> List[Dict]:
+        """Filter articles through the vectorized frame path; same result as the per-article loop"""
+        articles = [article for article in articles if isinstance(article, dict)]
+        for article in articles:
+            article['title'] = self.clean_html(article.get('title', ''))
+            article['summary'] = self.clean_html(article.get('summary', ''))
+        
+        df = pd.DataFrame({
+            column: [article.get(column, '') for article in articles]
+            for column in ('title', 'summary', 'source', 'published_date')
+        })
+        passed = self.filter_frame(df)
+        
+        content_filtering = SCRAPING_SETTINGS.get('content_filtering', True)
+        filtered_articles = []
+        for index, relevance_score in zip(passed.index, passed['relevance_score']):
+            article = articles[index]
+            if content_filtering:
+                article['relevance_score'] = int(relevance_score)
+            filtered_articles.append(article)
+        
+        # Sort articles by published date (most recent first)
+        filtered_articles.sort(key=lambda x: x.get('published_date', ''), reverse=True)
         return filtered_articles
     
+    def filter_frame(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Apply the year and relevance filters to a frame of articles in vectorized form
+
+        Expects title (already cleaned), summary, source and published_date
+        columns. Returns the passing rows with a relevance_score column; used
+        for live batches and for re-scoring large backfilled corpora.
+        """
+        target_year = SCRAPING_SETTINGS.get('date_filter_year', 2025)
+        content_filtering = SCRAPING_SETTINGS.get('content_filtering', True)
+        keep = np.ones(len(df), dtype=bool)
+        
+        if SCRAPING_SETTINGS.get('require_recent_articles', True) and len(df):
+            wrong_year = self._wrong_year_mask(df['published_date'], target_year)
+            keep &= ~wrong_year
+            wrong_year_count = int(wrong_year.sum())
+        else:
+            wrong_year_count = 0
+        
+        if content_filtering:
+            scores = self.relevance_scorer.score_frame(df)
+            low_relevance = keep & (scores < self.relevance_scorer.threshold)
+            keep &= ~low_relevance
+            low_relevance_count = int(low_relevance.sum())
+        else:
+            scores = np.zeros(len(df), dtype=int)
+            low_relevance_count = 0
+        
+        result = df.loc[keep].copy()
+        result['relevance_score'] = scores[keep]
+        
+        self.logger.info(
+            f"Filtered {len(result)} relevant articles from {len(df)} total "
+            f"({wrong_year_count} from other years, {low_relevance_count} below relevance threshold; "
+            f"content filtering: {content_filtering}, year filtering: {target_year})"
+        )
+        return result
+    
+    def rescore_stored_articles(self) -> int:
+        """Recompute relevance_score for every stored article with the vectorized scorer"""
+        store = get_store(os.path.abspath(OUTPUT_SETTINGS['database_file']), OUTPUT_SETTINGS['output_file'])
+        df = pd.DataFrame(store.fetch_articles(fields=['id', 'title', 'summary', 'source']),
+                          columns=['id', 'title', 'summary', 'source'])
+        scores = self.relevance_scorer.score_frame(df)
+        updated = store.update_scores(list(zip(df['id'].tolist(), scores.tolist())))
+        dataset_cache.invalidate()
+        self.logger.info(f"Re-scored {updated} stored articles")
+        return updated
+    
+    @staticmethod
+    def _wrong_year_mask(dates: pd.Series, target_year: int) -> np.ndarray:
+        """Vectorized form of the per-article date check
+
+        Strings containing 'T' go through datetime.fromisoformat exactly like
+        the loop (once per distinct value), others are parsed by their first
+        ten characters with the same exact '%Y-%m-%d' format. Missing or
+        unparseable dates never filter an article out.
+        """
+        is_text = dates.map(lambda value: isinstance(value, str) and value != '').to_numpy(dtype=bool)
+        text = dates.where(is_text, '').astype(str)
+        has_time = text.str.contains('T', regex=False).to_numpy(dtype=bool)
+        
+        years = pd.to_datetime(text.str[:10].where(~has_time & is_text), format='%Y-%m-%d', errors='coerce').dt.year
+        years = years.to_numpy(dtype=float, na_value=np.nan, copy=True)
+        
+        if has_time.any():
+            def iso_year(value):
+                try:
+                    return datetime.fromisoformat(value.replace('Z', '+00:00')).year
+                except ValueError:
+                    return np.nan
+            iso_years = {value: iso_year(value) for value in text[has_time].unique()}
+            years[has_time] = text[has_time].map(iso_years).to_numpy(dtype=float)
+        
+        valid = is_text & ~np.isnan(years)
+        return valid & (years != target_year)
+    
     def calculate_relevance_score(self, article: Dict) -> int:
         """Calculate relevance score for anti-aging research"""
-        score = 0
-        title = article.get('title', '').lower()
-        summary = article.get('summary', '').lower()
-        source = article.get('source', '').lower()
-        
-        # PRIMARY REQUIREMENT: Must have at least one primary anti-aging keyword
-        primary_keywords = ['anti-aging', 'longevity', 'senescence', 'aging research', 'life extension', 'antiaging']
-        has_primary_keyword = False
-        
-        for keyword in primary_keywords:
-            if keyword in title:
-                score += 5
-                has_primary_keyword = True
-            if keyword in summary:
-                score += 3
-                has_primary_keyword = True
-        
-        # If no primary keywords found, heavily penalize
-        if not has_primary_keyword:
-            score -= 10
-        
-        # Secondary keywords (medium weight) - only if primary keywords exist
-        if has_primary_keyword:
-            secondary_keywords = ['telomere', 'sirtuin', 'rapamycin', 'metformin', 'nad+', 'mitochondria', 
-                                'autophagy', 'cellular aging', 'biological age', 'epigenetic clock', 
-                                'senolytics', 'gerontology', 'oxidative stress', 'inflammation']
-            for keyword in secondary_keywords:
-                if keyword in title:
-                    score += 2
-                if keyword in summary:
-                    score += 1
-        
-        # Bonus for relevant sources (only if primary keywords exist)
-        if has_primary_keyword:
-            relevant_sources = ['nature', 'cell', 'science', 'aging', 'longevity', 'gerontology']
-            for source_keyword in relevant_sources:
-                if source_keyword in source:
-                    score += 1
-        
-        # Heavy penalty for clearly irrelevant content
-        irrelevant_keywords = ['covid', 'vaccine', 'politics', 'election', 'sports', 'entertainment', 
-                             'celebrity', 'weather', 'traffic', 'crime', 'accident', 'gender', 'pediatric',
-                             'pain', 'chronic pain', 'digital health', 'master degree', 'education']
-        for keyword in irrelevant_keywords:
-            if keyword in title:
-                score -= 5
-            if keyword in summary:
-                score -= 3
-        
-        return max(0, int(score))  # Ensure non-negative score
+        return self.relevance_scorer.score(article)
     
     def extract_article_details(self, article: Dict) -> Dict:
         """Extract detailed information from article URL"""
+        url = article.get('url') if isinstance(article, dict) else ''
+        if not url:
+            return article
+        
+        cached = self.extraction_cache.get(url) if self.extraction_cache is not None else None
+        extracted = cached if cached is not None else self._download_details(url)
+        if extracted is not None:
+            if cached is None and self.extraction_cache is not None:
+                self.extraction_cache.put(url, extracted)
+            self._apply_details(article, extracted)
+        
+        return article
+    
+    def _download_details(self, url: str) -> Optional[Dict]:
+        """Download one article through the shared session and parse it with newspaper"""
         try:
-            url = article.get('url') if isinstance(article, dict) else ''
-            if not url:
-                return article
+            # newspaper is slow to import and only needed for full-text extraction
+            from newspaper import Article, Config
             
             self.logger.info(f"Extracting details from: {url}")
             
+            config = Config()
+            config.browser_user_agent = SCRAPING_SETTINGS['user_agent']
+            config.request_timeout = SCRAPING_SETTINGS.get('extraction_timeout', SCRAPING_SETTINGS['timeout'])
+            config.fetch_images = False
+            config.memoize_articles = False
+            
+            # Download through the shared pool; newspaper only parses the HTML
+            response = self.session.get(url, timeout=config.request_timeout)
+            response.raise_for_status()
+            
             # Use newspaper3k for article extraction
-            news_article = Article(url)
-            news_article.download()
+            news_article = Article(url, config=config)
+            news_article.download(input_html=response.text)
             news_article.parse()
             
-            # Update article with extracted information
-            article.update({
-                'title': self.clean_html(news_article.title) if hasattr(news_article, 'title') else (article.get('title', '') if isinstance(article, dict) else ''),
-                'summary': self.clean_html(news_article.text[:500]) if hasattr(news_article, 'text') and news_article.text else (article.get('summary', '') if isinstance(article, dict) else ''),
-                'published_date': news_article.publish_date.isoformat() if hasattr(news_article, 'publish_date') and news_article.publish_date and hasattr(news_article.publish_date, 'isoformat') and hasattr(news_article.publish_date, 'year') else (article.get('published_date', '') if isinstance(article, dict) else ''),
-                'authors': ', '.join(news_article.authors) if hasattr(news_article, 'authors') and news_article.authors else '',
-                'keywords': ', '.join(news_article.keywords) if hasattr(news_article, 'keywords') and news_article.keywords else ''
-            })
-            
-            time.sleep(SCRAPING_SETTINGS['request_delay'])
+            publish_date = news_article.publish_date
+            return {
+                'title': news_article.title or '',
+                'text': news_article.text or '',
+                'published_date': publish_date.isoformat() if publish_date and hasattr(publish_date, 'isoformat') else '',
+                'authors': list(news_article.authors or []),
+                'keywords': list(news_article.keywords or [])
+            }
             
         except Exception as e:
             self.logger.error(f"Error extracting details from {url}: {str(e)}")
-        
-        return article
+            return None
     
-    def scrape_all_sources(self) -> List[Dict]:
-        """Scrape all configured sources"""
-        all_articles = []
+    def _apply_details(self, article: Dict, extracted: Dict):
+        """Update an article with extracted fields, keeping its feed values where extraction found nothing"""
+        article.update({
+            'title': self.clean_html(extracted['title']) if extracted.get('title') else article.get('title', ''),
+            'summary': self.clean_html(extracted['text'][:500]) if extracted.get('text') else article.get('summary', ''),
+            'published_date': extracted.get('published_date') or article.get('published_date', ''),
+            'authors': ', '.join(extracted.get('authors') or []),
+            'keywords': ', '.join(extracted.get('keywords') or [])
+        })
+    
+    def extract_all_details(self, articles: List[Dict]) -> List[Dict]:
+        """Enrich articles with full-text details on a worker pool, one polite slot per domain"""
+        if not articles:
+            return articles
         
-        for website in TARGET_WEBSITES:
-            self.logger.info(f"Processing {website['name']}")
-            
-            if website['type'] == 'rss':
-                articles = self.fetch_rss_feed(website['rss_feed'])
-            elif website['type'] == 'scrape':
-                articles = self.scrape_website(website['url'], website['name'])
-            elif website['type'] == 'search':
-                # For search-based sites, we'll implement a search scraper
-                articles = self.scrape_search_results(website['search_url'], website['name'])
+        throttle = HostThrottle(
+            SCRAPING_SETTINGS.get('max_requests_per_host', 1),
+            SCRAPING_SETTINGS['request_delay']
+        )
+        cached = self.extraction_cache.get_many([article.get('url', '') for article in articles]) \
+            if self.extraction_cache is not None else {}
+        to_extract = []
+        for article in articles:
+            extracted = cached.get(article.get('url', ''))
+            if extracted is not None:
+                self._apply_details(article, extracted)
+            elif article.get('url'):
+                to_extract.append(article)
+        
+        # Interleave hosts so workers are not all queued on the slot of one source
+        by_host = {}
+        for article in to_extract:
+            by_host.setdefault(HostThrottle.host_of(article['url']), []).append(article)
+        queues = list(by_host.values())
+        ordered = [queue[i] for i in range(max(map(len, queues), default=0)) for queue in queues if i < len(queue)]
+        
+        max_workers = max(1, min(SCRAPING_SETTINGS.get('extraction_workers', 8), len(to_extract)))
+        start = time.time()
+        with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='extract') as executor:
+            futures = [executor.submit(self._extract_politely, article, throttle) for article in ordered]
+            for future in as_completed(futures):
+                try:
+                    future.result()
+                except Exception as e:
+                    self.logger.error(f"Error extracting article details: {str(e)}")
+        
+        self.logger.info(
+            f"Full text: {len(articles) - len(to_extract)} from cache, {len(to_extract)} extracted "
+            f"in {time.time() - start:.1f}s with {max_workers} workers"
+        )
+        return articles
+    
+    def _extract_politely(self, article: Dict, throttle: HostThrottle):
+        """Extract one article while holding a request slot for its domain"""
+        url = article['url']
+        with throttle.slot(url):
+            extracted = self._download_details(url)
+        if extracted is not None:
+            if self.extraction_cache is not None:
+                self.extraction_cache.put(url, extracted)
+            self._apply_details(article, extracted)
+    
+    def scrape_all_sources(self, websites: Optional[List[Dict]] = None) -> List[Dict]:
+        """Scrape all configured sources, or only the given subset of TARGET_WEBSITES"""
+        websites = TARGET_WEBSITES if websites is None else websites
+        self.metrics.notify('sources', total=len(websites), names=[website['name'] for website in websites])
+        with self.metrics.stage('scrape') as stage:
+            if SCRAPING_SETTINGS.get('concurrent_fetching', True):
+                all_articles = self.scrape_sources_concurrently(websites)
             else:
-                continue
-            
-            # Filter articles by keywords
-            filtered_articles = self.filter_articles_by_keywords(articles)
-            
-            # Skip detailed extraction for now to speed up scraping
-            # for article in filtered_articles:
-            #     detailed_article = self.extract_article_details(article)
-            #     all_articles.append(detailed_article)
-            
-            # Add filtered articles directly
-            all_articles.extend(filtered_articles)
-            
-            time.sleep(SCRAPING_SETTINGS['request_delay'])
+                all_articles = []
+                
+                for website in websites:
+                    # Add filtered articles directly
+                    all_articles.extend(self.scrape_source(website))
+                    
+                    time.sleep(SCRAPING_SETTINGS['request_delay'])
+            stage['articles_out'] = len(all_articles)
+        
+        # Collapse duplicates across sources and runs before the expensive stages
+        if self.dedup_index is not None:
+            with self.metrics.stage('dedup', len(all_articles)) as stage:
+                all_articles = self.deduplicate(all_articles)
+                stage['articles_out'] = len(all_articles)
         
+        # Optional full-text stage for the articles that passed the filters
+        if SCRAPING_SETTINGS.get('extract_full_text', False):
+            with self.metrics.stage('extract', len(all_articles)) as stage:
+                all_articles = self.extract_all_details(all_articles)
+                stage['articles_out'] = len(all_articles)
+        
+        self.feed_cache.save()
+        feed_stats = self.feed_cache.stats()
+        self.logger.info(f"Feed cache: {feed_stats['run_hits']} unchanged, {feed_stats['run_misses']} downloaded this run")
+        return all_articles
+    
+    def new_item_counts(self, websites: List[Dict]) -> Dict[str, Optional[int]]:
+        """Articles not seen by an earlier run per scraped source (None if it failed), for the scheduler"""
+        sources = self.metrics.record()['sources']
+        counts = {}
+        for website in websites:
+            counters = sources.get(website['name'], {})
+            # A failed fetch returns no articles; report it as unknown rather than as a quiet feed
+            counts[website['name']] = None if counters.get('errors') else counters.get('articles_new')
+        return counts
+    
+    def deduplicate(self, articles: List[Dict]) -> List[Dict]:
+        """Drop same-URL and near-duplicate articles; the survivors are indexed once they are saved"""
+        articles, entries, duplicates = self.dedup_index.find_duplicates(articles)
+        with self._pending_lock:
+            self._pending_dedup.extend(entries)
+        self.logger.info(f"Deduplication removed {duplicates} articles, {len(articles)} remain")
+        return articles
+    
+    def scrape_sources_concurrently(self, websites: List[Dict]) -> List[Dict]:
+        """Scrape sources in parallel, keeping the configured source order in the output"""
+        if not websites:
+            return []
+        
+        throttle = HostThrottle(
+            SCRAPING_SETTINGS.get('max_requests_per_host', 1),
+            SCRAPING_SETTINGS['request_delay']
+        )
+        max_workers = max(1, min(SCRAPING_SETTINGS.get('max_concurrent_sources', 6), len(websites)))
+        results = [[] for _ in websites]
+        
+        with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='source') as executor:
+            futures = {
+                executor.submit(self._scrape_source_politely, website, throttle): index
+                for index, website in enumerate(websites)
+            }
+            for future in as_completed(futures):
+                index = futures[future]
+                try:
+                    results[index] = future.result()
+                except Exception as e:
+                    self.logger.error(f"Error processing {websites[index]['name']}: {str(e)}")
+                    self.metrics.add_source(websites[index]['name'], errors=1)
+        
+        all_articles = []
+        for articles in results:
+            all_articles.extend(articles)
         return all_articles
     
+    def _scrape_source_politely(self, website: Dict, throttle: HostThrottle) -> List[Dict]:
+        """Scrape one source while holding a request slot for its host"""
+        with throttle.slot(self._source_url(website)):
+            return self.scrape_source(website)
+    
+    def _source_url(self, website: Dict) -> str:
+        """Return the URL that will actually be requested for a source"""
+        if website['type'] == 'rss':
+            return website['rss_feed']
+        if website['type'] == 'search':
+            return website['search_url']
+        return website['url']
+    
+    def _source_name(self, url: str) -> str:
+        """Name of the source being scraped on this thread, for per-source metrics"""
+        return getattr(self._current, 'source', None) or HostThrottle.host_of(url)
+    
+    def scrape_source(self, website: Dict) -> List[Dict]:
+        """Fetch and filter the articles of a single configured source"""
+        self.logger.info(f"Processing {website['name']}")
+        self._current.source = website['name']
+        start = time.perf_counter()
+        articles = []
+        try:
+            articles = self._scrape_source(website)
+            return articles
+        finally:
+            self._current.source = None
+            self.metrics.notify('source_finished', source=website['name'], articles=len(articles),
+                                seconds=round(time.perf_counter() - start, 4))
+    
+    def _scrape_source(self, website: Dict) -> List[Dict]:
+        
+        if website['type'] == 'rss':
+            articles = self.fetch_rss_feed(website['rss_feed'])
+        elif website['type'] == 'scrape':
+            articles = self.scrape_website(website['url'], website['name'])
+        elif website['type'] == 'search':
+            # For search-based sites, we'll implement a search scraper
+            articles = self.scrape_search_results(website['search_url'], website['name'])
+        else:
+            return []
+        self.metrics.add_source(website['name'], articles_fetched=len(articles))
+        
+        # Incremental mode: only articles not processed by an earlier run go further
+        if self.seen_store is not None:
+            start = time.perf_counter()
+            fetched_count = len(articles)
+            articles, fingerprints = self.seen_store.unseen(articles)
+            with self._pending_lock:
+                self._pending_seen.extend(fingerprints)
+            self.metrics.add_source(website['name'], seen_seconds=time.perf_counter() - start)
+            self.logger.info(f"{website['name']}: {len(articles)} new of {fetched_count} fetched articles")
+        
+        # Filter articles by keywords
+        start = time.perf_counter()
+        filtered_articles = self.filter_articles_by_keywords(articles)
+        self.metrics.add_source(website['name'], filter_seconds=time.perf_counter() - start,
+                                articles_new=len(articles), articles_kept=len(filtered_articles))
+        
+        # Full-text extraction runs once for all sources in scrape_all_sources
+        
+        return filtered_articles
+    
     def scrape_search_results(self, search_url: str, site_name: str) -> List[Dict]:
         """Scrape search results from sites like ScienceDirect"""
         try:
             self.logger.info(f"Scraping search results: {search_url}")
-            response = self.session.get(search_url, timeout=SCRAPING_SETTINGS['timeout'])
+            start = time.perf_counter()
+            response = self.session.get(search_url, timeout=SCRAPING_SETTINGS['timeout'], stream=True)
             response.raise_for_status()
             
-            soup = BeautifulSoup(response.content, 'html.parser')
-            articles = []
-            
             # Look for search result links
-            result_links = soup.find_all('a', href=True)
-            
-            for link in result_links[:SCRAPING_SETTINGS['max_articles_per_site']]:
-                # Use getattr for safer attribute access
-                href = getattr(link, 'href', '')
-                
-                if isinstance(href, str) and '/science/article/' in href:
-                    article = {
-                        'title': link.get_text(strip=True) if hasattr(link, 'get_text') else '',
-                        'url': href if href.startswith('http') else f"https://www.sciencedirect.com{href}" if isinstance(href, str) else '',
-                        'published_date': '',
-                        'summary': '',
-                        'source': site_name
-                    }
-                    articles.append(article)
+            links = extract_links(
+                response, lambda link_url: '/science/article/' in link_url, SCRAPING_SETTINGS['max_articles_per_site']
+            )
+            self.metrics.add_source(self._source_name(search_url), fetch_seconds=time.perf_counter() - start,
+                                    bytes=wire_bytes(response))
+            articles = [
+                {
+                    'title': title,
+                    'url': link_url,
+                    'published_date': '',
+                    'summary': '',
+                    'source': site_name
+                }
+                for link_url, title in links
+            ]
             
             return articles
             
         except Exception as e:
             self.logger.error(f"Error scraping search results {search_url}: {str(e)}")
+            self.metrics.add_source(self._source_name(search_url), errors=1)
             return []
     
     def save_results(self, articles: List[Dict]):
-        """Save results to CSV file"""
+        """Save results to the article database"""
         if not articles:
             self.logger.warning("No articles to save")
+            self.commit_seen()
+            self.finish_run()
             return
         
         try:
+            save_start = time.perf_counter()
+            self.metrics.notify('stage_started', stage='save', articles_in=len(articles))
+            scraped_date = datetime.now().isoformat()
             cleaned_articles = []
             for article in articles:
                 cleaned_article = {}
@@ -325,37 +662,58 @@ class AntiAgingScraper:
                         cleaned_article[key] = text
                     else:
                         cleaned_article[key] = value if value is not None else ''
+                # Add timestamp
+                cleaned_article['scraped_date'] = scraped_date
                 cleaned_articles.append(cleaned_article)
             
-            df = pd.DataFrame(cleaned_articles)
-            
-            # Add timestamp
-            df['scraped_date'] = datetime.now().isoformat()
-            
             # Get absolute paths
-            output_path = os.path.abspath(OUTPUT_SETTINGS['output_file'])
+            database_path = os.path.abspath(OUTPUT_SETTINGS['database_file'])
             backup_path = os.path.abspath(OUTPUT_SETTINGS['backup_file'])
             
-            self.logger.info(f"Saving {len(cleaned_articles)} articles to {output_path}")
-            
-            # Save to CSV
-            df.to_csv(output_path, index=False)
-            self.logger.info(f"Successfully saved {len(cleaned_articles)} articles to {output_path}")
+            self.logger.info(f"Saving {len(cleaned_articles)} articles to {database_path}")
+            store = get_store(database_path, OUTPUT_SETTINGS['output_file'])
+            store.upsert_articles(cleaned_articles)
+            dataset_cache.invalidate()
+            self.logger.info(f"Successfully saved {len(cleaned_articles)} articles, {store.count()} stored in total")
             
             # Create backup
-            df.to_csv(backup_path, index=False)
+            store.backup(backup_path)
             self.logger.info(f"Created backup at {backup_path}")
             
-            # Verify file was created
-            if os.path.exists(output_path):
-                file_size = os.path.getsize(output_path)
-                self.logger.info(f"File exists with size: {file_size} bytes")
-            else:
-                self.logger.error(f"File was not created at {output_path}")
+            # Keep this run's rows in the historical archive; the store only holds the latest version
+            if self.archive is not None:
+                try:
+                    self.archive.append(cleaned_articles)
+                except Exception as e:
+                    self.logger.warning(f"Could not append to the Parquet archive: {str(e)}")
+            
+            self.commit_seen()
+            self.metrics.record_stage('save', time.perf_counter() - save_start, len(articles), len(cleaned_articles))
                 
         except Exception as e:
             self.logger.error(f"Error saving results: {str(e)}")
             raise
+        finally:
+            self.finish_run()
+    
+    def finish_run(self, **extra) -> Dict:
+        """Write this run's metrics record; later calls for the same run are ignored"""
+        if self.metrics.finished:
+            return {}
+        summary_cache = get_summary_cache()
+        if summary_cache is not None:
+            extra['summary_cache'] = summary_cache.stats()
+        return self.metrics.finish(feed_cache=self.feed_cache.stats(), **extra)
+    
+    def commit_seen(self):
+        """Mark the articles fetched this run as processed once their results are stored"""
+        with self._pending_lock:
+            fingerprints, self._pending_seen = self._pending_seen, []
+            dedup_entries, self._pending_dedup = self._pending_dedup, []
+        if self.dedup_index is not None:
+            self.dedup_index.add(dedup_entries)
+        if self.seen_store is not None:
+            self.seen_store.mark_seen(fingerprints)
     
     def run(self):
         """Main method to run the scraper"""
@@ -373,8 +731,7 @@ class AntiAgingScraper:
     def clean_html(self, raw_html):
         if not isinstance(raw_html, str):
             return str(raw_html)
-        cleanr = re.compile('<.*?>')
-        return re.sub(cleanr, '', raw_html)
+        return HTML_TAG_RE.sub('', raw_html)
 
 if __name__ == "__main__":
     scraper = AntiAgingScraper()
@@ -0,0 +1,118 @@
+import hashlib
+import logging
+import re
+import sqlite3
+import threading
+from datetime import datetime
+from typing import Dict, List, Tuple
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+
+# Query parameters that only track the click and never change the article
+TRACKING_PARAMS = {'fbclid', 'gclid', 'mc_cid', 'mc_eid', 'ref', 'rss', 'cmpid', 'src'}
+
+_WHITESPACE_RE = re.compile(r'\s+')
+
+
+def canonicalize_url(url: str) -> str:
+    """Normalize an article URL so feed variants of the same link compare equal"""
+    if not isinstance(url, str) or not url.strip():
+        return ''
+    parts = urlsplit(url.strip())
+    scheme = 'https' if parts.scheme.lower() in ('http', 'https') else parts.scheme.lower()
+    host = (parts.hostname or '').lower()
+    if parts.port and parts.port not in (80, 443):
+        host = f"{host}:{parts.port}"
+    path = re.sub(r'/{2,}', '/', parts.path or '/')
+    if len(path) > 1:
+        path = path.rstrip('/')
+    query = [
+        (key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if not key.lower().startswith('utm_') and key.lower() not in TRACKING_PARAMS
+    ]
+    return urlunsplit((scheme, host, path, urlencode(sorted(query)), ''))
+
+
+def content_hash(article: Dict, salt: str = '') -> str:
+    """Hash the title and summary so edited articles are processed again"""
+    text = ' '.join(str(article.get(key) or '') for key in ('title', 'summary'))
+    text = _WHITESPACE_RE.sub(' ', text).strip().lower()
+    if salt:
+        text = f"{salt}|{text}"
+    return hashlib.sha1(text.encode('utf-8')).hexdigest()
+
+
+def fingerprint(article: Dict, salt: str = '') -> Tuple[str, str]:
+    """Return the (canonical URL, content hash) pair identifying a fetched article"""
+    return canonicalize_url(article.get('url', '')), content_hash(article, salt)
+
+
+class SeenStore:
+    """SQLite record of article URLs and content hashes already processed
+
+    salt is mixed into every content hash. The scraper passes a digest of its
+    filter settings, so after a scoring change every article is unseen again
+    and gets filtered under the new rules once.
+    """
+
+    def __init__(self, db_path: str, salt: str = ''):
+        self.db_path = db_path
+        self.salt = salt
+        self.logger = logging.getLogger(__name__)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute('''
+                CREATE TABLE IF NOT EXISTS seen_articles (
+                    url_key TEXT PRIMARY KEY,
+                    content_hash TEXT NOT NULL,
+                    first_seen TEXT NOT NULL,
+                    last_seen TEXT NOT NULL
+                )
+            ''')
+
+    def unseen(self, articles: List[Dict]) -> Tuple[List[Dict], List[Tuple[str, str]]]:
+        """Return the articles whose URL is new or whose content changed, with their fingerprints"""
+        keyed = [(fingerprint(article, self.salt), article) for article in articles]
+        url_keys = list({key for (key, _), _ in keyed if key})
+        known = {}
+        with self._lock:
+            # Stay well below SQLite's bound-parameter limit
+            for start in range(0, len(url_keys), 500):
+                chunk = url_keys[start:start + 500]
+                placeholders = ','.join('?' * len(chunk))
+                rows = self._conn.execute(
+                    f"SELECT url_key, content_hash FROM seen_articles WHERE url_key IN ({placeholders})", chunk
+                ).fetchall()
+                known.update(rows)
+        
+        new_articles, fingerprints = [], []
+        for (key, digest), article in keyed:
+            if not key or known.get(key) != digest:
+                new_articles.append(article)
+                fingerprints.append((key, digest))
+        return new_articles, fingerprints
+
+    def mark_seen(self, fingerprints: List[Tuple[str, str]]):
+        """Record (url_key, content_hash) pairs as processed in a single transaction"""
+        now = datetime.now().isoformat()
+        rows = [(key, digest, now, now) for key, digest in fingerprints if key]
+        if not rows:
+            return
+        with self._lock, self._conn:
+            self._conn.executemany('''
+                INSERT INTO seen_articles (url_key, content_hash, first_seen, last_seen)
+                VALUES (?, ?, ?, ?)
+                ON CONFLICT(url_key) DO UPDATE SET
+                    content_hash = excluded.content_hash,
+                    last_seen = excluded.last_seen
+            ''', rows)
+        self.logger.info(f"Recorded {len(rows)} processed articles in {self.db_path}")
+
+    def count(self) -> int:
+        """Return the number of URLs recorded so far"""
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM seen_articles").fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
@@ -42,8 +42,7 @@ def main():
         "pandas>=1.3.0", 
         "beautifulsoup4>=4.9.3",
         "newspaper3k>=0.2.8",
-        "schedule>=1.1.0",
-        "openai>=0.27.0",
+        "openai>=1.0",
         "python-dotenv>=0.19.0"
     ]
     
@@ -1,28 +1,240 @@
+import asyncio
+import json
+import random
+import time
+from typing import List, Optional
+
 import openai
 from config import OPENAI_SETTINGS
+from summary_cache import get_summary_cache, summary_key
 import logging
 
+SYSTEM_PROMPT = "Summarize the following article in one paragraph."
+PACKED_PROMPT = (
+    "Summarize each of the following {count} articles in one paragraph. "
+    "Reply with only a JSON array of {count} strings, one summary per article, in the given order."
+)
+
+# Errors worth retrying: rate limits, timeouts and server-side failures
+RETRYABLE_ERRORS = (openai.RateLimitError, openai.APITimeoutError, openai.APIConnectionError, openai.InternalServerError)
+
+
+class TokenBucket:
+    """Async token bucket refilled evenly over a minute, holding at most one minute's budget"""
+
+    def __init__(self, per_minute: float):
+        self.capacity = float(per_minute)
+        self.rate = self.capacity / 60.0
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self, amount: float = 1):
+        """Wait until `amount` units are available and take them; waiters are served in order"""
+        amount = min(amount, self.capacity)
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= amount:
+                    self.tokens -= amount
+                    return
+                await asyncio.sleep((amount - self.tokens) / self.rate)
+
+
+class _Batch:
+    """Per-call state of one summarize_many run, so concurrent calls on one Summarizer stay independent"""
+
+    def __init__(self, client):
+        self.client = client
+        self.semaphore = asyncio.Semaphore(OPENAI_SETTINGS.get('max_concurrency', 8))
+        self.request_bucket = TokenBucket(OPENAI_SETTINGS.get('requests_per_minute', 500))
+        self.token_bucket = TokenBucket(OPENAI_SETTINGS.get('tokens_per_minute', 200000))
+        self.failed = set()
+        # Indices summarized through a packed prompt, cached under the packed key
+        self.packed = set()
+
+
 class Summarizer:
-    def __init__(self, api_key: str):
+    def __init__(self, api_key: str, base_url: Optional[str] = None):
         self.api_key = api_key
         openai.api_key = api_key
+        # A base URL (e.g. a local stub server) applies to the concurrent client
+        self.base_url = base_url or OPENAI_SETTINGS.get('base_url')
         self.logger = logging.getLogger(__name__)
 
     def summarize(self, text: str) -> str:
         try:
             if not text or len(text) < 100:
                 return text  # Too short to summarize
+            cache = get_summary_cache()
+            key = self._cache_key(text)
+            if cache is not None:
+                cached = cache.get(key)
+                if cached is not None:
+                    return cached
             response = openai.chat.completions.create(
                 model=OPENAI_SETTINGS['model'],
                 messages=[
-                    {"role": "system", "content": "Summarize the following article in one paragraph."},
+                    {"role": "system", "content": SYSTEM_PROMPT},
                     {"role": "user", "content": text}
                 ],
                 max_tokens=OPENAI_SETTINGS['max_tokens'],
                 temperature=OPENAI_SETTINGS['temperature']
             )
             summary = response.choices[0].message.content.strip()
+            if cache is not None:
+                cache.put(key, 'openai', summary)
             return summary
         except Exception as e:
             self.logger.error(f"OpenAI summarization failed: {str(e)}")
-            return text[:500]  # fallback: return truncated text 
\ No newline at end of file
+            return text[:500]  # fallback: return truncated text
+
+    @staticmethod
+    def _cache_key(text: str, packed: bool = False) -> str:
+        # Packed replies come from a different prompt and reply format, so they get their own key
+        params = {
+            'prompt': PACKED_PROMPT if packed else SYSTEM_PROMPT,
+            'max_tokens': OPENAI_SETTINGS['max_tokens'],
+            'temperature': OPENAI_SETTINGS['temperature']
+        }
+        if packed:
+            params['pack_size'] = OPENAI_SETTINGS.get('pack_size', 5)
+        return summary_key(text, 'openai', OPENAI_SETTINGS['model'], params)
+
+    def summarize_many(self, texts: List[str]) -> List[str]:
+        """Summarize many texts concurrently within the configured rate limits, keeping their order"""
+        return asyncio.run(self.summarize_many_async(texts))
+
+    async def summarize_many_async(self, texts: List[str]) -> List[str]:
+        results = list(texts)
+        pending = [index for index, text in enumerate(texts) if text and len(text) >= 100]
+
+        cache = get_summary_cache()
+        keys, packed_keys = {}, {}
+        if cache is not None and pending:
+            keys = {index: self._cache_key(texts[index]) for index in pending}
+            packed_keys = {index: self._cache_key(texts[index], packed=True)
+                           for index in pending if self._packable(texts[index])}
+            found = cache.get_many(list(keys.values()) + list(packed_keys.values()))
+            for index in pending:
+                # A single-prompt summary is as good as a packed one, so either will do
+                for key in (keys[index], packed_keys.get(index)):
+                    if key in found:
+                        results[index] = found[key]
+                        break
+            pending = [index for index in pending
+                       if keys[index] not in found and packed_keys.get(index) not in found]
+        if not pending:
+            return results
+
+        client = openai.AsyncOpenAI(
+            api_key=self.api_key,
+            base_url=self.base_url,
+            timeout=OPENAI_SETTINGS.get('request_timeout', 60),
+            max_retries=0  # Retries are handled below so they also go through the limiters
+        )
+        batch = _Batch(client)
+
+        try:
+            jobs = [self._summarize_one(batch, results, index) for index in pending if not self._packable(texts[index])]
+            jobs += [self._summarize_pack(batch, results, pack) for pack in self._packs(texts, pending)]
+            await asyncio.gather(*jobs)
+        finally:
+            await client.close()
+
+        if cache is not None:
+            cache.put_many([
+                (packed_keys[index] if index in batch.packed else keys[index], results[index])
+                for index in pending if index not in batch.failed
+            ], 'openai')
+
+        self.logger.info(f"Summarized {len(pending)} articles with up to {OPENAI_SETTINGS.get('max_concurrency', 8)} concurrent requests")
+        return results
+
+    @staticmethod
+    def _packable(text: str) -> bool:
+        return OPENAI_SETTINGS.get('pack_short_articles', False) and len(text) <= OPENAI_SETTINGS.get('pack_max_chars', 600)
+
+    def _packs(self, texts: List[str], pending: List[int]) -> List[List[int]]:
+        """Group short articles so several are summarized by one request"""
+        short = [index for index in pending if self._packable(texts[index])]
+        size = max(1, OPENAI_SETTINGS.get('pack_size', 5))
+        return [short[start:start + size] for start in range(0, len(short), size)]
+
+    @staticmethod
+    def _estimate_tokens(text: str, max_tokens: int) -> int:
+        # Roughly four characters per token for English prose, plus the completion budget
+        return len(text) // 4 + max_tokens
+
+    async def _complete(self, batch: _Batch, messages: List[dict], max_tokens: int) -> str:
+        """One chat completion through the limiters, with exponential backoff on retryable errors"""
+        estimate = self._estimate_tokens(''.join(message['content'] for message in messages), max_tokens)
+        max_retries = OPENAI_SETTINGS.get('max_retries', 5)
+        for attempt in range(max_retries + 1):
+            await batch.request_bucket.acquire()
+            await batch.token_bucket.acquire(estimate)
+            try:
+                async with batch.semaphore:
+                    response = await batch.client.chat.completions.create(
+                        model=OPENAI_SETTINGS['model'],
+                        messages=messages,
+                        max_tokens=max_tokens,
+                        temperature=OPENAI_SETTINGS['temperature']
+                    )
+                return response.choices[0].message.content.strip()
+            except RETRYABLE_ERRORS as e:
+                if attempt == max_retries:
+                    raise
+                delay = self._backoff_delay(attempt, e)
+                self.logger.warning(f"OpenAI request failed ({type(e).__name__}), retrying in {delay:.1f}s")
+                await asyncio.sleep(delay)
+
+    @staticmethod
+    def _backoff_delay(attempt: int, error: Exception) -> float:
+        """Exponential backoff with jitter, honouring a Retry-After header when the server sends one"""
+        response = getattr(error, 'response', None)
+        retry_after = response.headers.get('retry-after') if response is not None else None
+        try:
+            if retry_after is not None:
+                return min(float(retry_after), OPENAI_SETTINGS.get('backoff_max', 60))
+        except ValueError:
+            pass
+        delay = OPENAI_SETTINGS.get('backoff_base', 1.0) * (2 ** attempt)
+        return min(delay, OPENAI_SETTINGS.get('backoff_max', 60)) * random.uniform(0.5, 1.0)
+
+    async def _summarize_one(self, batch: _Batch, results: List[str], index: int):
+        text = results[index]
+        try:
+            results[index] = await self._complete(
+                batch,
+                [{"role": "system", "content": SYSTEM_PROMPT}, {"role": "user", "content": text}],
+                OPENAI_SETTINGS['max_tokens']
+            )
+        except Exception as e:
+            self.logger.error(f"OpenAI summarization failed: {str(e)}")
+            results[index] = text[:500]  # fallback: return truncated text
+            batch.failed.add(index)
+
+    async def _summarize_pack(self, batch: _Batch, results: List[str], indices: List[int]):
+        """Summarize several short articles with one prompt, falling back to single requests"""
+        if len(indices) == 1:
+            return await self._summarize_one(batch, results, indices[0])
+        articles = '\n\n'.join(f"Article {number}:\n{results[index]}" for number, index in enumerate(indices, 1))
+        try:
+            content = await self._complete(
+                batch,
+                [{"role": "system", "content": PACKED_PROMPT.format(count=len(indices))}, {"role": "user", "content": articles}],
+                OPENAI_SETTINGS['max_tokens'] * len(indices)
+            )
+            summaries = json.loads(content)
+            if not isinstance(summaries, list) or len(summaries) != len(indices):
+                raise ValueError(f"expected {len(indices)} summaries")
+        except Exception as e:
+            self.logger.warning(f"Packed summarization of {len(indices)} articles failed, sending them one by one: {str(e)}")
+            await asyncio.gather(*(self._summarize_one(batch, results, index) for index in indices))
+            return
+        for index, summary in zip(indices, summaries):
+            results[index] = str(summary).strip()
+            batch.packed.add(index)
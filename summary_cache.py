@@ -0,0 +1,121 @@
+import hashlib
+import json
+import logging
+import sqlite3
+import threading
+import time
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from config import OUTPUT_SETTINGS, SUMMARIZATION_SETTINGS
+
+
+def summary_key(text: str, backend: str, model: str, params: Dict) -> str:
+    """Key a summary by the exact input text and everything that shapes the output"""
+    digest = hashlib.sha256(text.encode('utf-8')).hexdigest()
+    settings = json.dumps(params, sort_keys=True, separators=(',', ':'))
+    return hashlib.sha256(f"{digest}|{backend}|{model}|{settings}".encode('utf-8')).hexdigest()
+
+
+class SummaryCache:
+    """Persistent summaries keyed by content hash, evicting the least recently used beyond max_entries"""
+
+    def __init__(self, db_path: str, max_entries: int = 50000):
+        self.db_path = db_path
+        self.max_entries = max_entries
+        self.logger = logging.getLogger(__name__)
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False, timeout=30)
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute('''
+                CREATE TABLE IF NOT EXISTS summaries (
+                    key TEXT PRIMARY KEY,
+                    backend TEXT NOT NULL,
+                    summary TEXT NOT NULL,
+                    created REAL NOT NULL,
+                    last_used REAL NOT NULL
+                )
+            ''')
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_summaries_last_used ON summaries(last_used)")
+
+    def get(self, key: str) -> Optional[str]:
+        return self.get_many([key]).get(key)
+
+    def get_many(self, keys: Iterable[str]) -> Dict[str, str]:
+        """Return the cached summaries among keys and mark them as recently used"""
+        keys = list(dict.fromkeys(keys))
+        found = {}
+        with self._lock:
+            # Stay well below SQLite's bound-parameter limit
+            for start in range(0, len(keys), 500):
+                chunk = keys[start:start + 500]
+                placeholders = ','.join('?' * len(chunk))
+                found.update(self._conn.execute(
+                    f"SELECT key, summary FROM summaries WHERE key IN ({placeholders})", chunk
+                ).fetchall())
+            if found:
+                now = time.time()
+                with self._conn:
+                    self._conn.executemany("UPDATE summaries SET last_used = ? WHERE key = ?", [(now, key) for key in found])
+            self.hits += len(found)
+            self.misses += len(keys) - len(found)
+        return found
+
+    def put(self, key: str, backend: str, summary: str):
+        self.put_many([(key, summary)], backend)
+
+    def put_many(self, entries: List[Tuple[str, str]], backend: str):
+        """Store (key, summary) pairs, then trim the oldest entries past the size bound"""
+        now = time.time()
+        rows = [(key, backend, summary, now, now) for key, summary in entries if summary]
+        if not rows:
+            return
+        with self._lock, self._conn:
+            self._conn.executemany('''
+                INSERT INTO summaries (key, backend, summary, created, last_used)
+                VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT(key) DO UPDATE SET
+                    summary = excluded.summary,
+                    last_used = excluded.last_used
+            ''', rows)
+            excess = self._conn.execute("SELECT COUNT(*) FROM summaries").fetchone()[0] - self.max_entries
+            if excess > 0:
+                self._conn.execute(
+                    "DELETE FROM summaries WHERE key IN (SELECT key FROM summaries ORDER BY last_used LIMIT ?)", (excess,)
+                )
+                self.logger.info(f"Evicted {excess} least recently used summaries")
+
+    def stats(self) -> Dict:
+        """Return this process's hit/miss counts and the stored entries per backend"""
+        with self._lock:
+            backends = dict(self._conn.execute("SELECT backend, COUNT(*) FROM summaries GROUP BY backend").fetchall())
+            total = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / total, 3) if total else 0.0,
+                'entries': sum(backends.values()),
+                'max_entries': self.max_entries,
+                'backends': backends
+            }
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_summary_cache() -> Optional[SummaryCache]:
+    """Return the process-wide summary cache, or None when caching is turned off"""
+    global _cache
+    if not SUMMARIZATION_SETTINGS.get('cache_enabled', True):
+        return None
+    with _cache_lock:
+        if _cache is None:
+            _cache = SummaryCache(OUTPUT_SETTINGS['summary_cache_file'], SUMMARIZATION_SETTINGS.get('cache_max_entries', 50000))
+        return _cache
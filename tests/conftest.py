@@ -0,0 +1,14 @@
+import os
+import sys
+
+import pytest
+
+# The application modules live at the repository root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture
+def workdir(tmp_path, monkeypatch):
+    """Run in an empty directory so the relative data files of config.py start from scratch"""
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
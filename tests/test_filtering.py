@@ -0,0 +1,53 @@
+import pandas as pd
+import pytest
+
+import config
+from scraper import AntiAgingScraper
+
+# Mixed published_date shapes seen in feeds, plus the edge cases where parsers disagree
+MIXED_DATES = [
+    '2024', '2024-06', '2025', '2025-06',
+    '2024-06-01', '2025-06-01', '2025-6-1', '2024-02-30',
+    '2025-01-15 10:00', '2025-01-15T10:30:00Z', '2024-12-31T23:00:00-05:00',
+    '2024-W01-1T00:00', '2025-W01-1T00:00', '2020-W53-7T00:00',
+    'Mon, 01 Jan 2024 00:00:00 GMT', 'Wed, 15 Jan 2025 10:30:00 GMT', 'garbageT', ''
+]
+
+
+def _articles():
+    articles = []
+    for index, date in enumerate(MIXED_DATES):
+        # Alternate relevant and off-topic text so both filters are exercised
+        title = 'Senescence and longevity study' if index % 2 else 'Election weather report'
+        articles.append({
+            'title': f"{title} {index}",
+            'summary': 'Rapamycin extends lifespan in aging research on senescence.' if index % 3 else '',
+            'source': 'Nature Aging',
+            'url': f"https://example.org/{index}",
+            'published_date': date
+        })
+    return articles
+
+
+def _filter(batch):
+    scraper = AntiAgingScraper()
+    config.SCRAPING_SETTINGS['batch_filtering'] = batch
+    return [(article['url'], article.get('relevance_score'))
+            for article in scraper.filter_articles_by_keywords(_articles())]
+
+
+@pytest.mark.parametrize('content_filtering', [True, False])
+def test_batch_filter_matches_per_article_loop(workdir, monkeypatch, content_filtering):
+    monkeypatch.setitem(config.SCRAPING_SETTINGS, 'batch_filtering', True)
+    monkeypatch.setitem(config.SCRAPING_SETTINGS, 'content_filtering', content_filtering)
+    monkeypatch.setitem(config.SCRAPING_SETTINGS, 'date_filter_year', 2025)
+
+    assert _filter(batch=True) == _filter(batch=False)
+
+
+def test_year_only_and_iso_week_dates():
+    mask = AntiAgingScraper._wrong_year_mask(
+        pd.Series(['2024', '2024-06', '2024-W01-1T00:00', '2025-W02-1T00:00', '2024-06-01']), 2025
+    )
+    # strptime('%Y-%m-%d') rejects the partial dates and fromisoformat accepts week dates, as in the loop
+    assert mask.tolist() == [False, False, True, False, True]
@@ -0,0 +1,49 @@
+import random
+import re
+import types
+
+import pytest
+
+import config
+import free_summarizer
+from free_summarizer import FreeSummarizer, shutdown_pool, summarize_parallel
+
+TOPICS = [
+    ['senolytic', 'senescent', 'clearance', 'dasatinib', 'quercetin', 'fibroblast'],
+    ['rapamycin', 'mtor', 'lifespan', 'dosing', 'intermittent', 'mice'],
+    ['nad', 'sirtuin', 'precursor', 'mitochondria', 'supplement', 'muscle'],
+    ['epigenetic', 'clock', 'methylation', 'reprogramming', 'yamanaka', 'factors'],
+]
+
+
+@pytest.fixture
+def offline_nltk(workdir, monkeypatch):
+    """Stand in for the punkt and stopwords data, which workers forked from here inherit"""
+    monkeypatch.setattr(free_summarizer, '_nltk_checked', True)
+    monkeypatch.setattr(free_summarizer, 'sent_tokenize', lambda text: re.split(r'(?<=\.)\s+', text))
+    monkeypatch.setattr(free_summarizer, 'stopwords', types.SimpleNamespace(words=lambda language: ['the', 'a']))
+    monkeypatch.setitem(config.SUMMARIZATION_SETTINGS, 'cache_enabled', False)
+    monkeypatch.setitem(config.SUMMARIZATION_SETTINGS, 'vectorizer_file', None)
+    monkeypatch.setitem(config.SUMMARIZATION_SETTINGS, 'start_method', 'fork')
+    yield
+    shutdown_pool()
+
+
+def _article(index):
+    # Sentences of varying length mixing the article's topic with the next one, so
+    # how rare each word is depends on which other articles share the vectorizer
+    rng = random.Random(index)
+    own, other = TOPICS[index % len(TOPICS)], TOPICS[(index + 1) % len(TOPICS)]
+    sentences = []
+    for _ in range(8):
+        words = rng.sample(own, rng.randint(1, 4)) + rng.sample(other, rng.randint(0, 3))
+        sentences.append(f"Reported {' '.join(words)} findings.")
+    return ' '.join(sentences)
+
+
+def test_parallel_summaries_do_not_depend_on_chunking(offline_nltk):
+    texts = [_article(index) for index in range(12)] + ['too short']
+    expected = FreeSummarizer()._summarize_batch(texts, 3)
+
+    for chunk_size in (2, 5):
+        assert summarize_parallel(texts, 3, workers=2, chunk_size=chunk_size) == expected
@@ -0,0 +1,72 @@
+import multiprocessing
+import os
+import time
+
+from run_registry import RunRegistry
+
+WORKERS = 4
+RUNS_PER_WORKER = 3
+
+
+def _worker(db_path, holders, max_holders, barrier, results):
+    """Take the run lock RUNS_PER_WORKER times, then report the status this process reads"""
+    registry = RunRegistry(db_path, stale_seconds=30, heartbeat_seconds=0.05)
+    runs = 0
+    deadline = time.time() + 30
+    while runs < RUNS_PER_WORKER and time.time() < deadline:
+        owner = registry.acquire()
+        if owner is None:
+            time.sleep(0.005)
+            continue
+        heartbeat = registry.keep_alive(owner)
+        with holders.get_lock():
+            holders.value += 1
+            max_holders.value = max(max_holders.value, holders.value)
+        try:
+            registry.update_status(stage='scrape', increments={'sources_done': 1})
+            time.sleep(0.02)
+        finally:
+            with holders.get_lock():
+                holders.value -= 1
+            registry.finish_run(owner, last_run=f"{os.getpid()}-{runs}", articles_count=runs)
+            heartbeat.set()
+            registry.release(owner)
+        runs += 1
+    # Every process has finished its runs before any of them reads the final status
+    barrier.wait(timeout=60)
+    results.put((runs, registry.status()))
+    registry.close()
+
+
+def test_lock_is_exclusive_across_processes(workdir):
+    context = multiprocessing.get_context('spawn')
+    db_path = str(workdir / 'runs.db')
+    RunRegistry(db_path).close()
+    holders = context.Value('i', 0)
+    max_holders = context.Value('i', 0)
+    barrier = context.Barrier(WORKERS)
+    results = context.Queue()
+
+    processes = [context.Process(target=_worker, args=(db_path, holders, max_holders, barrier, results))
+                 for _ in range(WORKERS)]
+    for process in processes:
+        process.start()
+    reports = [results.get(timeout=90) for _ in processes]
+    for process in processes:
+        process.join(timeout=30)
+        assert process.exitcode == 0
+
+    assert max_holders.value == 1
+    assert [runs for runs, _ in reports] == [RUNS_PER_WORKER] * WORKERS
+
+    statuses = [status for _, status in reports]
+    assert all(status == statuses[0] for status in statuses)
+    assert statuses[0]['is_running'] is False
+    assert statuses[0]['stage'] is None
+
+    registry = RunRegistry(db_path)
+    events = [event for _, event, _ in registry.events_since(0, limit=1000)]
+    assert events.count('run_started') == events.count('run_finished') == WORKERS * RUNS_PER_WORKER
+    # Runs never interleave: each start is followed by its own finish
+    assert events == ['run_started', 'run_finished'] * (WORKERS * RUNS_PER_WORKER)
+    assert registry.status() == statuses[0]
@@ -0,0 +1,115 @@
+import json
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+import config
+from summarizer import Summarizer
+
+# Each test article starts with a <marker> the stub echoes back in its summary
+MARKER_RE = re.compile(r'<(\w+)>')
+
+
+class StubOpenAI:
+    """Local chat completions endpoint: the first request gets a 429, the rest succeed slowly"""
+
+    def __init__(self, rate_limited=1, delay=0.05):
+        self.rate_limited = rate_limited
+        self.delay = delay
+        self.requests = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._lock = threading.Lock()
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def log_message(self, *args):
+                pass
+
+            def do_POST(self):
+                body = json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+                with stub._lock:
+                    stub.requests += 1
+                    limited = stub.requests <= stub.rate_limited
+                    stub.in_flight += 1
+                    stub.max_in_flight = max(stub.max_in_flight, stub.in_flight)
+                try:
+                    if limited:
+                        self._send(429, {'error': {'message': 'Rate limit reached', 'type': 'requests'}},
+                                   {'retry-after': '0'})
+                        return
+                    time.sleep(stub.delay)
+                    self._send(200, stub.completion(body['messages']))
+                finally:
+                    with stub._lock:
+                        stub.in_flight -= 1
+
+            def _send(self, status, payload, headers=None):
+                data = json.dumps(payload).encode('utf-8')
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(data)))
+                for key, value in (headers or {}).items():
+                    self.send_header(key, value)
+                self.end_headers()
+                self.wfile.write(data)
+
+        self._httpd = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        threading.Thread(target=self._httpd.serve_forever, daemon=True).start()
+
+    @property
+    def base_url(self):
+        return f"http://127.0.0.1:{self._httpd.server_address[1]}/v1"
+
+    @staticmethod
+    def completion(messages):
+        prompt, text = messages[0]['content'], messages[1]['content']
+        if prompt.startswith('Summarize each'):
+            # Packed prompt: answer with a JSON array naming each article's marker in order
+            content = json.dumps([f"summary of {marker}" for marker in MARKER_RE.findall(text)])
+        else:
+            content = f"summary of {MARKER_RE.search(text).group(1)}"
+        return {
+            'id': 'chatcmpl-stub', 'object': 'chat.completion', 'created': 0, 'model': 'stub',
+            'choices': [{'index': 0, 'finish_reason': 'stop',
+                         'message': {'role': 'assistant', 'content': content}}]
+        }
+
+    def stop(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+
+@pytest.fixture
+def stub(workdir, monkeypatch):
+    monkeypatch.setitem(config.SUMMARIZATION_SETTINGS, 'cache_enabled', False)
+    for key, value in {'max_concurrency': 2, 'max_retries': 3, 'backoff_base': 0.01,
+                       'pack_short_articles': True, 'pack_max_chars': 600, 'pack_size': 3}.items():
+        monkeypatch.setitem(config.OPENAI_SETTINGS, key, value)
+    server = StubOpenAI()
+    yield server
+    server.stop()
+
+
+def _text(marker, length):
+    return f"<{marker}> " + 'Senolytic therapy cleared senescent cells in aged mice. ' * (length // 56 + 1)
+
+
+def test_summarize_many_against_stub_server(stub):
+    long_texts = [_text(f"long{i}", 800) for i in range(6)]
+    short_texts = [_text(f"short{i}", 150) for i in range(5)]
+    texts = [text for pair in zip(long_texts, short_texts) for text in pair] + [long_texts[-1], 'too short']
+
+    results = Summarizer('test-key', base_url=stub.base_url).summarize_many(texts)
+
+    # The 429 was retried, every article got its own summary back in input order,
+    # and the short ones went out packed (5 short articles in packs of 3 -> 2 requests)
+    markers = [MARKER_RE.match(text).group(1) if text.startswith('<') else None for text in texts]
+    assert results == [f"summary of {marker}" if marker else text for marker, text in zip(markers, texts)]
+    assert stub.requests == 1 + len(long_texts) + 2
+    assert 1 < stub.max_in_flight <= config.OPENAI_SETTINGS['max_concurrency']
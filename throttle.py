@@ -0,0 +1,43 @@
+import threading
+import time
+from contextlib import contextmanager
+from urllib.parse import urlparse
+
+
+class HostThrottle:
+    """Per-host politeness limits shared by concurrent fetchers"""
+
+    def __init__(self, max_per_host: int = 1, min_interval: float = 0):
+        self.max_per_host = max(1, int(max_per_host))
+        self.min_interval = max(0.0, float(min_interval))
+        self._lock = threading.Lock()
+        self._semaphores = {}
+        self._next_start = {}
+
+    @staticmethod
+    def host_of(url: str) -> str:
+        """Return the normalized host part of a URL"""
+        return urlparse(url or '').netloc.lower()
+
+    @contextmanager
+    def slot(self, url: str):
+        """Hold one of the host's request slots, spacing request starts by min_interval"""
+        host = self.host_of(url)
+        with self._lock:
+            semaphore = self._semaphores.get(host)
+            if semaphore is None:
+                semaphore = threading.BoundedSemaphore(self.max_per_host)
+                self._semaphores[host] = semaphore
+        with semaphore:
+            self._wait_turn(host)
+            yield
+
+    def _wait_turn(self, host: str):
+        """Reserve the next start time for a host and sleep until it arrives"""
+        with self._lock:
+            now = time.monotonic()
+            start = max(now, self._next_start.get(host, now))
+            self._next_start[host] = start + self.min_interval
+        delay = start - now
+        if delay > 0:
+            time.sleep(delay)